@@ -11,7 +11,7 @@ from .forms import PackageGroupForm, PackageForm, ExtraServiceForm, PackageFeatu
 
 
 def _user_is_accountant(user: CustomUser) -> bool:
-    return getattr(user, 'has_tag', lambda t: False)('muhasebeci') or getattr(user, 'has_tag', lambda t: False)('muhasebeadmin')
+    return getattr(user, 'has_any_tag', lambda *t: False)('muhasebeci', 'muhasebeadmin')
 
 
 def _user_is_accounting_admin(user: CustomUser) -> bool:
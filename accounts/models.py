@@ -1,5 +1,9 @@
 from django.db import models
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser, Group, Permission
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_save, post_delete
+from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 
 class CustomUser(AbstractUser):
@@ -94,13 +98,92 @@ CustomUser.add_to_class(
 )
 
 # Yardımcı metodlar
+# Kullanıcı etiketleri her istekte bir kez yüklenir ve kullanıcı nesnesinde
+# frozenset olarak tutulur. İstekler arası önbellek sürümlüdür: kullanıcının
+# etiketleri değiştiğinde kullanıcı sürümü, bir etiket değiştiğinde veya
+# silindiğinde genel sürüm arttırılır; eski anahtarlar kendiliğinden geçersiz olur.
+USER_TAG_CACHE_TIMEOUT = getattr(settings, 'USER_TAG_CACHE_TIMEOUT', 300)
+TAG_GLOBAL_VERSION_KEY = 'accounts:tags:version'
+TAG_USER_VERSION_KEY = 'accounts:tags:version:{user_id}'
+TAG_NAMES_KEY = 'accounts:tags:{user_id}:{global_version}:{user_version}'
+
+
+def _bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+
+
+def get_user_tag_names(user) -> frozenset:
+    """Kullanıcının etiket adlarını (istek ve önbellek üzerinden) frozenset olarak döndürür."""
+    if not getattr(user, 'pk', None) or not hasattr(user, 'tags'):
+        return frozenset()
+    
+    names = getattr(user, '_tag_names', None)
+    if names is not None:
+        return names
+    
+    user_version_key = TAG_USER_VERSION_KEY.format(user_id=user.pk)
+    versions = cache.get_many([TAG_GLOBAL_VERSION_KEY, user_version_key])
+    names_key = TAG_NAMES_KEY.format(
+        user_id=user.pk,
+        global_version=versions.get(TAG_GLOBAL_VERSION_KEY, 1),
+        user_version=versions.get(user_version_key, 1),
+    )
+    cached = cache.get(names_key)
+    if cached is not None:
+        names = frozenset(cached)
+    else:
+        names = frozenset(user.tags.values_list('name', flat=True))
+        cache.set(names_key, sorted(names), USER_TAG_CACHE_TIMEOUT)
+    
+    user._tag_names = names
+    return names
+
+
+def invalidate_user_tags(user_ids=None):
+    """Verilen kullanıcıların (None ise tüm kullanıcıların) etiket önbelleğini geçersiz kılar."""
+    if user_ids is None:
+        _bump_version(TAG_GLOBAL_VERSION_KEY)
+        return
+    for user_id in user_ids:
+        _bump_version(TAG_USER_VERSION_KEY.format(user_id=user_id))
+
+
 def user_has_tag(self, tag_name: str) -> bool:
     """Kullanıcının belirli bir etikete sahip olup olmadığını kontrol eder."""
-    if not hasattr(self, 'tags'):
-        return False
-    try:
-        return self.tags.filter(name=tag_name).exists()
-    except Exception:
-        return False
+    return tag_name in get_user_tag_names(self)
+
+
+def user_has_any_tag(self, *tag_names: str) -> bool:
+    """Kullanıcının verilen etiketlerden en az birine sahip olup olmadığını kontrol eder."""
+    return not get_user_tag_names(self).isdisjoint(tag_names)
 
 CustomUser.add_to_class('has_tag', user_has_tag)
+CustomUser.add_to_class('has_any_tag', user_has_any_tag)
+
+
+@receiver(m2m_changed, sender=CustomUser.tags.through)
+def handle_user_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Kullanıcı-etiket ilişkisi değiştiğinde ilgili kullanıcıların önbelleğini geçersiz kılar."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    
+    if not reverse:
+        # user.tags.add(...) / remove / clear
+        instance.__dict__.pop('_tag_names', None)
+        invalidate_user_tags([instance.pk])
+    elif action == 'post_clear' or pk_set is None:
+        # tag.users.clear(): etkilenen kullanıcılar bilinmediği için tümü geçersiz kılınır
+        invalidate_user_tags()
+    else:
+        # tag.users.add(...) / remove
+        invalidate_user_tags(pk_set)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def handle_tag_change(sender, instance, **kwargs):
+    """Etiket yeniden adlandırıldığında veya silindiğinde tüm etiket önbelleğini geçersiz kılar."""
+    invalidate_user_tags()
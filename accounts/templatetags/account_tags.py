@@ -1,5 +1,7 @@
 from django import template
 
+from accounts.models import get_user_tag_names
+
 register = template.Library()
 
 
@@ -7,9 +9,7 @@ register = template.Library()
 def has_tag(user, tag_name: str) -> bool:
     """Template filter: {{ user|has_tag:"muhasebeci" }}"""
     try:
-        if not hasattr(user, 'tags'):
-            return False
-        return user.tags.filter(name=tag_name).exists()
+        return tag_name in get_user_tag_names(user)
     except Exception:
         return False
 
@@ -18,13 +18,11 @@ def has_tag(user, tag_name: str) -> bool:
 def has_any_tag(user, tag_names: str) -> bool:
     """Template filter: {{ user|has_any_tag:"tag1,tag2" }}"""
     try:
-        if not hasattr(user, 'tags') or not tag_names:
+        if not tag_names:
             return False
         names = [t.strip() for t in str(tag_names).split(',') if t.strip()]
         if not names:
             return False
-        return user.tags.filter(name__in=names).exists()
+        return not get_user_tag_names(user).isdisjoint(names)
     except Exception:
         return False
-
-
@@ -57,7 +57,7 @@ class ArticleForm(forms.ModelForm):
         self.fields['content'].required = False
         
         # Kullanıcı adminmakale tag'ına sahip değilse bazı alanları gizle
-        if self.user and not self.user.tags.filter(name='adminmakale').exists():
+        if self.user and not self.user.has_tag('adminmakale'):
             # Normal makale yazarları sadece draft oluşturabilir
             self.fields['status'].widget = forms.HiddenInput()
             self.fields['is_featured'].widget = forms.HiddenInput()
@@ -18,12 +18,12 @@ User = get_user_model()
 
 def _user_has_makale_tag(user):
     """Kullanıcının makale tag'ına sahip olup olmadığını kontrol et"""
-    return user.is_authenticated and user.tags.filter(name='makale').exists()
+    return user.is_authenticated and user.has_tag('makale')
 
 
 def _user_has_adminmakale_tag(user):
     """Kullanıcının adminmakale tag'ına sahip olup olmadığını kontrol et"""
-    return user.is_authenticated and user.tags.filter(name='adminmakale').exists()
+    return user.is_authenticated and user.has_tag('adminmakale')
 
 
 def _user_can_edit_article(user, article):
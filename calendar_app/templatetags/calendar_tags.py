@@ -10,10 +10,10 @@ def has_tag(user, tag_name):
     """
     Kullanıcının belirli bir etikete sahip olup olmadığını kontrol eder.
     """
-    if not user or not hasattr(user, 'tags'):
+    if not user or not hasattr(user, 'has_tag'):
         return False
     
-    return user.tags.filter(name=tag_name).exists()
+    return user.has_tag(tag_name)
 
 
 @register.filter
@@ -38,10 +38,7 @@ def has_permission_for_event_type(user, event_type):
     """
     if event_type == 'payment':
         # Ödeme etkinlikleri sadece muhasebeci ve muhasebeadmin etiketine sahip kullanıcılar görebilir
-        return hasattr(user, 'has_tag') and (
-            user.has_tag('muhasebeci') or 
-            user.has_tag('muhasebeadmin')
-        )
+        return hasattr(user, 'has_any_tag') and user.has_any_tag('muhasebeci', 'muhasebeadmin')
     elif event_type == 'project':
         # Proje etkinlikleri proje yöneticisi ve admin görebilir
         return user.role in ['admin', 'project_manager']
@@ -32,7 +32,7 @@ def ai_required(view_func):
             return redirect('accounts:login')
         
         # Check if user has 'ai' tag
-        if not hasattr(request.user, 'tags') or not request.user.tags.filter(name='ai').exists():
+        if not hasattr(request.user, 'tags') or not request.user.has_tag('ai'):
             messages.error(request, 'AI modülüne erişim için "ai" etiketine sahip olmanız gerekmektedir.')
             return HttpResponseForbidden('AI modülüne erişim yetkiniz bulunmamaktadır.')
         
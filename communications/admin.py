@@ -3,7 +3,7 @@ from django.utils.translation import gettext_lazy as _
 
 from .models import (
     Message, Notification, MessageGroup, MessageGroupMember, MessageReadStatus, 
-    DirectMessage, DirectMessageContent
+    DirectMessage, DirectMessageContent, NotificationArchive, MessageReadStatusArchive
 )
 
 class MessageReadStatusInline(admin.TabularInline):
@@ -42,10 +42,10 @@ class MessageGroupAdmin(admin.ModelAdmin):
     """
     MessageGroup modeli için admin arayüzü.
     """
-    list_display = ('name', 'type', 'get_member_count', 'get_message_count', 'created_at', 'updated_at')
-    list_filter = ('type', 'created_at')
+    list_display = ('name', 'type', 'get_member_count', 'get_message_count', 'last_message_at', 'created_at', 'updated_at')
+    list_filter = ('type', 'is_github_linked', 'created_at')
     search_fields = ('name', 'description')
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('last_message_at', 'last_message_preview', 'is_github_linked', 'created_at', 'updated_at')
     inlines = [MessageGroupMemberInline, MessageInline]
     
     fieldsets = (
@@ -56,6 +56,10 @@ class MessageGroupAdmin(admin.ModelAdmin):
             'fields': ('related_project', 'related_task'),
             'classes': ('collapse',),
         }),
+        (_('Son Mesaj'), {
+            'fields': ('last_message_at', 'last_message_preview', 'is_github_linked'),
+            'classes': ('collapse',),
+        }),
         (_('Tarih Bilgileri'), {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',),
@@ -104,7 +108,7 @@ class NotificationAdmin(admin.ModelAdmin):
     """
     Notification modeli için admin arayüzü.
     """
-    list_display = ('recipient', 'title', 'notification_type', 'is_read', 'created_at')
+    list_display = ('recipient', 'title', 'notification_type', 'count', 'is_read', 'created_at')
     list_filter = ('notification_type', 'is_read', 'created_at')
     search_fields = ('title', 'content', 'recipient__username')
     readonly_fields = ('created_at',)
@@ -118,7 +122,7 @@ class NotificationAdmin(admin.ModelAdmin):
             'classes': ('collapse',),
         }),
         (_('Okunma Bilgileri'), {
-            'fields': ('is_read', 'read_at'),
+            'fields': ('is_read', 'read_at', 'coalesce_key', 'count'),
             'classes': ('collapse',),
         }),
         (_('Tarih Bilgileri'), {
@@ -141,3 +145,37 @@ class DirectMessageContentAdmin(admin.ModelAdmin):
     list_filter = ('message_type', 'is_read', 'sent_at')
     search_fields = ('content', 'sender__username')
     readonly_fields = ('sent_at', 'read_at')
+
+class ArchiveAdminMixin:
+    """
+    Arşiv kayıtları yalnızca görüntülenir; içerik sıkıştırılmış veriden
+    okunarak gösterilir.
+    """
+    readonly_fields = ('month', 'item_count', 'get_preview', 'created_at')
+    exclude = ('payload',)
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def get_preview(self, obj):
+        items = obj.get_items()
+        return '\n'.join(str(item) for item in items[:50])
+    get_preview.short_description = _('İçerik (ilk 50 kayıt)')
+
+@admin.register(NotificationArchive)
+class NotificationArchiveAdmin(ArchiveAdminMixin, admin.ModelAdmin):
+    list_display = ('recipient', 'month', 'item_count', 'created_at')
+    list_filter = ('month',)
+    search_fields = ('recipient__username',)
+    readonly_fields = ('recipient',) + ArchiveAdminMixin.readonly_fields
+
+@admin.register(MessageReadStatusArchive)
+class MessageReadStatusArchiveAdmin(ArchiveAdminMixin, admin.ModelAdmin):
+    list_display = ('group', 'month', 'item_count', 'created_at')
+    list_filter = ('month',)
+    search_fields = ('group__name',)
+    readonly_fields = ('group',) + ArchiveAdminMixin.readonly_fields
+
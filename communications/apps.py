@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class CommunicationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'communications'
+
+    def ready(self):
+        # Tam metin arama tablosu modellerle yönetilmez; migrate sonrasında oluşturulur
+        from .search import create_search_tables
+        post_migrate.connect(create_search_tables, sender=self)
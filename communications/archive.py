@@ -0,0 +1,226 @@
+"""
+Bildirimler ve mesaj okunma kayıtları için arşivleme.
+
+Belirli bir süreden eski, okunmuş bildirimler (kullanıcı ve ay başına) ve
+eski mesajlara ait okunma kayıtları (grup ve ay başına) sıkıştırılmış JSON
+olarak arşiv tablolarına taşınır. Böylece sık sorgulanan tablolar ve
+indeksleri küçük kalır; arşivlenen geçmiş istendiğinde yine okunabilir.
+"""
+import json
+import zlib
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+NOTIFICATION_ARCHIVE_AFTER_DAYS = getattr(settings, 'NOTIFICATION_ARCHIVE_AFTER_DAYS', 90)
+READ_STATUS_ARCHIVE_AFTER_DAYS = getattr(settings, 'MESSAGE_READ_STATUS_ARCHIVE_AFTER_DAYS', 180)
+ARCHIVE_BATCH_SIZE = getattr(settings, 'ARCHIVE_BATCH_SIZE', 5000)
+
+NOTIFICATION_FIELDS = (
+    'id', 'title', 'content', 'notification_type', 'sender_id',
+    'related_project_id', 'related_task_id', 'related_message_group_id',
+    'coalesce_key', 'count', 'created_at', 'read_at',
+)
+DATETIME_FIELDS = ('created_at', 'read_at', 'message_created_at')
+
+
+def pack(items):
+    """Sözlük listesini sıkıştırılmış JSON'a çevirir"""
+    return zlib.compress(
+        json.dumps(items, default=str, separators=(',', ':')).encode('utf-8'), 9
+    )
+
+
+def unpack(payload):
+    """pack() ile üretilen veriyi sözlük listesine geri çevirir"""
+    items = json.loads(zlib.decompress(bytes(payload)).decode('utf-8'))
+    for item in items:
+        for field in DATETIME_FIELDS:
+            if item.get(field):
+                item[field] = parse_datetime(item[field])
+    return items
+
+
+def month_of(value):
+    """Tarihin (yerel saatle) ait olduğu ayın ilk gününü döndürür"""
+    return timezone.localtime(value).date().replace(day=1)
+
+
+def parse_month(value):
+    """'YYYY-MM' biçimindeki ayı ayın ilk günü olarak döndürür; geçersizse None"""
+    try:
+        year, month = (int(part) for part in value.split('-'))
+        return timezone.now().date().replace(year=year, month=month, day=1)
+    except (AttributeError, ValueError):
+        return None
+
+
+def archive_read_notifications(days=None, batch_size=None):
+    """
+    Belirtilen günden eski, okunmuş bildirimleri arşive taşır.
+    Taşınan bildirim sayısını döndürür.
+    """
+    from communications.models import Notification, NotificationArchive
+
+    days = NOTIFICATION_ARCHIVE_AFTER_DAYS if days is None else days
+    batch_size = batch_size or ARCHIVE_BATCH_SIZE
+    cutoff = timezone.now() - timedelta(days=days)
+
+    archived_count = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                Notification.objects.filter(is_read=True, created_at__lt=cutoff)
+                .order_by('recipient_id', 'created_at', 'id')
+                .values('recipient_id', *NOTIFICATION_FIELDS)[:batch_size]
+            )
+            if not rows:
+                break
+
+            chunks = defaultdict(list)
+            for row in rows:
+                recipient_id = row.pop('recipient_id')
+                chunks[(recipient_id, month_of(row['created_at']))].append(row)
+
+            NotificationArchive.objects.bulk_create([
+                NotificationArchive(
+                    recipient_id=recipient_id,
+                    month=month,
+                    item_count=len(items),
+                    payload=pack(items)
+                )
+                for (recipient_id, month), items in chunks.items()
+            ])
+            Notification.objects.filter(id__in=[row['id'] for row in rows]).delete()
+        archived_count += len(rows)
+
+    return archived_count
+
+
+def archive_message_read_statuses(days=None, batch_size=None):
+    """
+    Belirtilen günden eski mesajlara ait okunmuş okunma kayıtlarını arşive
+    taşır. Mesajların okunma göstergesi bozulmasın diye her mesajın
+    archived_read_count alanı taşınan kayıt sayısı kadar arttırılır.
+    Taşınan kayıt sayısını döndürür.
+    """
+    from communications.models import Message, MessageReadStatus, MessageReadStatusArchive
+
+    days = READ_STATUS_ARCHIVE_AFTER_DAYS if days is None else days
+    batch_size = batch_size or ARCHIVE_BATCH_SIZE
+    cutoff = timezone.now() - timedelta(days=days)
+
+    archived_count = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                MessageReadStatus.objects.filter(is_read=True, message__created_at__lt=cutoff)
+                .order_by('message_id', 'id')
+                .values(
+                    'id', 'message_id', 'user_id', 'read_at',
+                    group_id=F('message__group_id'),
+                    message_created_at=F('message__created_at'),
+                )[:batch_size]
+            )
+            if not rows:
+                break
+
+            chunks = defaultdict(list)
+            per_message = defaultdict(int)
+            for row in rows:
+                group_id = row.pop('group_id')
+                chunks[(group_id, month_of(row['message_created_at']))].append(row)
+                per_message[row['message_id']] += 1
+
+            MessageReadStatusArchive.objects.bulk_create([
+                MessageReadStatusArchive(
+                    group_id=group_id,
+                    month=month,
+                    item_count=len(items),
+                    payload=pack(items)
+                )
+                for (group_id, month), items in chunks.items()
+            ])
+
+            # Aynı sayıda kayıt taşınan mesajlar tek sorguda güncellenir
+            by_count = defaultdict(list)
+            for message_id, count in per_message.items():
+                by_count[count].append(message_id)
+            for count, message_ids in by_count.items():
+                Message.objects.filter(id__in=message_ids).update(
+                    archived_read_count=F('archived_read_count') + count
+                )
+
+            MessageReadStatus.objects.filter(id__in=[row['id'] for row in rows]).delete()
+        archived_count += len(rows)
+
+    return archived_count
+
+
+def get_archived_notification_months(user):
+    """Kullanıcının arşivde bildirimi bulunan aylarını ve bildirim sayılarını döndürür"""
+    from communications.models import NotificationArchive
+
+    return list(
+        NotificationArchive.objects.filter(recipient=user)
+        .values('month')
+        .annotate(total=Sum('item_count'))
+        .order_by('-month')
+    )
+
+
+def get_archived_notifications(user, month):
+    """Kullanıcının belirtilen aydaki arşivlenmiş bildirimlerini en yeniden eskiye döndürür"""
+    from communications.models import NotificationArchive
+
+    items = []
+    for archive in NotificationArchive.objects.filter(recipient=user, month=month):
+        items.extend(archive.get_items())
+    items.sort(key=lambda item: (item['created_at'], item['id']), reverse=True)
+    return items
+
+
+def get_archived_read_statuses(message):
+    """Mesajın arşivlenmiş okunma kayıtlarını döndürür"""
+    from communications.models import MessageReadStatusArchive
+
+    if not message.archived_read_count:
+        return []
+    archives = MessageReadStatusArchive.objects.filter(
+        group_id=message.group_id, month=month_of(message.created_at)
+    )
+    return [
+        item
+        for archive in archives
+        for item in archive.get_items()
+        if item['message_id'] == message.id
+    ]
+
+
+def get_archived_read_message_ids(user, messages):
+    """
+    Verilen mesajlardan kullanıcının okunma kaydı arşive taşınmış olanların
+    ID'lerini döndürür. Arşiv yalnızca archived_read_count'u olan mesajlar
+    için açılır.
+    """
+    from communications.models import MessageReadStatusArchive
+
+    messages = [message for message in messages if message.archived_read_count]
+    if not messages:
+        return set()
+
+    message_ids = {message.id for message in messages}
+    chunks = Q()
+    for group_id, month in {(message.group_id, month_of(message.created_at)) for message in messages}:
+        chunks |= Q(group_id=group_id, month=month)
+    return {
+        item['message_id']
+        for archive in MessageReadStatusArchive.objects.filter(chunks)
+        for item in archive.get_items()
+        if item['user_id'] == user.id and item['message_id'] in message_ids
+    }
@@ -0,0 +1,90 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from communications.models import Notification
+from communications.tasks import check_approaching_deadlines
+from projects.models import Project
+from tasks.models import Task
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'check_approaching_deadlines görevini sentetik veriyle ölçer. '
+        'Veriler bir işlem içinde oluşturulur ve sonunda geri alınır.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=500, help='Oluşturulacak kullanıcı sayısı')
+        parser.add_argument('--projects', type=int, default=200, help='Oluşturulacak proje sayısı')
+        parser.add_argument('--tasks', type=int, default=10000, help='Oluşturulacak görev sayısı')
+        parser.add_argument('--team-size', type=int, default=10, help='Proje başına takım üyesi sayısı')
+        parser.add_argument('--seed', type=int, default=42, help='Rastgele sayı üreteci tohumu')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+
+        with transaction.atomic():
+            self._populate(rng, options)
+
+            for label in ('İlk çalıştırma', 'Tekrar çalıştırma (bugün gönderilenler atlanır)'):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    result = check_approaching_deadlines()
+                    elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{label}: {elapsed:.2f} sn, {len(queries)} sorgu - {result}"
+                )
+
+            self.stdout.write(f"Toplam bildirim: {Notification.objects.count()}")
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS("Ölçüm tamamlandı, sentetik veriler geri alındı."))
+
+    def _populate(self, rng, options):
+        today = timezone.localdate()
+        prefix = f"bench{int(time.time())}"
+
+        self.stdout.write("Sentetik veriler oluşturuluyor...")
+        users = User.objects.bulk_create([
+            User(username=f"{prefix}_user{i}", password='!') for i in range(options['users'])
+        ])
+        user_ids = [user.pk for user in users]
+
+        projects = Project.objects.bulk_create([
+            Project(
+                name=f"Proje {i}",
+                start_date=today - timedelta(days=30),
+                end_date=today + timedelta(days=rng.randint(0, 10)),
+                status=rng.choice(['not_started', 'in_progress', 'on_hold', 'completed']),
+                manager_id=rng.choice(user_ids),
+            )
+            for i in range(options['projects'])
+        ])
+
+        Membership = Project.team_members.through
+        Membership.objects.bulk_create([
+            Membership(project_id=project.pk, customuser_id=member_id)
+            for project in projects
+            for member_id in rng.sample(user_ids, min(options['team_size'], len(user_ids)))
+        ], batch_size=1000)
+
+        Task.objects.bulk_create([
+            Task(
+                title=f"Görev {i}",
+                project_id=rng.choice(projects).pk,
+                creator_id=rng.choice(user_ids),
+                assignee_id=rng.choice(user_ids + [None]),
+                status=rng.choice(['todo', 'in_progress', 'review', 'completed']),
+                due_date=today + timedelta(days=rng.randint(-5, 10)),
+            )
+            for i in range(options['tasks'])
+        ], batch_size=1000)
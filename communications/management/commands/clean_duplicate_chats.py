@@ -1,8 +1,8 @@
 from django.core.management.base import BaseCommand
 from django.db.models import Count
-from django.utils.translation import gettext_lazy as _
 from django.contrib.auth import get_user_model
-from communications.models import MessageGroup, Message, MessageReadStatus
+from communications.models import MessageGroup, Message
+from communications.utils import find_duplicate_direct_groups, merge_direct_groups
 
 User = get_user_model()
 
@@ -29,96 +29,52 @@ class Command(BaseCommand):
         merge = options['merge']
         dry_run = options['dry_run']
         
-        # Tüm kullanıcıları al
-        users = User.objects.all()
-        
         cleaned_count = 0
         merged_messages = 0
         
         self.stdout.write("Tekrarlanan direkt mesaj gruplarını kontrol ediliyor...")
         
-        # Her kullanıcı çifti için kontrol et
-        for user1 in users:
-            for user2 in users.filter(id__gt=user1.id):  # Her çifti sadece bir kez işle
-                # İki kullanıcı arasındaki tüm direkt mesaj gruplarını bul
-                direct_groups = MessageGroup.objects.filter(
-                    type='direct',
-                    members=user1
-                ).filter(
-                    members=user2
-                ).annotate(
-                    member_count=Count('members')
-                ).filter(
-                    member_count=2
-                ).order_by('-created_at')
-                
-                # Eğer birden fazla grup varsa, en yenisini tutup diğerlerini temizle
-                if direct_groups.count() > 1:
-                    # Birden fazla direkt mesaj grubu tespit edildi
-                    self.stdout.write(
-                        self.style.WARNING(
-                            f"TESPIT: {user1.get_full_name() or user1.username} ve "
-                            f"{user2.get_full_name() or user2.username} arasında "
-                            f"{direct_groups.count()} adet direkt mesaj grubu var."
-                        )
-                    )
-                    
-                    # En yeni grubu al
-                    newest_group = direct_groups.first()
-                    
-                    # Diğer grupları temizle
-                    for group in direct_groups[1:]:
-                        # Mesaj sayısını say
-                        message_count = Message.objects.filter(group=group).count()
-                        
-                        self.stdout.write(
-                            f"  - Grup ID: {group.id}, Oluşturulma: {group.created_at}, "
-                            f"Mesaj sayısı: {message_count}"
-                        )
-                        
-                        if not dry_run:
-                            if merge:
-                                # Mesajları yeni gruba taşı
-                                messages_to_move = Message.objects.filter(group=group)
-                                for msg in messages_to_move:
-                                    # Mesajı kopyala
-                                    new_msg = Message.objects.create(
-                                        sender=msg.sender,
-                                        group=newest_group,
-                                        message_type=msg.message_type,
-                                        content=msg.content,
-                                        file=msg.file,
-                                        created_at=msg.created_at,
-                                        updated_at=msg.updated_at
-                                    )
-                                    
-                                    # Okunma durumlarını da kopyala
-                                    for status in msg.read_status.all():
-                                        MessageReadStatus.objects.create(
-                                            message=new_msg,
-                                            user=status.user,
-                                            is_read=status.is_read,
-                                            read_at=status.read_at
-                                        )
-                                    
-                                    merged_messages += 1
-                                
-                            # Grubu sil
-                            group.delete()
-                            cleaned_count += 1
-                        
-                    # Bilgilendirme mesajı ekle (eğer dry run değilse ve birleştirme yapıldıysa)
-                    if not dry_run and merge and not Message.objects.filter(
-                        group=newest_group,
-                        message_type='system',
-                        content__contains='Aranızda birden fazla sohbet tespit edildi'
-                    ).exists():
-                        Message.objects.create(
-                            sender=None,  # Sistem mesajı
-                            group=newest_group,
-                            message_type='system',
-                            content="Aranızda birden fazla sohbet tespit edildi. Tüm mesajlarınız artık burada toplanacak."
-                        )
+        # Tüm tekrarlanan grupları kullanıcı çiftine göre tek sorguda bul
+        duplicates = find_duplicate_direct_groups()
+        if not duplicates:
+            self.stdout.write(self.style.SUCCESS("Tekrarlanan direkt mesaj grubu bulunamadı."))
+            return
+        
+        user_ids = {user_id for pair in duplicates for user_id in pair}
+        users = User.objects.in_bulk(user_ids)
+        all_group_ids = [group_id for group_ids in duplicates.values() for group_id in group_ids]
+        groups = MessageGroup.objects.in_bulk(all_group_ids)
+        message_counts = dict(
+            Message.objects.filter(group_id__in=all_group_ids).values('group_id').annotate(
+                message_count=Count('id')
+            ).values_list('group_id', 'message_count')
+        )
+        
+        for (user1_id, user2_id), group_ids in duplicates.items():
+            user1, user2 = users[user1_id], users[user2_id]
+            
+            # Birden fazla direkt mesaj grubu tespit edildi
+            self.stdout.write(
+                self.style.WARNING(
+                    f"TESPIT: {user1.get_full_name() or user1.username} ve "
+                    f"{user2.get_full_name() or user2.username} arasında "
+                    f"{len(group_ids)} adet direkt mesaj grubu var."
+                )
+            )
+            
+            # En yeni grup tutulur, diğerleri temizlenir
+            newest_group_id, old_group_ids = group_ids[0], group_ids[1:]
+            for group_id in old_group_ids:
+                self.stdout.write(
+                    f"  - Grup ID: {group_id}, Oluşturulma: {groups[group_id].created_at}, "
+                    f"Mesaj sayısı: {message_counts.get(group_id, 0)}"
+                )
+            
+            if not dry_run:
+                merged_messages += merge_direct_groups(
+                    newest_group_id, old_group_ids, merge=merge, warning_sender_id=user1_id
+                )
+            cleaned_count += len(old_group_ids)
         
         if dry_run:
             self.stdout.write(
@@ -132,4 +88,4 @@ class Command(BaseCommand):
                     f"Temizlik tamamlandı. {cleaned_count} adet tekrarlanan direkt mesaj grubu temizlendi. "
                     f"{merged_messages} adet mesaj taşındı."
                 )
-            ) 
\ No newline at end of file
+            )
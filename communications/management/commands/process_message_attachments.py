@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from communications.models import Message, DirectMessageContent
+from communications.media import process_message_image
+
+
+class Command(BaseCommand):
+    help = 'Mevcut mesaj eklerindeki görseller için küçük resim ve web kopyalarını üretir'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Daha önce işlenmiş görselleri de yeniden işler',
+        )
+
+    def handle(self, *args, **options):
+        processed_count = 0
+        skipped_count = 0
+        
+        for model in (Message, DirectMessageContent):
+            messages = model.objects.exclude(file='').exclude(file__isnull=True)
+            if not options['force']:
+                messages = messages.filter(thumbnail__isnull=True) | messages.filter(thumbnail='')
+            
+            for message in messages.iterator():
+                fields = process_message_image(message)
+                if not fields:
+                    skipped_count += 1
+                    continue
+                model.objects.filter(pk=message.pk).update(**fields)
+                processed_count += 1
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{processed_count} adet görsel işlendi, {skipped_count} adet ek atlandı."
+            )
+        )
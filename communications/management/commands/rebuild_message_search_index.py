@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from communications.models import Message, DirectMessageContent
+from communications.search import (
+    message_index, index_message, index_direct_message
+)
+
+
+class Command(BaseCommand):
+    help = 'Mesaj tam metin arama indeksini sıfırdan oluşturur'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Tek işlemde indekslenecek mesaj sayısı',
+        )
+
+    def handle(self, *args, **options):
+        if not message_index.is_supported:
+            self.stdout.write(self.style.ERROR("Bu veritabanı tam metin aramayı desteklemiyor."))
+            return
+        
+        batch_size = options['batch_size']
+        
+        self.stdout.write("Mesaj arama indeksi yeniden oluşturuluyor...")
+        message_index.clear()
+        
+        group_count = self._index(
+            Message.objects.filter(group__isnull=False).exclude(message_type='system')
+            .only('id', 'group_id', 'message_type', 'content', 'created_at'),
+            index_message, batch_size
+        )
+        dm_count = self._index(
+            DirectMessageContent.objects.exclude(message_type='system')
+            .only('id', 'direct_message_id', 'message_type', 'content', 'sent_at'),
+            index_direct_message, batch_size
+        )
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"İndeksleme tamamlandı. {group_count} grup mesajı, {dm_count} direkt mesaj indekslendi."
+            )
+        )
+
+    def _index(self, queryset, index_func, batch_size):
+        count = 0
+        last_id = 0
+        while True:
+            batch = list(queryset.filter(id__gt=last_id).order_by('id')[:batch_size])
+            if not batch:
+                break
+            with transaction.atomic():
+                for message in batch:
+                    index_func(message)
+            count += len(batch)
+            last_id = batch[-1].id
+        return count
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from django.db.models import OuterRef, Subquery
+from communications.models import (
+    MessageGroup, Message, make_message_preview, refresh_github_link_flags
+)
+
+
+class Command(BaseCommand):
+    help = 'Mesaj gruplarının son mesaj özetlerini ve GitHub bağlantı bayraklarını yeniden hesaplar'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Tek seferde güncellenecek grup sayısı',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        
+        self.stdout.write("Son mesaj özetleri hesaplanıyor...")
+        
+        # Her grup için en son mesajın ID'sini tek sorguda bul
+        latest_message = Message.objects.filter(
+            group=OuterRef('pk')
+        ).order_by('-created_at', '-id').values('id')[:1]
+        group_last_ids = list(
+            MessageGroup.objects.annotate(
+                latest_message_id=Subquery(latest_message)
+            ).values_list('id', 'latest_message_id')
+        )
+        
+        updated_count = 0
+        for start in range(0, len(group_last_ids), batch_size):
+            batch = group_last_ids[start:start + batch_size]
+            last_messages = Message.objects.only('id', 'content', 'created_at').in_bulk(
+                [message_id for _, message_id in batch if message_id]
+            )
+            
+            groups = []
+            for group_id, message_id in batch:
+                last_message = last_messages.get(message_id)
+                groups.append(MessageGroup(
+                    id=group_id,
+                    last_message_id=message_id,
+                    last_message_at=last_message.created_at if last_message else None,
+                    last_message_preview=make_message_preview(last_message.content) if last_message else ''
+                ))
+            
+            MessageGroup.objects.bulk_update(
+                groups, ['last_message', 'last_message_at', 'last_message_preview']
+            )
+            updated_count += len(groups)
+        
+        linked_count = refresh_github_link_flags()
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{updated_count} adet mesaj grubunun özeti güncellendi. "
+                f"{linked_count} adet grubun GitHub bayrağı yeniden hesaplandı."
+            )
+        )
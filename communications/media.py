@@ -0,0 +1,172 @@
+"""
+Sohbet ve direkt mesaj eklerindeki görseller için medya işleme.
+
+Yüklenen her görsel için arka planda (Celery) sınırlı boyutta bir küçük
+resim ve web için optimize edilmiş bir kopya üretilir, boyutları kaydedilir.
+Sohbet ekranlarında küçük resim gösterilir; orijinal dosya tıklandığında
+açılır.
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp')
+
+# Sohbet içinde gösterilen küçük resim ve web kopyasının en büyük kenar uzunlukları
+THUMBNAIL_SIZE = getattr(settings, 'MESSAGE_THUMBNAIL_SIZE', 320)
+WEB_IMAGE_SIZE = getattr(settings, 'MESSAGE_WEB_IMAGE_SIZE', 1600)
+WEB_IMAGE_QUALITY = getattr(settings, 'MESSAGE_WEB_IMAGE_QUALITY', 82)
+
+# Bu boyutu aşan EXIF verisi orijinal dosyadan da temizlenir
+MAX_EXIF_BYTES = getattr(settings, 'MESSAGE_MAX_EXIF_BYTES', 16 * 1024)
+
+# İşlenmesine izin verilen en büyük piksel sayısı (sıkıştırma bombalarına karşı).
+# Görsel belleğe açılmadan önce başlıktaki boyutlarla kontrol edilir.
+MAX_IMAGE_PIXELS = getattr(settings, 'MESSAGE_MAX_IMAGE_PIXELS', 50_000_000)
+
+
+def is_image_attachment(message):
+    """Mesajın işlenebilir bir görsel eki olup olmadığını kontrol eder"""
+    if not message.file or message.message_type == 'system':
+        return False
+    return (
+        message.message_type == 'image'
+        or os.path.splitext(message.file.name)[1].lower() in IMAGE_EXTENSIONS
+    )
+
+
+def _variant_name(original_name, suffix):
+    base = os.path.splitext(os.path.basename(original_name))[0]
+    return f"{base}_{suffix}.jpg"
+
+
+def _to_rgb(image):
+    """Saydamlığı beyaz arka planla birleştirerek JPEG'e uygun hale getirir"""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def _render_variant(image, max_size):
+    """Görseli en büyük kenarı max_size olacak şekilde küçültür, EXIF'siz JPEG döndürür"""
+    variant = image.copy()
+    variant.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    variant.save(buffer, format='JPEG', quality=WEB_IMAGE_QUALITY, optimize=True, progressive=True)
+    return variant.size, ContentFile(buffer.getvalue())
+
+
+def _strip_oversized_exif(message, source):
+    """
+    Orijinal dosyadaki EXIF verisi çok büyükse dosyayı EXIF olmadan yeni bir
+    adla kaydeder ve yeni adı döndürür; aksi halde None döndürür. Yönlendirme
+    bilgisi kaybolmaması için önce görsele uygulanır. Eski dosya silinmez;
+    kayıt yeni adla güncellendikten sonra çağıran tarafından silinir.
+    """
+    exif = source.info.get('exif') or b''
+    if source.format != 'JPEG' or len(exif) <= MAX_EXIF_BYTES:
+        return None
+
+    orientation = source.getexif().get(0x0112, 1)
+    buffer = BytesIO()
+    if orientation == 1:
+        # Yeniden sıkıştırmadan kaynaklanan kalite kaybını önlemek için mevcut tablolar korunur
+        source.save(buffer, format='JPEG', quality='keep', exif=b'')
+    else:
+        ImageOps.exif_transpose(source).save(buffer, format='JPEG', quality=95, exif=b'')
+
+    # Aynı ad dolu olduğundan depolama benzersiz bir ad üretir
+    return message.file.storage.save(message.file.name, ContentFile(buffer.getvalue()))
+
+
+def process_message_image(message):
+    """
+    Mesaj ekindeki görsel için küçük resim ve web kopyası üretir.
+
+    Kaydedilecek alanları içeren bir sözlük döndürür; görsel açılamazsa
+    veya mesajda görsel yoksa None döndürür. Alanlar kaydedilmez, bu
+    işlem çağırana bırakılır. Sözlükte 'file' varsa orijinal dosya EXIF'siz
+    olarak yeni adla kaydedilmiştir; eski dosyayı kayıttan sonra silmek
+    çağırana aittir (bkz. replaced_files).
+    """
+    if not is_image_attachment(message):
+        return None
+
+    try:
+        with message.file.open('rb') as original:
+            source = Image.open(original)
+            width, height = source.size
+            if width * height > MAX_IMAGE_PIXELS:
+                logger.warning(f"Mesaj görseli çok büyük ({message.file.name}): {width}x{height}")
+                return None
+            source.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        logger.warning(f"Mesaj görseli işlenemedi ({message.file.name}): {str(e)}")
+        return None
+
+    stripped_name = _strip_oversized_exif(message, source)
+
+    image = _to_rgb(ImageOps.exif_transpose(source))
+    width, height = image.size
+
+    (thumb_width, thumb_height), thumbnail_content = _render_variant(image, THUMBNAIL_SIZE)
+    _, web_content = _render_variant(image, WEB_IMAGE_SIZE)
+
+    thumbnail_field = message._meta.get_field('thumbnail')
+    web_field = message._meta.get_field('web_image')
+    thumbnail_name = thumbnail_field.generate_filename(message, _variant_name(message.file.name, 'thumb'))
+    web_name = web_field.generate_filename(message, _variant_name(message.file.name, 'web'))
+
+    fields = {
+        'image_width': width,
+        'image_height': height,
+        'thumbnail': thumbnail_field.storage.save(thumbnail_name, thumbnail_content),
+        'thumbnail_width': thumb_width,
+        'thumbnail_height': thumb_height,
+        'web_image': web_field.storage.save(web_name, web_content),
+    }
+    if stripped_name:
+        fields['file'] = stripped_name
+    return fields
+
+
+def replaced_files(message, fields):
+    """
+    process_message_image sonucu kaydedildikten sonra silinebilecek eski
+    dosyalar: EXIF'i temizlenen orijinal ve yeniden işlemede eski kopyalar.
+    """
+    return [
+        getattr(message, field_name)
+        for field_name in ('file', 'thumbnail', 'web_image')
+        if field_name in fields and getattr(message, field_name)
+        and getattr(message, field_name).name != fields[field_name]
+    ]
+
+
+def attachment_data(message):
+    """JSON yanıtları için ek bilgilerini (küçük resim ve boyutlar dahil) hazırlar"""
+    if not message.file:
+        return {}
+    data = {
+        'file_url': message.get_file_url(),
+        'file_name': os.path.basename(message.file.name),
+        'message_type': message.message_type,
+    }
+    if message.thumbnail:
+        data.update({
+            'thumbnail_url': message.get_thumbnail_url(),
+            'thumbnail_width': message.thumbnail_width,
+            'thumbnail_height': message.thumbnail_height,
+        })
+    if message.web_image:
+        data['web_image_url'] = message.get_web_image_url()
+    return data
@@ -3,10 +3,13 @@ from django.conf import settings
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.db.models import Count
+from django.db import transaction
+from django.db.models import Count, F, Value
+from django.db.models.functions import Greatest
 import os
+from datetime import timedelta
 
 # Yeni direkt mesajlaşma sistemi için modeller
 class DirectMessage(models.Model):
@@ -70,23 +73,28 @@ class DirectMessage(models.Model):
             return self.user1
     
     def mark_as_read(self, user):
-        """Kullanıcı için mesajları okundu olarak işaretler"""
-        if user == self.user1 and self.user1_unread > 0:
-            self.user1_unread = 0
-            self.save(update_fields=['user1_unread'])
-            # İlgili içerikleri de okundu olarak işaretle
-            self.messages.filter(is_read=False, sender=self.user2).update(
-                is_read=True, 
-                read_at=timezone.now()
-            )
-        elif user == self.user2 and self.user2_unread > 0:
-            self.user2_unread = 0
-            self.save(update_fields=['user2_unread'])
-            # İlgili içerikleri de okundu olarak işaretle
-            self.messages.filter(is_read=False, sender=self.user1).update(
-                is_read=True, 
+        """
+        Kullanıcı için mesajları okundu olarak işaretler.
+        Sayaç sıfırlanmak yerine gerçekten okundu işaretlenen mesaj sayısı
+        kadar azaltılır; böylece aynı anda gelen yeni mesajlar kaybolmaz.
+        """
+        if user.pk == self.user1_id:
+            counter, other_user_id = 'user1_unread', self.user2_id
+        elif user.pk == self.user2_id:
+            counter, other_user_id = 'user2_unread', self.user1_id
+        else:
+            return
+        
+        with transaction.atomic():
+            marked = self.messages.filter(is_read=False, sender_id=other_user_id).update(
+                is_read=True,
                 read_at=timezone.now()
             )
+            if marked:
+                DirectMessage.objects.filter(pk=self.pk).update(
+                    **{counter: Greatest(F(counter) - marked, Value(0))}
+                )
+                setattr(self, counter, max(getattr(self, counter) - marked, 0))
     
     def get_unread_count(self, user):
         """Kullanıcı için okunmamış mesaj sayısını döndürür"""
@@ -134,6 +142,14 @@ class DirectMessageContent(models.Model):
     content = models.TextField(_('İçerik'))
     file = models.FileField(_('Dosya'), upload_to='uploads/direct_messages/', null=True, blank=True)
     
+    # Görsel ekler için arka planda üretilen küçük resim ve web kopyası
+    image_width = models.PositiveIntegerField(_('Görsel Genişliği'), null=True, blank=True)
+    image_height = models.PositiveIntegerField(_('Görsel Yüksekliği'), null=True, blank=True)
+    thumbnail = models.ImageField(_('Küçük Resim'), upload_to='uploads/direct_messages/thumbnails/', null=True, blank=True)
+    thumbnail_width = models.PositiveIntegerField(_('Küçük Resim Genişliği'), null=True, blank=True)
+    thumbnail_height = models.PositiveIntegerField(_('Küçük Resim Yüksekliği'), null=True, blank=True)
+    web_image = models.ImageField(_('Web Görseli'), upload_to='uploads/direct_messages/web/', null=True, blank=True)
+    
     # Okunma durumu
     is_read = models.BooleanField(_('Okundu'), default=False)
     read_at = models.DateTimeField(_('Okunma Tarihi'), null=True, blank=True)
@@ -149,30 +165,55 @@ class DirectMessageContent(models.Model):
     def __str__(self):
         return f"{self.sender}: {self.content[:50]}"
     
+    def get_file_url(self, variant=None):
+        """
+        Eki yetki kontrolüyle sunan adres (MEDIA_URL yerine). variant
+        'thumbnail' veya 'web' ise görselin küçük resmi veya web kopyası sunulur.
+        """
+        url = reverse('communications:direct_message_file', kwargs={'message_id': self.id})
+        return f"{url}?variant={variant}" if variant else url
+    
+    def get_thumbnail_url(self):
+        return self.get_file_url('thumbnail')
+    
+    def get_web_image_url(self):
+        return self.get_file_url('web')
+    
     def save(self, *args, **kwargs):
-        # Mesaj gönderildiğinde, karşı tarafın okunmamış mesaj sayısını arttır
-        is_new = self.pk is None
-        if is_new:
-            dm = self.direct_message
-            recipient = None
-            
-            if self.sender == dm.user1:
-                dm.user2_unread += 1
-                dm.save(update_fields=['user2_unread', 'updated_at'])
-                recipient = dm.user2
-            else:
-                dm.user1_unread += 1
-                dm.save(update_fields=['user1_unread', 'updated_at'])
-                recipient = dm.user1
-            
+        # Mesaj gönderildiğinde, karşı tarafın okunmamış mesaj sayısını
+        # veritabanında atomik olarak (F ifadesiyle) arttır
+        if self.pk is not None:
             super().save(*args, **kwargs)
-            
-            # Sistem mesajları için bildirim oluşturma
-            if self.message_type != 'system' and recipient:
-                # create_direct_message_notification fonksiyonunu çağır
-                create_direct_message_notification(self, recipient)
+            return
+        
+        dm = self.direct_message
+        if self.sender_id == dm.user1_id:
+            counter, recipient_id = 'user2_unread', dm.user2_id
         else:
+            counter, recipient_id = 'user1_unread', dm.user1_id
+        
+        with transaction.atomic():
             super().save(*args, **kwargs)
+            DirectMessage.objects.filter(pk=dm.pk).update(
+                **{counter: F(counter) + 1, 'updated_at': timezone.now()}
+            )
+        
+        # Bildirim, mesaj kaydedildikten sonra arka planda oluşturulur
+        if self.message_type != 'system':
+            message_id = self.pk
+            transaction.on_commit(
+                lambda: dispatch_direct_message_notification(message_id, recipient_id)
+            )
+
+LAST_MESSAGE_PREVIEW_LENGTH = 100
+
+
+def make_message_preview(content):
+    """Sohbet listesinde gösterilecek kısa mesaj önizlemesini oluşturur"""
+    content = ' '.join((content or '').split())
+    if len(content) > LAST_MESSAGE_PREVIEW_LENGTH:
+        content = content[:LAST_MESSAGE_PREVIEW_LENGTH - 3] + '...'
+    return content
 
 # Mevcut modeller devam ediyor
 class MessageGroup(models.Model):
@@ -219,6 +260,21 @@ class MessageGroup(models.Model):
         blank=True
     )
     
+    # Son mesaj özeti (sohbet listesi için mesaj eklenirken güncellenir)
+    last_message = models.ForeignKey(
+        'Message',
+        on_delete=models.SET_NULL,
+        related_name='+',
+        verbose_name=_('Son Mesaj'),
+        null=True,
+        blank=True
+    )
+    last_message_at = models.DateTimeField(_('Son Mesaj Tarihi'), null=True, blank=True, db_index=True)
+    last_message_preview = models.CharField(_('Son Mesaj Önizlemesi'), max_length=LAST_MESSAGE_PREVIEW_LENGTH, blank=True)
+    
+    # İlgili görev bir GitHub issue'ya bağlı mı (sohbet listesinde hariç tutulur)
+    is_github_linked = models.BooleanField(_('GitHub Bağlantılı'), default=False, db_index=True)
+    
     # Tarih bilgileri
     created_at = models.DateTimeField(_('Oluşturulma Tarihi'), auto_now_add=True)
     updated_at = models.DateTimeField(_('Güncellenme Tarihi'), auto_now=True)
@@ -230,6 +286,18 @@ class MessageGroup(models.Model):
     
     def __str__(self):
         return self.name
+    
+    def refresh_last_message(self):
+        """Son mesaj özetini mesajlardan yeniden hesaplar"""
+        last_message = self.messages.order_by('-created_at', '-id').first()
+        self.last_message = last_message
+        self.last_message_at = last_message.created_at if last_message else None
+        self.last_message_preview = make_message_preview(last_message.content) if last_message else ''
+        MessageGroup.objects.filter(pk=self.pk).update(
+            last_message=self.last_message,
+            last_message_at=self.last_message_at,
+            last_message_preview=self.last_message_preview
+        )
 
 class MessageGroupMember(models.Model):
     """
@@ -324,10 +392,21 @@ class Message(models.Model):
     content = models.TextField(_('İçerik'))
     file = models.FileField(_('Dosya'), upload_to='uploads/messages/', null=True, blank=True)
     
+    # Görsel ekler için arka planda üretilen küçük resim ve web kopyası
+    image_width = models.PositiveIntegerField(_('Görsel Genişliği'), null=True, blank=True)
+    image_height = models.PositiveIntegerField(_('Görsel Yüksekliği'), null=True, blank=True)
+    thumbnail = models.ImageField(_('Küçük Resim'), upload_to='uploads/messages/thumbnails/', null=True, blank=True)
+    thumbnail_width = models.PositiveIntegerField(_('Küçük Resim Genişliği'), null=True, blank=True)
+    thumbnail_height = models.PositiveIntegerField(_('Küçük Resim Yüksekliği'), null=True, blank=True)
+    web_image = models.ImageField(_('Web Görseli'), upload_to='uploads/messages/web/', null=True, blank=True)
+    
     # Okunma durumu (eski tip mesajlar için) - yeni tip mesajlarda MessageReadStatus kullanılır
     is_read = models.BooleanField(_('Okundu'), default=False)
     read_at = models.DateTimeField(_('Okunma Tarihi'), null=True, blank=True)
     
+    # Arşive taşınan okunma kayıtlarının sayısı (okunma göstergesi için)
+    archived_read_count = models.PositiveIntegerField(_('Arşivlenmiş Okunma Sayısı'), default=0)
+    
     # Tarih bilgileri
     created_at = models.DateTimeField(_('Oluşturulma Tarihi'), auto_now_add=True)
     updated_at = models.DateTimeField(_('Güncellenme Tarihi'), auto_now=True)
@@ -340,6 +419,20 @@ class Message(models.Model):
     def __str__(self):
         return f"Mesaj: {self.content[:50]}"
     
+    def get_file_url(self, variant=None):
+        """
+        Eki yetki kontrolüyle sunan adres (MEDIA_URL yerine). variant
+        'thumbnail' veya 'web' ise görselin küçük resmi veya web kopyası sunulur.
+        """
+        url = reverse('communications:message_file', kwargs={'message_id': self.id})
+        return f"{url}?variant={variant}" if variant else url
+    
+    def get_thumbnail_url(self):
+        return self.get_file_url('thumbnail')
+    
+    def get_web_image_url(self):
+        return self.get_file_url('web')
+    
     def mark_as_read(self):
         """Mesajı okundu olarak işaretler (eski tip mesajlar için)"""
         if not self.is_read:
@@ -447,12 +540,19 @@ class Notification(models.Model):
     is_read = models.BooleanField(_('Okundu'), default=False)
     read_at = models.DateTimeField(_('Okunma Tarihi'), null=True, blank=True)
     
+    # Birleştirme (aynı tür ve hedef için kısa sürede gelen bildirimler tek kayıtta toplanır)
+    coalesce_key = models.CharField(_('Birleştirme Anahtarı'), max_length=100, blank=True)
+    count = models.PositiveIntegerField(_('Olay Sayısı'), default=1)
+    
     created_at = models.DateTimeField(_('Oluşturulma Tarihi'), auto_now_add=True)
     
     class Meta:
         verbose_name = _('Bildirim')
         verbose_name_plural = _('Bildirimler')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['recipient', 'is_read', 'coalesce_key'], name='notification_coalesce_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -468,6 +568,72 @@ class Notification(models.Model):
         """Bildirime ait detay sayfasının URL'sini döndürür"""
         return reverse('communications:notification_detail', kwargs={'notification_id': self.id})
 
+class NotificationArchive(models.Model):
+    """
+    Eski ve okunmuş bildirimlerin arşivi. Her kayıt, bir kullanıcının
+    bir aydaki bildirimlerini sıkıştırılmış JSON olarak tutar.
+    """
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='notification_archives',
+        verbose_name=_('Alıcı')
+    )
+    month = models.DateField(_('Ay'))
+    item_count = models.PositiveIntegerField(_('Kayıt Sayısı'), default=0)
+    payload = models.BinaryField(_('Sıkıştırılmış Veri'))
+    created_at = models.DateTimeField(_('Arşivlenme Tarihi'), auto_now_add=True)
+    
+    class Meta:
+        verbose_name = _('Bildirim Arşivi')
+        verbose_name_plural = _('Bildirim Arşivleri')
+        ordering = ['-month', '-id']
+        indexes = [
+            models.Index(fields=['recipient', 'month'], name='notification_archive_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.recipient} - {self.month:%Y-%m} ({self.item_count})"
+    
+    def get_items(self):
+        """Arşivlenmiş bildirimleri sözlük listesi olarak döndürür"""
+        from communications.archive import unpack
+        return unpack(self.payload)
+
+class MessageReadStatusArchive(models.Model):
+    """
+    Eski mesajlara ait okunma kayıtlarının arşivi. Her kayıt, bir grubun
+    bir aydaki mesajlarına ait okunma kayıtlarını sıkıştırılmış JSON olarak tutar.
+    """
+    group = models.ForeignKey(
+        MessageGroup,
+        on_delete=models.CASCADE,
+        related_name='read_status_archives',
+        verbose_name=_('Grup'),
+        null=True,
+        blank=True
+    )
+    month = models.DateField(_('Ay'))
+    item_count = models.PositiveIntegerField(_('Kayıt Sayısı'), default=0)
+    payload = models.BinaryField(_('Sıkıştırılmış Veri'))
+    created_at = models.DateTimeField(_('Arşivlenme Tarihi'), auto_now_add=True)
+    
+    class Meta:
+        verbose_name = _('Mesaj Okunma Arşivi')
+        verbose_name_plural = _('Mesaj Okunma Arşivleri')
+        ordering = ['-month', '-id']
+        indexes = [
+            models.Index(fields=['group', 'month'], name='read_status_archive_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.group} - {self.month:%Y-%m} ({self.item_count})"
+    
+    def get_items(self):
+        """Arşivlenmiş okunma kayıtlarını sözlük listesi olarak döndürür"""
+        from communications.archive import unpack
+        return unpack(self.payload)
+
 @receiver(post_save, sender=Message)
 def handle_message_save(sender, instance, created, **kwargs):
     """
@@ -515,12 +681,256 @@ def handle_message_save(sender, instance, created, **kwargs):
         logger = logging.getLogger(__name__)
         logger.error(f"GitHub mesaj-yorum senkronizasyon hatası: {str(e)}")
 
+@receiver(post_save, sender=Message)
+def update_group_last_message(sender, instance, created, **kwargs):
+    """
+    Yeni mesaj eklendiğinde grubun son mesaj özetini tek bir UPDATE ile günceller.
+    Daha yeni bir mesaj zaten kaydedildiyse özet geriye alınmaz.
+    """
+    if not created or not instance.group_id:
+        return
+    
+    MessageGroup.objects.filter(
+        models.Q(last_message_at__isnull=True) | models.Q(last_message_at__lte=instance.created_at),
+        pk=instance.group_id
+    ).update(
+        last_message=instance,
+        last_message_at=instance.created_at,
+        last_message_preview=make_message_preview(instance.content)
+    )
+
+@receiver(post_delete, sender=Message)
+def handle_message_delete(sender, instance, **kwargs):
+    """Silinen mesaj grubun son mesajıysa özeti yeniden hesaplar"""
+    if not instance.group_id:
+        return
+    
+    # Son mesaj silindiğinde işaretçi SET_NULL ile boşalır, tarih ise dolu kalır
+    group = MessageGroup.objects.filter(
+        pk=instance.group_id,
+        last_message__isnull=True,
+        last_message_at__isnull=False
+    ).first()
+    if group:
+        group.refresh_last_message()
+
+@receiver(post_save, sender=Message)
+def index_message_for_search(sender, instance, **kwargs):
+    """Mesajı tam metin arama indeksinde günceller"""
+    from communications.search import safe_index, index_message
+    safe_index(index_message, instance)
+
+@receiver(post_delete, sender=Message)
+def remove_message_from_search(sender, instance, **kwargs):
+    """Silinen mesajı arama indeksinden çıkarır"""
+    from communications.search import safe_index, message_index, GROUP_MESSAGE
+    safe_index(message_index.delete, GROUP_MESSAGE, instance.pk)
+
+@receiver(post_save, sender=DirectMessageContent)
+def index_direct_message_for_search(sender, instance, **kwargs):
+    """Direkt mesajı tam metin arama indeksinde günceller"""
+    from communications.search import safe_index, index_direct_message
+    safe_index(index_direct_message, instance)
+
+@receiver(post_delete, sender=DirectMessageContent)
+def remove_direct_message_from_search(sender, instance, **kwargs):
+    """Silinen direkt mesajı arama indeksinden çıkarır"""
+    from communications.search import safe_index, message_index, DIRECT_MESSAGE
+    safe_index(message_index.delete, DIRECT_MESSAGE, instance.pk)
+
+@receiver(post_save, sender=Message)
+@receiver(post_save, sender=DirectMessageContent)
+def schedule_attachment_processing(sender, instance, created, **kwargs):
+    """Yeni görsel ekler için küçük resim üretimini işlem onaylandıktan sonra başlatır"""
+    from communications.media import is_image_attachment
+    if not created or not is_image_attachment(instance):
+        return
+    from communications.tasks import process_message_attachment
+    transaction.on_commit(
+        lambda: enqueue_task(process_message_attachment, sender._meta.label, instance.pk)
+    )
+
+def refresh_github_link_flags(task_ids=None):
+    """
+    Mesaj gruplarının GitHub bağlantı bayrağını ilgili görevlerin issue
+    durumuna göre toplu olarak günceller.
+    """
+    from github_integration.models import GitHubIssue
+    
+    groups = MessageGroup.objects.all()
+    if task_ids is not None:
+        # Bağlantısı kaldırılan görevleri de yakalamak için işaretli grupları dahil et
+        groups = groups.filter(models.Q(related_task_id__in=task_ids) | models.Q(is_github_linked=True))
+    
+    return groups.update(
+        is_github_linked=models.Exists(
+            GitHubIssue.objects.filter(task_id=models.OuterRef('related_task_id'))
+        )
+    )
+
+@receiver(post_save, sender=MessageGroup)
+def handle_message_group_created(sender, instance, created, **kwargs):
+    """Issue'su olan bir görev için sonradan açılan grubun bayrağını ayarlar"""
+    if created and instance.related_task_id:
+        refresh_github_link_flags([instance.related_task_id])
+
+@receiver(post_save, sender='github_integration.GitHubIssue')
+@receiver(post_delete, sender='github_integration.GitHubIssue')
+def handle_github_issue_change(sender, instance, **kwargs):
+    """GitHub issue bir göreve bağlandığında veya bağlantısı kaldırıldığında grupları günceller"""
+    refresh_github_link_flags([instance.task_id] if instance.task_id else [])
+
+# Birleştirilen bildirim türlerinin özetlerde görünen adları
+NOTIFICATION_KIND_LABELS = {
+    'group_message': _('grup mesajı'),
+    'direct_message': _('direkt mesaj'),
+    'task_status': _('görev durumu değişikliği'),
+    'task_comment': _('görev yorumu'),
+    'task_bulk': _('toplu görev güncellemesi'),
+    'deadline': _('yaklaşan teslim tarihi'),
+}
+
 # Yardımcı fonksiyonlar
+def make_coalesce_key(kind, related_message_group=None, related_task=None, related_project=None, target=None):
+    """Bildirim türü ve hedefinden birleştirme anahtarı üretir"""
+    if target is None:
+        if related_message_group is not None:
+            target = f"group:{related_message_group.pk}"
+        elif related_task is not None:
+            target = f"task:{related_task.pk}"
+        elif related_project is not None:
+            target = f"project:{related_project.pk}"
+        else:
+            target = '-'
+    return f"{kind}:{target}"[:100]
+
+def create_notification(recipient, title, content, kind=None, target=None, window=None, **fields):
+    """
+    Bildirim oluşturur. `kind` verilirse, aynı alıcı ve hedef için son
+    `window` saniye içinde oluşturulmuş okunmamış bildirim yeni bir kayıt
+    açmak yerine güncellenir ve sayacı artırılır.
+    
+    Yeni kayıt oluşturulduysa Notification nesnesini, mevcut kayıt
+    birleştirildiyse None döndürür.
+    """
+    if not kind:
+        return Notification.objects.create(recipient=recipient, title=title, content=content, **fields)
+    
+    if window is None:
+        window = getattr(settings, 'NOTIFICATION_COALESCE_WINDOW', 30 * 60)
+    key = make_coalesce_key(
+        kind,
+        related_message_group=fields.get('related_message_group'),
+        related_task=fields.get('related_task'),
+        related_project=fields.get('related_project'),
+        target=target
+    )
+    now = timezone.now()
+    
+    # Penceredeki en son okunmamış bildirimi tek UPDATE ile birleştir
+    latest = Notification.objects.filter(
+        recipient=recipient,
+        is_read=False,
+        coalesce_key=key,
+        created_at__gte=now - timedelta(seconds=window)
+    ).order_by('-created_at').values('pk')[:1]
+    # Birleştirilen kayıt son olayın türünü ve bağlantılarını taşır
+    merged = Notification.objects.filter(pk__in=models.Subquery(latest)).update(
+        title=title,
+        content=content,
+        sender=fields.get('sender'),
+        notification_type=fields.get('notification_type', Notification._meta.get_field('notification_type').default),
+        related_project=fields.get('related_project'),
+        related_task=fields.get('related_task'),
+        related_message_group=fields.get('related_message_group'),
+        count=models.F('count') + 1,
+        created_at=now
+    )
+    if merged:
+        return None
+    
+    return Notification.objects.create(
+        recipient=recipient,
+        title=title,
+        content=content,
+        coalesce_key=key,
+        **fields
+    )
+
+def bulk_create_notifications(notifications):
+    """
+    Hazırlanmış Notification nesnelerini toplu kaydeder. create_notification
+    gibi, aynı alıcı ve coalesce_key için birleştirme penceresinde okunmamış
+    bir bildirim varsa yeni kayıt açılmaz; o kayıt güncellenir ve sayacı
+    artırılır. Anahtarsız bildirimler olduğu gibi eklenir.
+    """
+    window = getattr(settings, 'NOTIFICATION_COALESCE_WINDOW', 30 * 60)
+    now = timezone.now()
+    keyed = [notification for notification in notifications if notification.coalesce_key]
+    
+    latest = {}
+    if keyed:
+        # Artan sırada okunduğu için her anahtarda en yeni kayıt kalır
+        for pk, recipient_id, key in Notification.objects.filter(
+            recipient_id__in={notification.recipient_id for notification in keyed},
+            coalesce_key__in={notification.coalesce_key for notification in keyed},
+            is_read=False,
+            created_at__gte=now - timedelta(seconds=window)
+        ).order_by('created_at', 'id').values_list('pk', 'recipient_id', 'coalesce_key'):
+            latest[(recipient_id, key)] = pk
+    
+    merged = []
+    created = []
+    for notification in notifications:
+        pk = latest.get((notification.recipient_id, notification.coalesce_key))
+        if pk is None:
+            created.append(notification)
+            continue
+        notification.pk = pk
+        notification.count = models.F('count') + 1
+        notification.created_at = now
+        merged.append(notification)
+    
+    Notification.objects.bulk_update(merged, [
+        'title', 'content', 'sender', 'notification_type', 'related_project',
+        'related_task', 'related_message_group', 'count', 'created_at',
+    ], batch_size=500)
+    Notification.objects.bulk_create(created, batch_size=1000)
+    return created
+
+def enqueue_task(task, *args, fallback=True):
+    """
+    Celery görevini kuyruğa gönderir. Kuyruğa ulaşılamazsa görev aynı
+    istek içinde çalıştırılır; fallback False ise yalnızca hata loglanır
+    (uzun süren veya zamanlanmış bir işle telafi edilen görevler için).
+    
+    Gönderim tekrar denenmez ve sonuç kaydedilmez; kısa zaman aşımlı ayrı
+    bir bağlantı kullanıldığından kuyruk veya sonuç deposu kapalıyken istek
+    bağlantı denemeleriyle bekletilmez. Worker ve beat'in genel kuyruk
+    ayarları değişmez.
+    """
+    try:
+        with task.app.connection_for_write(
+            connect_timeout=getattr(settings, 'TASK_ENQUEUE_CONNECT_TIMEOUT', 1),
+            transport_options={'max_retries': 0},
+        ) as connection:
+            task.apply_async(args, connection=connection, retry=False, ignore_result=True)
+    except Exception as e:
+        import logging
+        logger = logging.getLogger(__name__)
+        if not fallback:
+            logger.error(f"Görev kuyruğa gönderilemedi ({task.name}): {str(e)}")
+            return
+        logger.warning(f"Görev kuyruğa gönderilemedi, senkron çalıştırılıyor ({task.name}): {str(e)}")
+        task(*args)
+
+def dispatch_direct_message_notification(message_id, recipient_id):
+    """Direkt mesaj bildirimini arka planda oluşturulmak üzere kuyruğa gönderir"""
+    from communications.tasks import send_direct_message_notification
+    enqueue_task(send_direct_message_notification, message_id, recipient_id)
+
 def create_direct_message_notification(message, recipient):
     """DirectMessage için bildirim oluşturur"""
-    # İç içe import - circular import sorununu önlemek için
-    from communications.models import Notification
-    
     # Kısa mesaj içeriği oluştur
     short_content = message.content[:50]
     if len(message.content) > 50:
@@ -538,11 +948,13 @@ def create_direct_message_notification(message, recipient):
     else:
         title = "Yeni direkt mesaj"
     
-    # Bildirim oluştur
-    Notification.objects.create(
+    # Bildirim oluştur (aynı kişiden art arda gelen mesajlar tek bildirimde toplanır)
+    create_notification(
         recipient=recipient,
         sender=message.sender,
         title=title,
         content=short_content,
-        notification_type='info'
+        notification_type='info',
+        kind='direct_message',
+        target=f"user:{message.sender_id}"
     )
@@ -0,0 +1,310 @@
+"""
+Mesajlar için tam metin arama indeksi.
+
+Geliştirme ortamında SQLite FTS5 sanal tablosu, üretimde PostgreSQL
+tsvector + GIN indeksi kullanılır. İndeks, mesaj kaydedildiğinde ve
+silindiğinde sinyallerle artımlı olarak güncellenir.
+"""
+import logging
+import re
+import unicodedata
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.utils.html import escape
+
+logger = logging.getLogger(__name__)
+
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+# Vurgulanan parçanın eşleşmenin etrafında göstereceği kelime sayısı
+HIGHLIGHT_CONTEXT_WORDS = 12
+
+
+def fold_text(text):
+    """
+    Metni arama için normalleştirir: küçük harf, Türkçe ı/İ ayrımı ve
+    aksanlar kaldırılır. Böylece "TOPLANTI", "toplantı" ve "calis",
+    "çalış" ile eşleşir.
+    """
+    text = (text or '').replace('İ', 'i').replace('I', 'i').lower().replace('ı', 'i')
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+# SQLite'ta kayıtlar rowid = nesne ID * ROWID_KIND_SLOTS + tür kodu ile
+# anahtarlanır; UNINDEXED sütunlarda arama tüm tabloyu taradığı için
+# güncelleme ve silme rowid üzerinden yapılır.
+ROWID_KIND_SLOTS = 8
+
+
+class FullTextIndex:
+    """
+    (tür, nesne ID) anahtarıyla metin tutan basit bir ters indeks.
+    Her kayıt, erişim kısıtlaması için bir kapsayıcı ID'si (grup, DM vb.)
+    ve keyset sayfalama için bir zaman damgası taşır.
+
+    Tablo, migrate sonrasında create_table ile oluşturulur (bkz. apps.py).
+    """
+
+    def __init__(self, table, kinds, pg_config='simple'):
+        self.table = table
+        self.kinds = tuple(kinds)
+        self.pg_config = pg_config
+
+    @property
+    def vendor(self):
+        return connection.vendor
+
+    @property
+    def is_supported(self):
+        return self.vendor in ('sqlite', 'postgresql')
+
+    def rowid(self, kind, object_id):
+        return object_id * ROWID_KIND_SLOTS + self.kinds.index(kind) + 1
+
+    def table_statements(self, vendor):
+        """Tabloyu (yoksa) oluşturan SQL ifadeleri"""
+        if vendor == 'sqlite':
+            return [
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+                f"body, kind UNINDEXED, object_id UNINDEXED, container_id UNINDEXED, "
+                f"created UNINDEXED, tokenize='unicode61 remove_diacritics 2')"
+            ]
+        return [
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            f"kind varchar(16) NOT NULL, object_id bigint NOT NULL, "
+            f"container_id bigint NOT NULL, created double precision NOT NULL, "
+            f"body text NOT NULL, document tsvector NOT NULL, "
+            f"PRIMARY KEY (kind, object_id))",
+            *self.index_statements(),
+        ]
+
+    def index_statements(self):
+        return [
+            f"CREATE INDEX IF NOT EXISTS {self.table}_document_gin "
+            f"ON {self.table} USING GIN (document)",
+            f"CREATE INDEX IF NOT EXISTS {self.table}_container_idx "
+            f"ON {self.table} (kind, container_id)",
+        ]
+
+    def create_table(self, using=DEFAULT_DB_ALIAS):
+        """İndeks tablosunu (yoksa) oluşturur"""
+        db = connections[using]
+        if db.vendor not in ('sqlite', 'postgresql'):
+            return
+        with db.cursor() as cursor:
+            for statement in self.table_statements(db.vendor):
+                cursor.execute(statement)
+
+    def upsert(self, kind, object_id, container_id, created, body):
+        """Bir kaydı indekse ekler veya günceller"""
+        if not self.is_supported:
+            return
+        created_ts = created.timestamp()
+        body = fold_text(body)
+
+        with connection.cursor() as cursor:
+            if self.vendor == 'sqlite':
+                cursor.execute(
+                    f"INSERT OR REPLACE INTO {self.table} "
+                    f"(rowid, body, kind, object_id, container_id, created) "
+                    f"VALUES (%s, %s, %s, %s, %s, %s)",
+                    [self.rowid(kind, object_id), body, kind, object_id, container_id, created_ts]
+                )
+            else:
+                cursor.execute(
+                    f"INSERT INTO {self.table} (kind, object_id, container_id, created, body, document) "
+                    f"VALUES (%s, %s, %s, %s, %s, to_tsvector(%s, %s)) "
+                    f"ON CONFLICT (kind, object_id) DO UPDATE SET "
+                    f"container_id = EXCLUDED.container_id, created = EXCLUDED.created, "
+                    f"body = EXCLUDED.body, document = EXCLUDED.document",
+                    [kind, object_id, container_id, created_ts, body, self.pg_config, body]
+                )
+
+    def delete(self, kind, object_id):
+        """Bir kaydı indeksten siler"""
+        if not self.is_supported:
+            return
+        with connection.cursor() as cursor:
+            if self.vendor == 'sqlite':
+                cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", [self.rowid(kind, object_id)])
+            else:
+                cursor.execute(
+                    f"DELETE FROM {self.table} WHERE kind = %s AND object_id = %s",
+                    [kind, object_id]
+                )
+
+    def is_empty(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT 1 FROM {self.table} LIMIT 1")
+            return cursor.fetchone() is None
+
+    def move_container(self, kind, old_container_ids, new_container_id):
+        """Kayıtları toplu olarak başka bir kapsayıcıya taşır (grup birleştirme gibi)"""
+        old_container_ids = list(old_container_ids)
+        if not self.is_supported or not old_container_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(old_container_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {self.table} SET container_id = %s "
+                f"WHERE kind = %s AND container_id IN ({placeholders})",
+                [new_container_id, kind] + old_container_ids
+            )
+
+    def clear(self, kind=None):
+        """İndeksi (veya sadece bir türü) temizler"""
+        if not self.is_supported:
+            return
+        with connection.cursor() as cursor:
+            if kind:
+                cursor.execute(f"DELETE FROM {self.table} WHERE kind = %s", [kind])
+            else:
+                cursor.execute(f"DELETE FROM {self.table}")
+
+    def build_query(self, text):
+        """Kullanıcı girdisini önek eşleşmeli, güvenli bir arama ifadesine çevirir"""
+        terms = TERM_RE.findall(fold_text(text))
+        if not terms:
+            return None
+        if self.vendor == 'sqlite':
+            return ' '.join(f'"{term}"*' for term in terms)
+        return ' & '.join(f'{term}:*' for term in terms)
+
+    def search(self, text, containers, cursor=None, limit=20):
+        """
+        Erişilebilir kapsayıcılar içinde arama yapar ve en yeni sonuçları döndürür.
+
+        containers: {tür: [kapsayıcı ID'leri]} sözlüğü
+        cursor: bir önceki sayfanın son sonucundan üretilen (created, kind, object_id)
+
+        (kind, object_id, created) demetlerinin listesini döndürür.
+        """
+        query = self.build_query(text)
+        scopes = [(kind, list(ids)) for kind, ids in containers.items() if ids]
+        if not query or not scopes or not self.is_supported:
+            return []
+
+        if self.vendor == 'sqlite':
+            where = [f"{self.table} MATCH %s"]
+            params = [query]
+        else:
+            where = ["document @@ to_tsquery(%s, %s)"]
+            params = [self.pg_config, query]
+
+        scope_sql = []
+        for kind, ids in scopes:
+            placeholders = ', '.join(['%s'] * len(ids))
+            scope_sql.append(f"(kind = %s AND container_id IN ({placeholders}))")
+            params += [kind] + ids
+        where.append('(' + ' OR '.join(scope_sql) + ')')
+
+        if cursor:
+            created, kind, object_id = cursor
+            where.append(
+                "(created < %s OR (created = %s AND kind < %s) "
+                "OR (created = %s AND kind = %s AND object_id < %s))"
+            )
+            params += [created, created, kind, created, kind, object_id]
+
+        sql = (
+            f"SELECT kind, object_id, created FROM {self.table} "
+            f"WHERE {' AND '.join(where)} "
+            f"ORDER BY created DESC, kind DESC, object_id DESC LIMIT %s"
+        )
+        params.append(limit)
+
+        with connection.cursor() as db_cursor:
+            db_cursor.execute(sql, params)
+            return db_cursor.fetchall()
+
+
+def highlight(content, text):
+    """
+    Arama terimleriyle (önek olarak) eşleşen kelimeleri <mark> ile işaretler
+    ve ilk eşleşmenin çevresinden kısa, HTML'i kaçırılmış bir parça döndürür.
+    """
+    terms = TERM_RE.findall(fold_text(text))
+    words = list(TERM_RE.finditer(content or ''))
+    matched = [
+        index for index, word in enumerate(words)
+        if any(fold_text(word.group()).startswith(term) for term in terms)
+    ]
+    if not words:
+        return escape(content or '')
+
+    first = matched[0] if matched else 0
+    start_word = max(first - HIGHLIGHT_CONTEXT_WORDS // 2, 0)
+    end_word = min(start_word + HIGHLIGHT_CONTEXT_WORDS, len(words)) - 1
+    start = words[start_word].start() if start_word > 0 else 0
+    end = words[end_word].end() if end_word < len(words) - 1 else len(content)
+
+    parts = ['…'] if start > 0 else []
+    position = start
+    for index in matched:
+        word = words[index]
+        if word.start() < start or word.end() > end:
+            continue
+        parts.append(escape(content[position:word.start()]))
+        parts.append(f'<mark>{escape(word.group())}</mark>')
+        position = word.end()
+    parts.append(escape(content[position:end]))
+    if end < len(content):
+        parts.append('…')
+    return ''.join(parts)
+
+
+def encode_cursor(created, kind, object_id):
+    return f"{created!r}:{kind}:{object_id}"
+
+
+def decode_cursor(value):
+    """Geçersiz imleçlerde None döndürür"""
+    try:
+        created, kind, object_id = value.split(':')
+        return float(created), kind, int(object_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def timestamp_to_datetime(created):
+    return datetime.fromtimestamp(created, tz=dt_timezone.utc)
+
+
+GROUP_MESSAGE = 'group'
+DIRECT_MESSAGE = 'dm'
+
+message_index = FullTextIndex('communications_message_search', kinds=(GROUP_MESSAGE, DIRECT_MESSAGE))
+
+
+def create_search_tables(using=DEFAULT_DB_ALIAS, **kwargs):
+    """post_migrate: mesaj arama tablosunu oluşturur"""
+    message_index.create_table(using)
+
+
+def index_message(message):
+    """Grup mesajını indekse ekler (sistem mesajları aranmaz)"""
+    if not message.group_id or message.message_type == 'system':
+        message_index.delete(GROUP_MESSAGE, message.pk)
+        return
+    message_index.upsert(GROUP_MESSAGE, message.pk, message.group_id, message.created_at, message.content)
+
+
+def index_direct_message(message):
+    """Direkt mesaj içeriğini indekse ekler"""
+    if message.message_type == 'system':
+        message_index.delete(DIRECT_MESSAGE, message.pk)
+        return
+    message_index.upsert(
+        DIRECT_MESSAGE, message.pk, message.direct_message_id, message.sent_at, message.content
+    )
+
+
+def safe_index(func, *args):
+    """İndeks hatalarının mesaj gönderimini engellemesine izin vermez"""
+    try:
+        with transaction.atomic():
+            func(*args)
+    except Exception as e:
+        logger.error(f"Mesaj arama indeksi güncellenemedi: {str(e)}")
@@ -1,184 +1,251 @@
 from celery import shared_task
-from datetime import timedelta
+from datetime import datetime, time, timedelta
+from django.conf import settings
+from django.db.models import Count, Sum
 from django.utils import timezone
 
+PROJECT_DEADLINE_TITLE = "Yaklaşan Proje Teslim Tarihi"
+TASK_DEADLINE_TITLE = "Yaklaşan Görev Teslim Tarihi"
+
+
+def _deadline_message(days_left, name, prefix):
+    """Kalan gün sayısına göre teslim tarihi mesajını oluşturur"""
+    if days_left == 0:
+        return f"{prefix} teslim tarihi bugün: {name}"
+    elif days_left == 1:
+        return f"{prefix} teslim tarihi yarın: {name}"
+    return f"{prefix} teslimine {days_left} gün kaldı: {name}"
+
+
 @shared_task
 def check_approaching_deadlines():
     """
     Yaklaşan proje ve görev teslim tarihlerini kontrol eder ve bildirim oluşturur.
     
     Bu fonksiyon, önümüzdeki 3 gün içinde bitecek projeler ve görevler için
-    ilgili kullanıcılara bildirim gönderir.
+    ilgili kullanıcılara bildirim gönderir. Alıcı/hedef kümesi birkaç sorguda
+    hesaplanır, bugün zaten gönderilmiş bildirimler tek sorguda çıkarılır ve
+    kalanlar toplu olarak eklenir.
     """
     from projects.models import Project
     from tasks.models import Task
-    from communications.models import Notification
+    from communications.models import Notification, make_coalesce_key
     
     # Bugün ve 3 gün sonrası
-    today = timezone.now().date()
+    today = timezone.localdate()
     upcoming_days = today + timedelta(days=3)
     
-    notifications_created = 0
+    # (alıcı, proje, görev) -> bildirim içeriği
+    candidates = {}
     
-    # Projeler için kontrol
-    approaching_projects = Project.objects.filter(
-        end_date__range=[today, upcoming_days],
-        status__in=['active', 'planning']  # Tamamlanmış projeler
-    )
+    def add_candidate(recipient_id, project_id, task_id, content):
+        if recipient_id:
+            candidates.setdefault((recipient_id, project_id, task_id), content)
     
-    for project in approaching_projects:
-        # Proje yöneticisine bildirim
-        manager = project.manager
-        if manager:
-            days_left = (project.end_date - today).days
-            
-            # Son gün, yarın veya birkaç gün kaldıysa farklı mesajlar
-            if days_left == 0:
-                message = f"Projenin teslim tarihi bugün: {project.name}"
-            elif days_left == 1:
-                message = f"Projenin teslim tarihi yarın: {project.name}"
-            else:
-                message = f"Projenin teslimine {days_left} gün kaldı: {project.name}"
-                
-            # Bugün bildirimi zaten gönderilmiş mi kontrol et
-            if not Notification.objects.filter(
-                recipient=manager,
-                related_project=project,
-                title="Yaklaşan Proje Teslim Tarihi",
-                created_at__date=today
-            ).exists():
-                # Bildirim oluştur
-                Notification.objects.create(
-                    recipient=manager,
-                    title="Yaklaşan Proje Teslim Tarihi",
-                    content=message,
-                    notification_type="warning",
-                    related_project=project
-                )
-                notifications_created += 1
+    # Projeler için kontrol (tamamlanmamış projeler)
+    approaching_projects = {
+        project['id']: project
+        for project in Project.objects.filter(
+            end_date__range=[today, upcoming_days],
+            status__in=['not_started', 'in_progress', 'on_hold']
+        ).values('id', 'name', 'end_date', 'manager_id')
+    }
+    
+    team_memberships = Project.team_members.through.objects.filter(
+        project_id__in=approaching_projects.keys()
+    ).values_list('project_id', 'customuser_id')
+    
+    for project in approaching_projects.values():
+        days_left = (project['end_date'] - today).days
+        message = _deadline_message(days_left, project['name'], "Projenin")
         
-        # Proje ekibine bildirim
-        team_members = project.team_members.all()
-        for member in team_members:
-            if member != manager:  # Yöneticiye tekrar bildirim gönderme
-                days_left = (project.end_date - today).days
-                
-                if days_left == 0:
-                    message = f"Projenin teslim tarihi bugün: {project.name}"
-                elif days_left == 1:
-                    message = f"Projenin teslim tarihi yarın: {project.name}"
-                else:
-                    message = f"Projenin teslimine {days_left} gün kaldı: {project.name}"
-                
-                # Bugün bildirimi zaten gönderilmiş mi kontrol et
-                if not Notification.objects.filter(
-                    recipient=member,
-                    related_project=project,
-                    title="Yaklaşan Proje Teslim Tarihi",
-                    created_at__date=today
-                ).exists():
-                    Notification.objects.create(
-                        recipient=member,
-                        title="Yaklaşan Proje Teslim Tarihi",
-                        content=message,
-                        notification_type="warning",
-                        related_project=project
-                    )
-                    notifications_created += 1
-    
-    # Görevler için kontrol
+        # Proje yöneticisine bildirim
+        add_candidate(project['manager_id'], project['id'], None, message)
+    
+    # Proje ekibine bildirim (yönetici zaten eklendiyse tekrar eklenmez)
+    for project_id, member_id in team_memberships:
+        project = approaching_projects[project_id]
+        days_left = (project['end_date'] - today).days
+        add_candidate(member_id, project_id, None, _deadline_message(days_left, project['name'], "Projenin"))
+    
+    # Görevler için kontrol (tamamlanmamış görevler)
     approaching_tasks = Task.objects.filter(
         due_date__range=[today, upcoming_days],
-        status__in=['todo', 'in_progress', 'review']  # Tamamlanmamış görevler
-    )
+        status__in=['todo', 'in_progress', 'review']
+    ).values('id', 'title', 'due_date', 'project_id', 'assignee_id', 'creator_id', 'project__manager_id')
     
     for task in approaching_tasks:
+        days_left = (task['due_date'] - today).days
+        assignee_id = task['assignee_id']
+        creator_id = task['creator_id']
+        manager_id = task['project__manager_id']
+        
         # Görevin atandığı kişiye bildirim
-        assignee = task.assignee
-        if assignee:
-            days_left = (task.due_date - today).days
-            
-            if days_left == 0:
-                message = f"Görevin teslim tarihi bugün: {task.title}"
-            elif days_left == 1:
-                message = f"Görevin teslim tarihi yarın: {task.title}"
-            else:
-                message = f"Görevin teslimine {days_left} gün kaldı: {task.title}"
-            
-            # Bugün bildirimi zaten gönderilmiş mi kontrol et
-            if not Notification.objects.filter(
-                recipient=assignee,
-                related_task=task,
-                title="Yaklaşan Görev Teslim Tarihi",
-                created_at__date=today
-            ).exists():
-                Notification.objects.create(
-                    recipient=assignee,
-                    title="Yaklaşan Görev Teslim Tarihi",
-                    content=message,
-                    notification_type="warning",
-                    related_task=task,
-                    related_project=task.project
-                )
-                notifications_created += 1
+        add_candidate(
+            assignee_id, task['project_id'], task['id'],
+            _deadline_message(days_left, task['title'], "Görevin")
+        )
         
         # Görevin oluşturucusuna bildirim (eğer atanan kişiden farklıysa)
-        creator = task.created_by
-        if creator and creator != assignee:
-            days_left = (task.due_date - today).days
-            
-            if days_left == 0:
-                message = f"Oluşturduğunuz görevin teslim tarihi bugün: {task.title}"
-            elif days_left == 1:
-                message = f"Oluşturduğunuz görevin teslim tarihi yarın: {task.title}"
-            else:
-                message = f"Oluşturduğunuz görevin teslimine {days_left} gün kaldı: {task.title}"
-            
-            # Bugün bildirimi zaten gönderilmiş mi kontrol et
-            if not Notification.objects.filter(
-                recipient=creator,
-                related_task=task,
-                title="Yaklaşan Görev Teslim Tarihi",
-                created_at__date=today
-            ).exists():
-                Notification.objects.create(
-                    recipient=creator,
-                    title="Yaklaşan Görev Teslim Tarihi",
-                    content=message,
-                    notification_type="warning",
-                    related_task=task,
-                    related_project=task.project
-                )
-                notifications_created += 1
+        if creator_id != assignee_id:
+            add_candidate(
+                creator_id, task['project_id'], task['id'],
+                _deadline_message(days_left, task['title'], "Oluşturduğunuz görevin")
+            )
         
         # Proje yöneticisine bildirim (eğer atanan kişi ve oluşturucudan farklıysa)
-        if task.project and task.project.manager:
-            project_manager = task.project.manager
-            if project_manager != assignee and project_manager != creator:
-                days_left = (task.due_date - today).days
-                
-                if days_left == 0:
-                    message = f"Projenizin bir görevinin teslim tarihi bugün: {task.title}"
-                elif days_left == 1:
-                    message = f"Projenizin bir görevinin teslim tarihi yarın: {task.title}"
-                else:
-                    message = f"Projenizin bir görevinin teslimine {days_left} gün kaldı: {task.title}"
-                
-                # Bugün bildirimi zaten gönderilmiş mi kontrol et
-                if not Notification.objects.filter(
-                    recipient=project_manager,
-                    related_task=task,
-                    title="Yaklaşan Görev Teslim Tarihi",
-                    created_at__date=today
-                ).exists():
-                    Notification.objects.create(
-                        recipient=project_manager,
-                        title="Yaklaşan Görev Teslim Tarihi",
-                        content=message,
-                        notification_type="warning",
-                        related_task=task,
-                        related_project=task.project
-                    )
-                    notifications_created += 1
-    
-    return f"{notifications_created} adet yaklaşan teslim tarihi bildirimi oluşturuldu." 
\ No newline at end of file
+        if manager_id not in (assignee_id, creator_id):
+            add_candidate(
+                manager_id, task['project_id'], task['id'],
+                _deadline_message(days_left, task['title'], "Projenizin bir görevinin")
+            )
+    
+    if not candidates:
+        return "0 adet yaklaşan teslim tarihi bildirimi oluşturuldu."
+    
+    # Bugün zaten gönderilmiş bildirimleri tek sorguda bul
+    start_of_day = timezone.make_aware(datetime.combine(today, time.min))
+    already_sent = set()
+    for recipient_id, project_id, task_id, title in Notification.objects.filter(
+        created_at__gte=start_of_day,
+        title__in=[PROJECT_DEADLINE_TITLE, TASK_DEADLINE_TITLE]
+    ).values_list('recipient_id', 'related_project_id', 'related_task_id', 'title'):
+        target = f"task:{task_id}" if title == TASK_DEADLINE_TITLE else f"project:{project_id}"
+        already_sent.add((recipient_id, target))
+    
+    notifications = []
+    for (recipient_id, project_id, task_id), content in candidates.items():
+        target = f"task:{task_id}" if task_id else f"project:{project_id}"
+        if (recipient_id, target) in already_sent:
+            continue
+        
+        notifications.append(Notification(
+            recipient_id=recipient_id,
+            title=TASK_DEADLINE_TITLE if task_id else PROJECT_DEADLINE_TITLE,
+            content=content,
+            notification_type="warning",
+            related_project_id=project_id,
+            related_task_id=task_id,
+            coalesce_key=make_coalesce_key('deadline', target=target)
+        ))
+    
+    Notification.objects.bulk_create(notifications, batch_size=1000)
+    
+    return f"{len(notifications)} adet yaklaşan teslim tarihi bildirimi oluşturuldu."
+
+@shared_task
+def send_notification_digests():
+    """
+    Uzun süredir okunmamış bildirimleri kullanıcı başına tek bir özet
+    bildirimde toplar ve orijinal kayıtları okundu olarak işaretler.
+    
+    NOTIFICATION_DIGEST_ENABLED ayarı kapalıysa hiçbir şey yapmaz.
+    """
+    from communications.models import Notification, NOTIFICATION_KIND_LABELS
+    
+    if not getattr(settings, 'NOTIFICATION_DIGEST_ENABLED', False):
+        return "Bildirim özeti devre dışı."
+    
+    now = timezone.now()
+    cutoff = now - timedelta(hours=getattr(settings, 'NOTIFICATION_DIGEST_AFTER_HOURS', 24))
+    min_count = getattr(settings, 'NOTIFICATION_DIGEST_MIN_COUNT', 5)
+    
+    pending = Notification.objects.filter(
+        is_read=False,
+        created_at__lt=cutoff
+    ).exclude(
+        coalesce_key__startswith='digest:'
+    )
+    
+    # Alıcı ve bildirim türüne göre olay sayıları (tek sorgu)
+    summaries = {}
+    for row in pending.values('recipient_id', 'coalesce_key').annotate(
+        rows=Count('id'), events=Sum('count')
+    ):
+        kind = row['coalesce_key'].split(':', 1)[0] or 'other'
+        summary = summaries.setdefault(row['recipient_id'], {'rows': 0, 'kinds': {}})
+        summary['rows'] += row['rows']
+        summary['kinds'][kind] = summary['kinds'].get(kind, 0) + row['events']
+    
+    recipients = [recipient_id for recipient_id, summary in summaries.items() if summary['rows'] >= min_count]
+    if not recipients:
+        return "Özetlenecek bildirim bulunamadı."
+    
+    digests = []
+    for recipient_id in recipients:
+        kinds = summaries[recipient_id]['kinds']
+        total = sum(kinds.values())
+        parts = [
+            f"{count} {NOTIFICATION_KIND_LABELS.get(kind, 'diğer bildirim')}"
+            for kind, count in sorted(kinds.items(), key=lambda item: -item[1])
+        ]
+        digests.append(Notification(
+            recipient_id=recipient_id,
+            title=f"Bildirim özeti: {total} okunmamış olay",
+            content="Okunmamış bildirimleriniz özetlendi: " + ", ".join(parts) + ".",
+            notification_type='info',
+            coalesce_key='digest:-',
+            count=total
+        ))
+    
+    Notification.objects.bulk_create(digests)
+    archived = pending.filter(recipient_id__in=recipients).update(is_read=True, read_at=now)
+    
+    return f"{len(digests)} kullanıcı için özet oluşturuldu, {archived} bildirim özetlendi."
+
+@shared_task
+def send_direct_message_notification(message_id, recipient_id):
+    """
+    Direkt mesaj için alıcıya bildirim oluşturur. Mesaj gönderim
+    işleminin dışında, işlem onaylandıktan sonra çalıştırılır.
+    """
+    from accounts.models import CustomUser
+    from communications.models import DirectMessageContent, create_direct_message_notification
+    
+    message = DirectMessageContent.objects.select_related('sender').filter(pk=message_id).first()
+    recipient = CustomUser.objects.filter(pk=recipient_id).first()
+    if not message or not recipient:
+        return "Mesaj veya alıcı bulunamadı."
+    
+    create_direct_message_notification(message, recipient)
+    return "Bildirim oluşturuldu."
+
+@shared_task
+def process_message_attachment(model_label, message_id):
+    """
+    Mesaj ekindeki görsel için küçük resim ve web kopyası üretir,
+    boyutlarını kaydeder. model_label: 'communications.Message' veya
+    'communications.DirectMessageContent'
+    """
+    from django.apps import apps
+    from communications.media import process_message_image, replaced_files
+    
+    model = apps.get_model(model_label)
+    message = model.objects.filter(pk=message_id).first()
+    if not message:
+        return "Mesaj bulunamadı."
+    
+    fields = process_message_image(message)
+    if not fields:
+        return "İşlenecek görsel yok."
+    
+    # save() yerine update() kullanılır; mesaj sinyalleri tekrar tetiklenmez
+    model.objects.filter(pk=message_id).update(**fields)
+    # Eski dosyalar ancak kayıt yeni adlara geçtikten sonra silinir
+    for old_file in replaced_files(message, fields):
+        old_file.storage.delete(old_file.name)
+    return f"Görsel işlendi: {fields['image_width']}x{fields['image_height']}"
+
+@shared_task
+def archive_old_records():
+    """
+    Eski ve okunmuş bildirimleri ve eski mesajların okunma kayıtlarını
+    sıkıştırılmış arşiv tablolarına taşır.
+    """
+    from communications.archive import archive_read_notifications, archive_message_read_statuses
+    
+    notification_count = archive_read_notifications()
+    read_status_count = archive_message_read_statuses()
+    return (
+        f"{notification_count} bildirim ve {read_status_count} okunma kaydı arşivlendi."
+    )
@@ -1,3 +1,378 @@
-from django.test import TestCase
+import tempfile
+import threading
+from datetime import timedelta
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from .archive import archive_message_read_statuses, archive_read_notifications, get_archived_read_statuses
+from .models import (
+    DirectMessage, DirectMessageContent, Message, MessageGroup, MessageGroupMember, MessageReadStatus,
+    MessageReadStatusArchive, Notification, NotificationArchive, create_notification, enqueue_task,
+)
+from .tasks import (
+    archive_old_records, process_message_attachment, send_direct_message_notification, send_notification_digests,
+)
+from .search import DIRECT_MESSAGE, GROUP_MESSAGE, message_index
+
+
+class DirectMessageUnreadCounterTests(TestCase):
+    """Okunmamış mesaj sayaçlarının F ifadeleriyle güncellenmesi"""
+
+    def setUp(self):
+        User = get_user_model()
+        self.alice = User.objects.create_user(username='alice', password='test')
+        self.bob = User.objects.create_user(username='bob', password='test')
+        self.dm = DirectMessage.objects.create(user1=self.alice, user2=self.bob)
+
+    def test_stale_instances_do_not_lose_increments(self):
+        # Aynı sohbetin iki farklı (eski) kopyası üzerinden mesaj gönderilir
+        first = DirectMessage.objects.get(pk=self.dm.pk)
+        second = DirectMessage.objects.get(pk=self.dm.pk)
+        DirectMessageContent.objects.create(direct_message=first, sender=self.alice, content='1')
+        DirectMessageContent.objects.create(direct_message=second, sender=self.alice, content='2')
+        DirectMessageContent.objects.create(direct_message=second, sender=self.bob, content='3')
+
+        self.dm.refresh_from_db()
+        self.assertEqual(self.dm.user2_unread, 2)
+        self.assertEqual(self.dm.user1_unread, 1)
+
+    def test_concurrent_increment_is_not_overwritten(self):
+        # Kopya okunduktan sonra başka bir işlem sayacı arttırmış olsun
+        stale = DirectMessage.objects.get(pk=self.dm.pk)
+        DirectMessage.objects.filter(pk=self.dm.pk).update(user2_unread=5)
+        DirectMessageContent.objects.create(direct_message=stale, sender=self.alice, content='1')
+
+        self.dm.refresh_from_db()
+        self.assertEqual(self.dm.user2_unread, 6)
+
+    def test_mark_as_read_only_subtracts_marked_messages(self):
+        DirectMessageContent.objects.create(direct_message=self.dm, sender=self.alice, content='1')
+        DirectMessageContent.objects.create(direct_message=self.dm, sender=self.alice, content='2')
+        # Okuma sırasında gelen bir mesaj daha sayaca eklenmiş olsun
+        DirectMessage.objects.filter(pk=self.dm.pk).update(user2_unread=3)
+
+        self.dm.mark_as_read(self.bob)
+
+        self.dm.refresh_from_db()
+        self.assertEqual(self.dm.user2_unread, 1)
+        self.assertFalse(self.dm.messages.filter(is_read=False).exists())
+
+
+class DirectMessageConcurrencyTests(TransactionTestCase):
+    """Farklı iş parçacıklarından aynı anda gönderilen mesajlar"""
+
+    THREADS = 8
+    MESSAGES_PER_THREAD = 10
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest("Bellek içi SQLite test veritabanı iş parçacıkları arasında paylaşılamaz")
+
+    def test_parallel_sends_keep_counts(self):
+        User = get_user_model()
+        alice = User.objects.create_user(username='alice', password='test')
+        bob = User.objects.create_user(username='bob', password='test')
+        dm = DirectMessage.objects.create(user1=alice, user2=bob)
+        barrier = threading.Barrier(self.THREADS)
+        errors = []
+
+        def send(sender):
+            try:
+                # Her iş parçacığı sohbetin kendi kopyasıyla çalışır
+                conversation = DirectMessage.objects.get(pk=dm.pk)
+                barrier.wait()
+                for index in range(self.MESSAGES_PER_THREAD):
+                    DirectMessageContent.objects.create(
+                        direct_message=conversation, sender=sender, content=f'mesaj {index}'
+                    )
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=send, args=(alice if index % 2 else bob,))
+            for index in range(self.THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        dm.refresh_from_db()
+        per_side = self.THREADS // 2 * self.MESSAGES_PER_THREAD
+        self.assertEqual(dm.user1_unread, per_side)
+        self.assertEqual(dm.user2_unread, per_side)
+        self.assertEqual(DirectMessageContent.objects.filter(direct_message=dm).count(), per_side * 2)
+
+
+class MessageSearchIndexTests(TestCase):
+    """Mesaj arama indeksinin kayıt ve silmede güncellenmesi"""
+
+    def setUp(self):
+        User = get_user_model()
+        self.alice = User.objects.create_user(username='alice', password='test')
+        self.bob = User.objects.create_user(username='bob', password='test')
+        self.group = MessageGroup.objects.create(name='Ekip')
+        self.dm = DirectMessage.objects.create(user1=self.alice, user2=self.bob)
+
+    def search(self, text):
+        containers = {GROUP_MESSAGE: [self.group.pk], DIRECT_MESSAGE: [self.dm.pk]}
+        return [(kind, object_id) for kind, object_id, _ in message_index.search(text, containers)]
+
+    def test_edit_replaces_and_delete_removes_row(self):
+        message = Message.objects.create(sender=self.alice, group=self.group, content='Toplantı yarın')
+        direct = DirectMessageContent.objects.create(direct_message=self.dm, sender=self.bob, content='toplanti iptal')
+        self.assertEqual(self.search('toplanti'), [(DIRECT_MESSAGE, direct.pk), (GROUP_MESSAGE, message.pk)])
+
+        message.content = 'Sunum yarın'
+        message.save()
+        self.assertEqual(self.search('toplanti'), [(DIRECT_MESSAGE, direct.pk)])
+        self.assertEqual(self.search('sunum'), [(GROUP_MESSAGE, message.pk)])
+
+        # Aynı ID'li grup mesajı ve direkt mesaj ayrı satırlarda tutulur
+        direct.delete()
+        self.assertEqual(self.search('toplanti'), [])
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {message_index.table}")
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+
+@override_settings(NOTIFICATION_COALESCE_WINDOW=600)
+class NotificationCoalescingTests(TestCase):
+    """Aynı hedef için art arda gelen bildirimlerin birleştirilmesi ve özet"""
+
+    def setUp(self):
+        User = get_user_model()
+        self.alice = User.objects.create_user(username='alice', password='test')
+        self.bob = User.objects.create_user(username='bob', password='test')
+        self.group = MessageGroup.objects.create(name='Ekip')
+
+    def notify(self, title, **fields):
+        return create_notification(
+            recipient=self.alice, sender=self.bob, title=title, content=title,
+            kind='group_message', related_message_group=self.group, **fields
+        )
+
+    def test_merges_within_window(self):
+        first = self.notify('Bir', notification_type='info')
+        self.assertIsNone(self.notify('İki', notification_type='warning'))
+
+        first.refresh_from_db()
+        self.assertEqual(Notification.objects.count(), 1)
+        self.assertEqual((first.title, first.count, first.notification_type), ('İki', 2, 'warning'))
+        self.assertEqual(first.related_message_group, self.group)
+
+    def test_new_row_after_window_or_read(self):
+        first = self.notify('Bir')
+        Notification.objects.filter(pk=first.pk).update(created_at=timezone.now() - timedelta(seconds=601))
+        second = self.notify('İki')
+        self.assertIsNotNone(second)
+
+        second.is_read = True
+        second.save()
+        self.assertIsNotNone(self.notify('Üç'))
+        self.assertEqual(Notification.objects.filter(recipient=self.alice).count(), 3)
+
+    @override_settings(NOTIFICATION_DIGEST_ENABLED=True, NOTIFICATION_DIGEST_AFTER_HOURS=24, NOTIFICATION_DIGEST_MIN_COUNT=2)
+    def test_digest_summarises_old_unread(self):
+        self.notify('Grup')
+        self.notify('Grup')
+        create_notification(recipient=self.alice, title='DM', content='DM', kind='direct_message', target='user:2')
+        create_notification(recipient=self.bob, title='Tek', content='Tek', kind='direct_message', target='user:1')
+        Notification.objects.update(created_at=timezone.now() - timedelta(hours=25))
+        recent = self.notify('Yeni')
+
+        send_notification_digests()
+
+        digest = Notification.objects.get(coalesce_key='digest:-')
+        self.assertEqual((digest.recipient, digest.count), (self.alice, 3))
+        self.assertIn('2 grup mesajı', digest.content)
+        self.assertFalse(Notification.objects.filter(recipient=self.alice, is_read=False).exclude(
+            pk__in=[digest.pk, recent.pk]
+        ).exists())
+        # En az sayının altında kalan kullanıcı özetlenmez
+        self.assertFalse(Notification.objects.filter(recipient=self.bob, is_read=True).exists())
+
+
+class TaskEnqueueTests(TestCase):
+    """Arka plan görevleri bir kez kuyruğa gönderilmeli, kuyruk kapalıyken bir kez çalışmalı"""
+
+    def setUp(self):
+        User = get_user_model()
+        self.alice = User.objects.create_user(username='alice', password='test')
+        self.bob = User.objects.create_user(username='bob', password='test')
+        self.dm = DirectMessage.objects.create(user1=self.alice, user2=self.bob)
+
+    def test_published_once(self):
+        with mock.patch.object(send_direct_message_notification, 'apply_async') as apply_async, \
+                mock.patch.object(send_direct_message_notification, 'run') as run:
+            enqueue_task(send_direct_message_notification, 1, 2)
+        apply_async.assert_called_once_with((1, 2), connection=mock.ANY, retry=False, ignore_result=True)
+        run.assert_not_called()
+
+    def test_broker_down_notifies_once(self):
+        with mock.patch.object(send_direct_message_notification, 'apply_async', side_effect=ConnectionError), \
+                self.captureOnCommitCallbacks(execute=True):
+            DirectMessageContent.objects.create(direct_message=self.dm, sender=self.alice, content='Merhaba')
+        notification = Notification.objects.get(recipient=self.bob)
+        self.assertEqual(notification.count, 1)
+        self.assertFalse(Notification.objects.filter(recipient=self.alice).exists())
+
+
+def make_jpeg(size=(2000, 1000), exif_bytes=0):
+    exif = Image.Exif()
+    if exif_bytes:
+        exif[0x010e] = 'x' * exif_bytes  # ImageDescription
+    buffer = BytesIO()
+    Image.new('RGB', size, (200, 30, 30)).save(buffer, format='JPEG', exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class MessageImageProcessingTests(TestCase):
+    """Mesaj görselleri için küçük resim, web kopyası ve EXIF temizliği"""
+
+    def setUp(self):
+        User = get_user_model()
+        self.alice = User.objects.create_user(username='alice', password='test')
+        self.group = MessageGroup.objects.create(name='Ekip')
+
+    def send(self, content):
+        message = Message.objects.create(
+            sender=self.alice, group=self.group, content='', message_type='image',
+            file=SimpleUploadedFile('foto.jpg', content, content_type='image/jpeg'),
+        )
+        process_message_attachment('communications.Message', message.pk)
+        return Message.objects.get(pk=message.pk)
+
+    def test_generates_variants(self):
+        message = self.send(make_jpeg())
+        self.assertEqual((message.image_width, message.image_height), (2000, 1000))
+        self.assertEqual((message.thumbnail_width, message.thumbnail_height), (320, 160))
+        with Image.open(message.web_image.path) as web:
+            self.assertEqual(web.size, (1600, 800))
+
+        # Yeniden işlemede eski kopyalar yenileri kaydedildikten sonra silinir
+        old_thumbnail = message.thumbnail.name
+        process_message_attachment('communications.Message', message.pk)
+        message.refresh_from_db()
+        self.assertNotEqual(message.thumbnail.name, old_thumbnail)
+        self.assertTrue(message.thumbnail.storage.exists(message.thumbnail.name))
+        self.assertFalse(message.thumbnail.storage.exists(old_thumbnail))
+
+    def test_variants_served_only_to_members(self):
+        from .media import attachment_data
+
+        MessageGroupMember.objects.create(group=self.group, user=self.alice)
+        message = self.send(make_jpeg())
+        data = attachment_data(message)
+        self.assertEqual(data['thumbnail_url'], message.get_file_url('thumbnail'))
+        self.assertNotIn('/media/', data['web_image_url'])
+
+        self.client.force_login(self.alice)
+        response = self.client.get(data['thumbnail_url'])
+        self.assertEqual(response.status_code, 200)
+        with Image.open(BytesIO(b''.join(response.streaming_content))) as thumbnail:
+            self.assertEqual(thumbnail.size, (320, 160))
+
+        self.client.force_login(get_user_model().objects.create_user(username='outsider', password='test'))
+        self.assertEqual(self.client.get(data['web_image_url']).status_code, 404)
+
+    def test_strips_oversized_exif_without_losing_original(self):
+        original = Message.objects.create(
+            sender=self.alice, group=self.group, content='', message_type='image',
+            file=SimpleUploadedFile('foto.jpg', make_jpeg(exif_bytes=32 * 1024), content_type='image/jpeg'),
+        )
+        original_name = original.file.name
+        process_message_attachment('communications.Message', original.pk)
+
+        message = Message.objects.get(pk=original.pk)
+        self.assertNotEqual(message.file.name, original_name)
+        self.assertFalse(message.file.storage.exists(original_name))
+        with Image.open(message.file.path) as image:
+            self.assertEqual(image.size, (2000, 1000))
+            self.assertFalse(image.info.get('exif'))
+
+    def test_failed_save_keeps_original(self):
+        message = Message.objects.create(
+            sender=self.alice, group=self.group, content='', message_type='image',
+            file=SimpleUploadedFile('foto.jpg', make_jpeg(exif_bytes=32 * 1024), content_type='image/jpeg'),
+        )
+        with mock.patch('django.core.files.storage.FileSystemStorage.save', side_effect=OSError('disk dolu')):
+            with self.assertRaises(OSError):
+                process_message_attachment('communications.Message', message.pk)
+        message.refresh_from_db()
+        self.assertTrue(message.file.storage.exists(message.file.name))
+
+    def test_skips_images_over_pixel_limit(self):
+        with mock.patch('communications.media.MAX_IMAGE_PIXELS', 1000):
+            message = self.send(make_jpeg(size=(100, 100)))
+        self.assertFalse(message.thumbnail)
+        self.assertIsNone(message.image_width)
+
+
+class ArchiveTests(TestCase):
+    """Eski bildirimlerin ve okunma kayıtlarının arşive taşınması ve geri okunması"""
+
+    def setUp(self):
+        User = get_user_model()
+        self.alice = User.objects.create_user(username='alice', password='test')
+        self.bob = User.objects.create_user(username='bob', password='test')
+        self.group = MessageGroup.objects.create(name='Ekip')
+        for user in (self.alice, self.bob):
+            MessageGroupMember.objects.create(group=self.group, user=user)
+        self.old = timezone.now() - timedelta(days=400)
+
+    def test_notifications_round_trip_in_batches(self):
+        for index in range(5):
+            Notification.objects.create(recipient=self.alice, title=f'Eski {index}', content='-', is_read=True)
+        Notification.objects.create(recipient=self.alice, title='Okunmamış', content='-')
+        Notification.objects.create(recipient=self.alice, title='Yeni', content='-', is_read=True)
+        Notification.objects.exclude(title='Yeni').update(created_at=self.old)
+
+        self.assertEqual(archive_read_notifications(days=90, batch_size=2), 5)
+        self.assertEqual(sorted(Notification.objects.values_list('title', flat=True)), ['Okunmamış', 'Yeni'])
+        self.assertEqual(NotificationArchive.objects.count(), 3)
+
+        self.client.force_login(self.alice)
+        response = self.client.get(reverse('communications:notification_archive'))
+        self.assertEqual(response.context['months'][0]['total'], 5)
+        titles = [item['title'] for item in response.context['notifications_page']]
+        self.assertEqual(sorted(titles), [f'Eski {index}' for index in range(5)])
+        self.assertEqual(response.context['notifications_page'][0]['created_at'], self.old)
+
+    def test_read_statuses_keep_counts_after_archiving(self):
+        messages = [Message.objects.create(sender=self.bob, group=self.group, content=str(index)) for index in range(3)]
+        for message in messages:
+            MessageReadStatus.objects.create(message=message, user=self.alice, is_read=True, read_at=self.old)
+        MessageReadStatus.objects.create(message=messages[0], user=self.bob, is_read=True, read_at=self.old)
+        Message.objects.filter(group=self.group).update(created_at=self.old)
+
+        self.assertIn('4 okunma kaydı', archive_old_records())
+        self.assertFalse(MessageReadStatus.objects.exists())
+        self.assertEqual(MessageReadStatusArchive.objects.get().item_count, 4)
+        first = Message.objects.get(pk=messages[0].pk)
+        self.assertEqual(first.archived_read_count, 2)
+        self.assertEqual({item['user_id'] for item in get_archived_read_statuses(first)}, {self.alice.id, self.bob.id})
+
+        # Eski mesajlar tekrar yüklendiğinde arşivlenmiş okunma kayıtları yeniden oluşturulmaz
+        url = reverse('communications:load_more_messages', args=[self.group.id])
+        self.client.force_login(self.alice)
+        self.client.get(url, {'last_message_id': 0})
+        self.assertFalse(MessageReadStatus.objects.exists())
+
+        own = Message.objects.create(sender=self.alice, group=self.group, content='yeni')
+        self.client.force_login(self.bob)
+        data = self.client.get(url, {'last_message_id': 0}).json()
+        self.assertEqual([item['read_count'] for item in data['messages'] if item['is_sender']], [2, 1, 1])
+        self.assertEqual(MessageReadStatus.objects.get().message_id, own.id)
@@ -12,6 +12,7 @@ urlpatterns = [
     path('dm/<int:dm_id>/delete/', views.delete_direct_message, name='delete_direct_message'),
     path('api/dm/<int:dm_id>/messages/', views.load_more_direct_messages, name='load_more_direct_messages'),
     path('api/dm/unread-count/', views.get_unread_dm_count, name='get_unread_dm_count'),
+    path('dm/file/<int:message_id>/', views.direct_message_file, name='direct_message_file'),
     
     # Mevcut mesajlaşma sistemi URL'leri
     path('messages/', views.inbox, name='inbox'),
@@ -19,6 +20,7 @@ urlpatterns = [
     path('messages/<int:message_id>/', views.message_detail, name='message_detail'),
     path('messages/create/', views.message_create, name='message_create'),
     path('messages/<int:message_id>/delete/', views.message_delete, name='message_delete'),
+    path('messages/<int:message_id>/file/', views.message_file, name='message_file'),
 
     path('chat/', views.chat_list, name='chat_list'),
     path('chat/<int:group_id>/', views.chat_detail, name='chat_detail'),
@@ -34,8 +36,10 @@ urlpatterns = [
     path('api/unread-count/', views.get_unread_count, name='get_unread_count'),
     path('api/chat/<int:group_id>/messages/', views.load_more_messages, name='load_more_messages'),
     path('api/notifications/unread/', views.get_unread_notifications, name='get_unread_notifications'),
+    path('api/search/', views.search_messages, name='search_messages'),
 
     path('notifications/', views.notification_list, name='notification_list'),
+    path('notifications/archive/', views.notification_archive, name='notification_archive'),
     path('notifications/<int:notification_id>/', views.notification_detail, name='notification_detail'),
     path('notifications/mark-all-as-read/', views.mark_all_notifications_as_read, name='mark_all_notifications_as_read'),
 ] 
\ No newline at end of file
@@ -0,0 +1,79 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Max, Min
+
+from .models import Message, MessageGroup, MessageGroupMember, Notification
+from .search import message_index, safe_index, GROUP_MESSAGE
+
+DUPLICATE_WARNING = "Aranızda birden fazla sohbet tespit edildi. Tüm mesajlarınız artık burada toplanacak."
+
+
+def find_duplicate_direct_groups():
+    """
+    Aynı iki kullanıcı arasındaki tekrarlanan direkt mesaj gruplarını tek
+    bir gruplanmış sorgu ile bulur.
+    
+    {(küçük kullanıcı ID, büyük kullanıcı ID): [grup ID'leri, en yeniden eskiye]}
+    sözlüğü döndürür; sadece birden fazla grubu olan çiftler yer alır.
+    """
+    rows = MessageGroupMember.objects.filter(
+        group__type='direct'
+    ).values('group_id').annotate(
+        member_count=Count('user_id'),
+        low_user=Min('user_id'),
+        high_user=Max('user_id'),
+        created_at=Max('group__created_at')
+    ).filter(
+        member_count=2
+    ).values_list('group_id', 'low_user', 'high_user', 'created_at')
+    
+    pairs = defaultdict(list)
+    for group_id, low_user, high_user, created_at in rows:
+        pairs[(low_user, high_user)].append((created_at, group_id))
+    
+    return {
+        pair: [group_id for _, group_id in sorted(groups, reverse=True)]
+        for pair, groups in pairs.items()
+        if len(groups) > 1
+    }
+
+
+def merge_direct_groups(target_group_id, duplicate_group_ids, merge=True, warning_sender_id=None):
+    """
+    Tekrarlanan grupları hedef gruba birleştirir ve siler.
+    
+    Mesajlar kopyalanmak yerine toplu UPDATE ile taşınır; okunma durumları
+    ve yanıt ilişkileri mesajla birlikte korunur. Taşınan mesaj sayısını döndürür.
+    """
+    duplicate_group_ids = list(duplicate_group_ids)
+    moved = 0
+    
+    with transaction.atomic():
+        if merge:
+            moved = Message.objects.filter(group_id__in=duplicate_group_ids).update(group_id=target_group_id)
+            Notification.objects.filter(
+                related_message_group_id__in=duplicate_group_ids
+            ).update(related_message_group_id=target_group_id)
+            safe_index(message_index.move_container, GROUP_MESSAGE, duplicate_group_ids, target_group_id)
+            
+            # Bilgilendirme mesajı ekle (daha önce eklenmediyse)
+            if warning_sender_id and not Message.objects.filter(
+                group_id=target_group_id,
+                message_type='system',
+                content__contains='Aranızda birden fazla sohbet tespit edildi'
+            ).exists():
+                Message.objects.create(
+                    sender_id=warning_sender_id,
+                    group_id=target_group_id,
+                    message_type='system',
+                    content=DUPLICATE_WARNING
+                )
+        
+        MessageGroup.objects.filter(id__in=duplicate_group_ids).delete()
+        
+        target_group = MessageGroup.objects.filter(id=target_group_id).first()
+        if target_group:
+            target_group.refresh_last_message()
+    
+    return moved
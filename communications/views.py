@@ -1,7 +1,7 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, Max, Count, F, Subquery, OuterRef
+from django.db.models import Q, Count, F, Subquery, OuterRef
 from django.core.paginator import Paginator
 from django.utils import timezone
 from django.http import JsonResponse, HttpResponseForbidden
@@ -9,26 +9,34 @@ from django.urls import reverse
 import os
 from django import forms
 
+from config.files import serve_file
+
 from accounts.models import CustomUser
 from projects.models import Project
 from tasks.models import Task
 from .models import (
     Message, MessageGroup, MessageGroupMember, MessageReadStatus, 
-    Notification, DirectMessage, DirectMessageContent
+    Notification, DirectMessage, DirectMessageContent, create_notification
+)
+from .utils import find_duplicate_direct_groups, merge_direct_groups
+from .media import attachment_data
+from .archive import (
+    get_archived_notification_months, get_archived_notifications, get_archived_read_message_ids, parse_month,
+)
+from .search import (
+    message_index, GROUP_MESSAGE, DIRECT_MESSAGE,
+    highlight, encode_cursor, decode_cursor, timestamp_to_datetime
 )
 
 @login_required
 def inbox(request):
     """Kullanıcının gelen mesajlarını listeleyen view."""
-    # GitHub issue'larla ilişkili görevlerin ID'lerini al (exclude edilecek)
-    github_task_ids = Task.objects.filter(github_issue__isnull=False).values_list('id', flat=True)
-    
     # GitHub ile ilişkili olmayan mesajları al
     message_list = Message.objects.filter(
         recipient=request.user
     ).exclude(
         # Mesaj grubuna sahip ve bu grup GitHub issue ile ilişkili bir göreve ait mesajları hariç tut
-        group__related_task_id__in=github_task_ids
+        group__is_github_linked=True
     ).order_by('-created_at')
     
     paginator = Paginator(message_list, 10)  # Her sayfada 10 mesaj
@@ -49,15 +57,12 @@ def inbox(request):
 @login_required
 def sent(request):
     """Kullanıcının gönderdiği mesajları listeleyen view."""
-    # GitHub issue'larla ilişkili görevlerin ID'lerini al (exclude edilecek)
-    github_task_ids = Task.objects.filter(github_issue__isnull=False).values_list('id', flat=True)
-    
     # GitHub ile ilişkili olmayan mesajları al
     message_list = Message.objects.filter(
         sender=request.user
     ).exclude(
         # Mesaj grubuna sahip ve bu grup GitHub issue ile ilişkili bir göreve ait mesajları hariç tut
-        group__related_task_id__in=github_task_ids
+        group__is_github_linked=True
     ).order_by('-created_at')
     
     paginator = Paginator(message_list, 10)  # Her sayfada 10 mesaj
@@ -70,7 +75,7 @@ def sent(request):
         is_read=False
     ).exclude(
         # GitHub issue ile ilişkili mesajları hariç tut
-        group__related_task_id__in=github_task_ids
+        group__is_github_linked=True
     ).count()
     
     context = {
@@ -81,6 +86,43 @@ def sent(request):
     }
     return render(request, 'communications/message_list.html', context)
 
+def attachment_variant(message, request):
+    """?variant= parametresine göre ekin kendisi, küçük resmi veya web kopyası"""
+    variant = request.GET.get('variant')
+    if variant == 'thumbnail':
+        return message.thumbnail
+    if variant == 'web':
+        return message.web_image
+    return message.file
+
+@login_required
+def message_file(request, message_id):
+    """
+    Mesaj ekini akıtarak sunar. Gönderen, alıcı veya grubun üyesi erişebilir;
+    diğer kullanıcılar için ek yokmuş gibi 404 döner.
+    """
+    message_obj = get_object_or_404(
+        Message.objects.filter(
+            Q(sender=request.user) | Q(recipient=request.user) |
+            Q(group__in=MessageGroupMember.objects.filter(user=request.user).values('group_id'))
+        ),
+        id=message_id
+    )
+    return serve_file(request, attachment_variant(message_obj, request), as_attachment=request.GET.get('download') == '1')
+
+@login_required
+def direct_message_file(request, message_id):
+    """Direkt mesaj ekini akıtarak sunar; yalnızca mesajlaşmanın tarafları erişebilir"""
+    message = get_object_or_404(
+        DirectMessageContent.objects.filter(
+            direct_message__in=DirectMessage.objects.filter(
+                Q(user1=request.user) | Q(user2=request.user)
+            ).values('id')
+        ),
+        id=message_id
+    )
+    return serve_file(request, attachment_variant(message, request), as_attachment=request.GET.get('download') == '1')
+
 @login_required
 def message_detail(request, message_id):
     """Mesaj detayını gösteren view."""
@@ -203,27 +245,31 @@ def message_delete(request, message_id):
 @login_required
 def chat_list(request):
     """Kullanıcının mesaj gruplarını ve son mesajlarını listeleyen view."""
-    # GitHub issue'larla ilişkili görevlerin ID'lerini al (exclude edilecek)
-    github_task_ids = Task.objects.filter(github_issue__isnull=False).values_list('id', flat=True)
+    # Kullanıcının üye olduğu ve GitHub ile ilişkili olmayan tüm gruplar,
+    # mesaj eklenirken güncellenen son mesaj tarihine göre sıralı
+    user_groups = list(
+        MessageGroup.objects.filter(
+            members=request.user,
+            is_github_linked=False
+        ).select_related(
+            'last_message__sender'
+        ).prefetch_related(
+            'members'
+        ).order_by(F('last_message_at').desc(nulls_last=True))
+    )
     
-    # Kullanıcının üye olduğu ve GitHub ile ilişkili olmayan tüm gruplar
-    user_groups = MessageGroup.objects.filter(
-        members=request.user
-    ).exclude(
-        # GitHub issue ile ilişkili görevlerin mesaj gruplarını hariç tut
-        related_task_id__in=github_task_ids
-    ).annotate(
-        # Her grup için son mesaj tarihini bul
-        last_message_date=Max('messages__created_at'),
-        # Okunmamış mesaj sayısını bul
-        unread_count=Count(
-            'messages',
-            filter=Q(
-                messages__read_status__user=request.user,
-                messages__read_status__is_read=False
-            )
-        )
-    ).order_by('-last_message_date')
+    # Okunmamış mesaj sayılarını sadece okunmamış kayıtlar üzerinden tek sorguda topla
+    unread_counts = dict(
+        MessageReadStatus.objects.filter(
+            user=request.user,
+            is_read=False,
+            message__group__in=[group.id for group in user_groups]
+        ).values('message__group').annotate(
+            unread_count=Count('id')
+        ).values_list('message__group', 'unread_count')
+    )
+    for group in user_groups:
+        group.unread_count = unread_counts.get(group.id, 0)
     
     context = {
         'title': 'Mesajlar',
@@ -241,17 +287,19 @@ def chat_detail(request, group_id):
         messages.error(request, 'Bu mesaj grubuna erişim izniniz yok.')
         return redirect('communications:chat_list')
     
-    # Mesajları getir
-    messages_list = group.messages.all().order_by('created_at')
+    # Mesajları gönderen, yanıtlanan mesaj ve okunma sayılarıyla birlikte getir
+    messages_list = group.messages.select_related(
+        'sender', 'parent_message'
+    ).annotate(
+        read_status_count=Count('read_status') + F('archived_read_count')
+    ).order_by('created_at')
     
-    # Kullanıcı için tüm okunmamış mesajları okundu olarak işaretle
-    unread_statuses = MessageReadStatus.objects.filter(
+    # Kullanıcı için tüm okunmamış mesajları tek sorguda okundu olarak işaretle
+    MessageReadStatus.objects.filter(
         message__group=group,
         user=request.user,
         is_read=False
-    )
-    for status in unread_statuses:
-        status.mark_as_read()
+    ).update(is_read=True, read_at=timezone.now())
     
     # Grup üyelerini getir
     group_members = group.group_members.select_related('user').all()
@@ -343,8 +391,8 @@ def create_message(request, group_id):
                     else:
                         notification_content += f": {content}"
                     
-                    # Bildirim oluştur
-                    Notification.objects.create(
+                    # Bildirim oluştur (aynı gruptaki art arda mesajlar tek bildirimde toplanır)
+                    create_notification(
                         recipient=member,
                         sender=request.user,
                         title=notification_title,
@@ -352,7 +400,8 @@ def create_message(request, group_id):
                         notification_type="info",
                         related_message_group=group,
                         related_project=related_project,
-                        related_task=related_task
+                        related_task=related_task,
+                        kind='group_message'
                     )
         
         # Yanıt olarak, mesaj bilgilerini içeren HTML döndür
@@ -919,56 +968,11 @@ def clean_duplicate_direct_messages(request):
         messages.error(request, 'Bu işlemi yapma yetkiniz yok.')
         return redirect('communications:chat_list')
     
-    # Tüm kullanıcıları al
-    users = CustomUser.objects.all()
-    
+    # Tekrarlanan grupları tek sorguda bul, en yenisini tutup diğerlerini birleştir
     cleaned_count = 0
-    for user1 in users:
-        for user2 in users.filter(id__gt=user1.id):  # Her çifti sadece bir kez işle
-            # İki kullanıcı arasındaki tüm direkt mesaj gruplarını bul
-            direct_groups = MessageGroup.objects.filter(
-                type='direct',
-                members=user1
-            ).filter(
-                members=user2
-            ).annotate(
-                member_count=Count('members')
-            ).filter(
-                member_count=2
-            ).order_by('-created_at')
-            
-            # Eğer birden fazla grup varsa, en yenisini tutup diğerlerini temizle
-            if direct_groups.count() > 1:
-                # En yeni grubu al
-                newest_group = direct_groups.first()
-                
-                # Diğer grupları temizle
-                for group in direct_groups[1:]:
-                    # Silmeden önce mesajları yeni gruba taşı
-                    messages_to_move = Message.objects.filter(group=group)
-                    for msg in messages_to_move:
-                        new_msg = Message.objects.create(
-                            sender=msg.sender,
-                            group=newest_group,
-                            message_type=msg.message_type,
-                            content=msg.content,
-                            file=msg.file,
-                            created_at=msg.created_at,
-                            updated_at=msg.updated_at
-                        )
-                        
-                        # Okunma durumlarını da kopyala
-                        for status in msg.read_status.all():
-                            MessageReadStatus.objects.create(
-                                message=new_msg,
-                                user=status.user,
-                                is_read=status.is_read,
-                                read_at=status.read_at
-                            )
-                    
-                    # Grubu sil
-                    group.delete()
-                    cleaned_count += 1
+    for group_ids in find_duplicate_direct_groups().values():
+        merge_direct_groups(group_ids[0], group_ids[1:])
+        cleaned_count += len(group_ids) - 1
     
     messages.success(request, f'{cleaned_count} adet tekrarlanan direkt mesaj grubu temizlendi.')
     return redirect('communications:chat_list')
@@ -978,16 +982,13 @@ def clean_duplicate_direct_messages(request):
 @login_required
 def get_unread_count(request):
     """Okunmamış mesaj ve bildirim sayısını API olarak döndürür."""
-    # GitHub issue'larla ilişkili görevlerin ID'lerini al (exclude edilecek)
-    github_task_ids = Task.objects.filter(github_issue__isnull=False).values_list('id', flat=True)
-    
     # Okunmamış mesaj sayısı (GitHub ile ilişkili olmayan)
     unread_message_count = MessageReadStatus.objects.filter(
         user=request.user,
         is_read=False
     ).exclude(
         # GitHub issue ile ilişkili mesajları hariç tut
-        message__group__related_task_id__in=github_task_ids
+        message__group__is_github_linked=True
     ).count()
     
     # Okunmamış bildirim sayısı
@@ -1005,7 +1006,9 @@ def get_unread_count(request):
 def notification_list(request):
     """Kullanıcının bildirimlerini listeleyen view."""
     # Bildirimler
-    notifications = Notification.objects.filter(recipient=request.user).order_by('-created_at')
+    notifications = Notification.objects.filter(recipient=request.user).select_related(
+        'sender', 'related_project', 'related_task'
+    ).order_by('-created_at')
     
     # Sayfalama
     paginator = Paginator(notifications, 10)  # Her sayfada 10 bildirim
@@ -1022,6 +1025,29 @@ def notification_list(request):
     }
     return render(request, 'communications/notification_list.html', context)
 
+@login_required
+def notification_archive(request):
+    """Kullanıcının arşive taşınmış eski bildirimlerini ay ay gösteren view."""
+    months = get_archived_notification_months(request.user)
+    
+    selected_month = parse_month(request.GET.get('month'))
+    if not selected_month and months:
+        selected_month = months[0]['month']
+    
+    notifications = get_archived_notifications(request.user, selected_month) if selected_month else []
+    
+    # Sayfalama
+    paginator = Paginator(notifications, 20)
+    notifications_page = paginator.get_page(request.GET.get('page'))
+    
+    context = {
+        'title': 'Bildirim Arşivi',
+        'months': months,
+        'selected_month': selected_month,
+        'notifications_page': notifications_page,
+    }
+    return render(request, 'communications/notification_archive.html', context)
+
 @login_required
 def notification_detail(request, notification_id):
     """Bildirim detayını gösteren view."""
@@ -1135,24 +1161,52 @@ def load_more_messages(request, group_id):
     last_message_id = request.GET.get('last_message_id', 0)
     
     # Son mesaj ID'sinden sonraki mesajları al
-    new_messages = group.messages.filter(id__gt=last_message_id).order_by('created_at')
-    
+    new_messages = list(
+        group.messages.filter(id__gt=last_message_id)
+        .select_related('sender', 'parent_message')
+        .order_by('created_at')
+    )
+
+    # Başkalarının mesajlarını toplu olarak okundu işaretle
+    now = timezone.now()
+    incoming_ids = [m.id for m in new_messages if m.sender_id != request.user.id]
+    if incoming_ids:
+        MessageReadStatus.objects.filter(
+            message_id__in=incoming_ids,
+            user=request.user,
+            is_read=False
+        ).update(is_read=True, read_at=now)
+
+        # Okunma kaydı olmayan mesajlar için kayıtları tek seferde oluştur.
+        # Kaydı arşive taşınmış mesajlar zaten archived_read_count'ta sayılır.
+        existing_ids = set(MessageReadStatus.objects.filter(
+            message_id__in=incoming_ids,
+            user=request.user
+        ).values_list('message_id', flat=True))
+        missing_ids = set(incoming_ids) - existing_ids
+        missing = [m for m in new_messages if m.id in missing_ids]
+        existing_ids |= get_archived_read_message_ids(request.user, missing)
+        MessageReadStatus.objects.bulk_create([
+            MessageReadStatus(message_id=message_id, user=request.user, is_read=True, read_at=now)
+            for message_id in incoming_ids if message_id not in existing_ids
+        ], ignore_conflicts=True)
+
+    # Kendi mesajlarının okunma sayılarını tek sorguda topla
+    own_ids = [m.id for m in new_messages if m.sender_id == request.user.id]
+    read_counts = {}
+    total_members = 0
+    if own_ids:
+        read_counts = dict(
+            MessageReadStatus.objects.filter(message_id__in=own_ids, is_read=True)
+            .values('message_id')
+            .annotate(read_count=Count('id'))
+            .values_list('message_id', 'read_count')
+        )
+        total_members = group.members.count()
+
     messages_data = []
-    
+
     for message in new_messages:
-        # Mesaj okundu olarak işaretle
-        if message.sender != request.user:
-            if hasattr(message, 'read_status'):
-                status, created = MessageReadStatus.objects.get_or_create(
-                    message=message,
-                    user=request.user,
-                    defaults={'is_read': True, 'read_at': timezone.now()}
-                )
-                if not status.is_read:
-                    status.is_read = True
-                    status.read_at = timezone.now()
-                    status.save()
-        
         # Mesaj verisini hazırla
         message_data = {
             'id': message.id,
@@ -1170,19 +1224,95 @@ def load_more_messages(request, group_id):
         # Dosya varsa ekle
         if message.file:
             message_data['file'] = True
-            message_data['file_url'] = message.file.url
-            message_data['file_name'] = os.path.basename(message.file.name)
+            message_data.update(attachment_data(message))
         
         # Okunma durumunu ekle
-        if message.sender == request.user:
-            read_count = message.read_status.filter(is_read=True).count()
-            message_data['read_count'] = read_count
-            message_data['total_members'] = group.members.count()
+        if message.sender_id == request.user.id:
+            message_data['read_count'] = read_counts.get(message.id, 0) + message.archived_read_count
+            message_data['total_members'] = total_members
         
         messages_data.append(message_data)
     
     return JsonResponse({'messages': messages_data})
 
+@login_required
+def search_messages(request):
+    """
+    Kullanıcının üye olduğu gruplardaki ve direkt mesajlaşmalarındaki
+    mesajlarda tam metin arama yapan API endpoint'i.
+    Sonuçlar en yeniden eskiye, imleç (cursor) ile sayfalanarak döner.
+    """
+    query = request.GET.get('q', '').strip()
+    try:
+        limit = min(max(int(request.GET.get('limit', 20)), 1), 50)
+    except ValueError:
+        limit = 20
+    cursor = decode_cursor(request.GET.get('cursor'))
+    
+    if not query:
+        return JsonResponse({'results': [], 'next_cursor': None})
+    
+    # Kullanıcının erişebildiği grup ve direkt mesajlaşmalar
+    group_ids = list(MessageGroupMember.objects.filter(
+        user=request.user,
+        group__is_github_linked=False
+    ).values_list('group_id', flat=True))
+    dm_ids = list(DirectMessage.objects.filter(
+        Q(user1=request.user) | Q(user2=request.user)
+    ).values_list('id', flat=True))
+    
+    # Bir fazla kayıt çekerek sonraki sayfanın varlığını anla
+    rows = message_index.search(
+        query,
+        {GROUP_MESSAGE: group_ids, DIRECT_MESSAGE: dm_ids},
+        cursor=cursor,
+        limit=limit + 1
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    group_messages = Message.objects.select_related('sender', 'group').in_bulk(
+        [object_id for kind, object_id, _ in rows if kind == GROUP_MESSAGE]
+    )
+    direct_messages = DirectMessageContent.objects.select_related(
+        'sender', 'direct_message__user1', 'direct_message__user2'
+    ).in_bulk(
+        [object_id for kind, object_id, _ in rows if kind == DIRECT_MESSAGE]
+    )
+    
+    results = []
+    for kind, object_id, created in rows:
+        if kind == GROUP_MESSAGE:
+            message = group_messages.get(object_id)
+            if not message:
+                continue
+            container_name = message.group.name
+            url = reverse('communications:chat_detail', kwargs={'group_id': message.group_id})
+        else:
+            message = direct_messages.get(object_id)
+            if not message:
+                continue
+            other_user = message.direct_message.get_other_user(request.user)
+            container_name = other_user.get_full_name() or other_user.username
+            url = reverse('communications:direct_message_detail', kwargs={'dm_id': message.direct_message_id})
+        
+        results.append({
+            'type': kind,
+            'id': object_id,
+            'container': container_name,
+            'sender_name': message.sender.get_full_name() or message.sender.username,
+            'highlight': highlight(message.content, query),
+            'created_at': timezone.localtime(timestamp_to_datetime(created)).strftime('%d.%m.%Y %H:%M'),
+            'url': url,
+        })
+    
+    next_cursor = None
+    if has_more and rows:
+        kind, object_id, created = rows[-1]
+        next_cursor = encode_cursor(created, kind, object_id)
+    
+    return JsonResponse({'results': results, 'next_cursor': next_cursor})
+
 @login_required
 def get_unread_notifications(request):
     """
@@ -1210,6 +1340,7 @@ def get_unread_notifications(request):
             'title': notification.title,
             'content': notification.content,
             'notification_type': notification.notification_type,
+            'count': notification.count,
             'created_at': notification.created_at.strftime('%Y-%m-%d %H:%M:%S'),
             'url': notification.get_absolute_url(),
             'sender': notification.sender.get_full_name() if notification.sender else None,
@@ -1295,9 +1426,10 @@ def direct_message_detail(request, dm_id):
                     'message': {
                         'id': message.id,
                         'content': message.content,
-                        'file_url': message.file.url if message.file else None,
+                        'file_url': message.get_file_url() if message.file else None,
                         'file_name': os.path.basename(message.file.name) if message.file else None,
                         'message_type': message.message_type,
+                        **attachment_data(message),
                         'sent_at': message.sent_at.strftime('%H:%M'),
                         'is_sender': True
                     }
@@ -1453,9 +1585,7 @@ def load_more_direct_messages(request, dm_id):
         }
         
         if message.file:
-            message_data['file_url'] = message.file.url
-            message_data['file_name'] = os.path.basename(message.file.name)
-            message_data['message_type'] = message.message_type
+            message_data.update(attachment_data(message))
             
         messages_data.append(message_data)
     
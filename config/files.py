@@ -0,0 +1,188 @@
+"""
+Yetki kontrolünden geçen kullanıcı dosyalarının sunulması.
+
+serve_file, PRD dokümanları, proje/görev ekleri, satış dosyaları ve mesaj
+ekleri için ortak yanıtı üretir:
+
+- Dosya belleğe okunmaz; FileResponse ile parça parça akıtılır.
+- Tek aralıklı HTTP Range istekleri (PDF görüntüleyicilerde sayfa atlama,
+  video/ses ileri sarma) 206 Partial Content ile yanıtlanır.
+- ETag ve Last-Modified başlıkları gönderilir; If-None-Match /
+  If-Modified-Since ile değişmemiş dosyalar için 304 döner.
+- FILE_SERVE_MODE 'nginx' veya 'sendfile' ise dosya uygulama tarafından
+  okunmaz; X-Accel-Redirect veya X-Sendfile başlığıyla web sunucusuna
+  bırakılır (Range desteği sunucudan gelir).
+
+Yetki kontrolleri görünümlerde yapılır; bu modül yalnızca yanıtı hazırlar.
+Örnek nginx yapılandırması (FILE_SERVE_ACCEL_PREFIX = '/protected-media/'):
+
+    location /protected-media/ {
+        internal;
+        alias /path/to/media/;
+    }
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+# 'django': uygulama akıtır, 'nginx': X-Accel-Redirect, 'sendfile': X-Sendfile (Apache/lighttpd)
+FILE_SERVE_MODE = getattr(settings, 'FILE_SERVE_MODE', 'django')
+# nginx'te MEDIA_ROOT'a yönlendirilen "internal" konumun öneki
+FILE_SERVE_ACCEL_PREFIX = getattr(settings, 'FILE_SERVE_ACCEL_PREFIX', '/protected-media/')
+# Akıtılırken tek seferde okunan bayt sayısı
+FILE_SERVE_CHUNK_SIZE = getattr(settings, 'FILE_SERVE_CHUNK_SIZE', 64 * 1024)
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(ValueError):
+    """İstenen aralık dosyanın dışında"""
+
+
+def file_etag(size, mtime):
+    """Dosya boyutu ve değişiklik zamanından üretilen ETag"""
+    return f'"{size:x}-{int(mtime):x}"'
+
+
+def parse_range(header, size):
+    """
+    Range başlığını (başlangıç, bitiş) bayt çiftine çevirir (bitiş dahil).
+    Sözdizimi geçersizse veya birden fazla aralık istenmişse None döner ve
+    dosyanın tamamı gönderilir. Aralık dosyanın dışındaysa
+    RangeNotSatisfiable fırlatır.
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # Son N bayt
+        length = int(end)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable(header)
+        return max(size - length, 0), size - 1
+    start = int(start)
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    end = int(end) if end else size - 1
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def _if_range_matches(request, etag, last_modified):
+    """If-Range varsa yalnızca dosya değişmemişse kısmi yanıt verilir"""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def _read_range(file, start, length):
+    """Dosyanın bir bölümünü parça parça okur ve sonunda dosyayı kapatır"""
+    try:
+        file.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = file.read(min(FILE_SERVE_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def _offload_response(field_file, path, content_type, as_attachment, filename):
+    """Dosyanın gönderimini web sunucusuna bırakan boş yanıt"""
+    response = HttpResponse(content_type=content_type)
+    if FILE_SERVE_MODE == 'nginx':
+        response['X-Accel-Redirect'] = FILE_SERVE_ACCEL_PREFIX.rstrip('/') + '/' + quote(field_file.name)
+    else:
+        response['X-Sendfile'] = path
+    response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    return response
+
+
+def serve_file(request, field_file, filename=None, as_attachment=False, content_type=None):
+    """
+    Bir FileField dosyasını akıtarak döndürür. Dosya yoksa Http404 fırlatır.
+
+    filename: Content-Disposition'da görünen ad (varsayılan: dosyanın adı)
+    as_attachment: True ise tarayıcı dosyayı indirir, False ise içinde açar
+    """
+    if not field_file:
+        raise Http404("Dosya bulunamadı.")
+
+    storage = field_file.storage
+    filename = filename or os.path.basename(field_file.name)
+    try:
+        path = field_file.path
+    except NotImplementedError:
+        # Uzak depolama (S3 vb.)
+        path = None
+    try:
+        if path:
+            stat = os.stat(path)
+            size, mtime = stat.st_size, stat.st_mtime
+        else:
+            size = storage.size(field_file.name)
+            mtime = storage.get_modified_time(field_file.name).timestamp()
+    except (OSError, NotImplementedError):
+        raise Http404("Dosya bulunamadı.")
+
+    content_type = content_type or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    etag = file_etag(size, mtime)
+    last_modified = int(mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = _build_response(
+            request, field_file, path, size, etag, last_modified, content_type, as_attachment, filename
+        )
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Accept-Ranges'] = 'bytes'
+    # Dosyalar yetki kontrolünden geçtiği için paylaşılan önbelleklerde tutulmaz
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _build_response(request, field_file, path, size, etag, last_modified, content_type, as_attachment, filename):
+    if FILE_SERVE_MODE == 'nginx' or (FILE_SERVE_MODE == 'sendfile' and path):
+        return _offload_response(field_file, path, content_type, as_attachment, filename)
+
+    byte_range = None
+    range_header = request.META.get('HTTP_RANGE')
+    if range_header and request.method in ('GET', 'HEAD') and _if_range_matches(request, etag, last_modified):
+        try:
+            byte_range = parse_range(range_header, size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    # FieldFile'ın kendisi yerine depolamadan ayrı bir dosya nesnesi açılır
+    file = field_file.storage.open(field_file.name, 'rb')
+    if byte_range is None:
+        return FileResponse(file, as_attachment=as_attachment, filename=filename, content_type=content_type)
+
+    start, end = byte_range
+    length = end - start + 1
+    response = StreamingHttpResponse(_read_range(file, start, length), status=206, content_type=content_type)
+    response['Content-Length'] = str(length)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    return response
+
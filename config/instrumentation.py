@@ -0,0 +1,238 @@
+"""
+İstek başına performans ölçümü.
+
+RequestMetricsMiddleware her istek için veritabanı sorgu sayısını, toplam SQL
+süresini, önbellek isabet/ıskalarını ve şablon render süresini ölçer. Sonuçlar
+yapılandırılmış log olarak yazılır, isteğe bağlı olarak `Server-Timing`
+başlığıyla döndürülür ve settings.QUERY_BUDGETS içinde tanımlanan görünüm
+bazlı sorgu bütçeleriyle karşılaştırılır.
+
+Örnek:
+    QUERY_BUDGETS = {'dashboard:index': 15}
+"""
+import contextvars
+import json
+import logging
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.template.backends.django import Template as DjangoBackendTemplate
+
+logger = logging.getLogger('glichflow.performance')
+
+_current_metrics = contextvars.ContextVar('request_metrics', default=None)
+_MISSING = object()
+
+
+class QueryBudgetExceeded(Exception):
+    """Bir görünümün sorgu sayısı tanımlı bütçeyi aştığında (katı modda) fırlatılır"""
+
+
+class RequestMetrics:
+    """Tek bir isteğe ait ölçümler"""
+
+    def __init__(self):
+        self.query_count = 0
+        self.sql_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.render_time = 0.0
+        self.total_time = 0.0
+        self.view_name = None
+        self.query_budget = None
+
+    @property
+    def over_budget(self):
+        return self.query_budget is not None and self.query_count > self.query_budget
+
+    def as_dict(self):
+        return {
+            'view': self.view_name,
+            'queries': self.query_count,
+            'query_budget': self.query_budget,
+            'sql_ms': round(self.sql_time * 1000, 2),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'render_ms': round(self.render_time * 1000, 2),
+            'total_ms': round(self.total_time * 1000, 2),
+        }
+
+    def server_timing(self):
+        """Ölçümleri Server-Timing başlık değerine çevirir"""
+        return ', '.join([
+            f'db;dur={self.sql_time * 1000:.1f};desc="{self.query_count} queries"',
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+            f'render;dur={self.render_time * 1000:.1f}',
+            f'total;dur={self.total_time * 1000:.1f}',
+        ])
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.sql_time += time.perf_counter() - start
+        metrics.query_count += 1
+
+
+def _instrument_cache(cache):
+    """Önbellek nesnesinin get/get_many metodlarını isabet sayacak şekilde sarar (bir kez)"""
+    if getattr(cache, '_metrics_instrumented', False):
+        return
+    original_get = cache.get
+    original_get_many = cache.get_many
+
+    def get(key, default=None, version=None):
+        value = original_get(key, _MISSING, version=version)
+        metrics = _current_metrics.get()
+        if metrics is not None:
+            if value is _MISSING:
+                metrics.cache_misses += 1
+            else:
+                metrics.cache_hits += 1
+        return default if value is _MISSING else value
+
+    def get_many(keys, version=None):
+        keys = list(keys)
+        values = original_get_many(keys, version=version)
+        metrics = _current_metrics.get()
+        if metrics is not None:
+            metrics.cache_hits += len(values)
+            metrics.cache_misses += len(keys) - len(values)
+        return values
+
+    cache.get = get
+    cache.get_many = get_many
+    cache._metrics_instrumented = True
+
+
+def _instrument_template_render():
+    """Şablon render süresini ölçmek için Django şablon arka ucunu sarar (bir kez)"""
+    if getattr(DjangoBackendTemplate.render, '_metrics_instrumented', False):
+        return
+    original_render = DjangoBackendTemplate.render
+
+    @wraps(original_render)
+    def render(self, context=None, request=None):
+        metrics = _current_metrics.get()
+        if metrics is None:
+            return original_render(self, context, request)
+        start = time.perf_counter()
+        try:
+            return original_render(self, context, request)
+        finally:
+            metrics.render_time += time.perf_counter() - start
+
+    render._metrics_instrumented = True
+    DjangoBackendTemplate.render = render
+
+
+def get_query_budget(view_name):
+    return getattr(settings, 'QUERY_BUDGETS', {}).get(view_name)
+
+
+class RequestMetricsMiddleware:
+    """
+    İstek başına sorgu sayısı, SQL süresi, önbellek isabetleri ve render
+    süresini ölçer.
+
+    Ayarlar:
+        REQUEST_METRICS_HEADER: Server-Timing başlığı eklensin mi (varsayılan DEBUG)
+        QUERY_BUDGETS: {'uygulama:görünüm': en fazla sorgu sayısı}
+        QUERY_BUDGET_STRICT: bütçe aşıldığında QueryBudgetExceeded fırlatılsın mı
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        _instrument_template_render()
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        for alias in settings.CACHES:
+            _instrument_cache(caches[alias])
+
+        start = time.perf_counter()
+        try:
+            with _ExecuteWrappers():
+                response = self.get_response(request)
+        finally:
+            metrics.total_time = time.perf_counter() - start
+            _current_metrics.reset(token)
+
+        match = getattr(request, 'resolver_match', None)
+        metrics.view_name = match.view_name if match else None
+        metrics.query_budget = get_query_budget(metrics.view_name)
+
+        response.request_metrics = metrics
+        if getattr(settings, 'REQUEST_METRICS_HEADER', settings.DEBUG):
+            response['Server-Timing'] = metrics.server_timing()
+
+        self.log(request, response, metrics)
+
+        if metrics.over_budget and getattr(settings, 'QUERY_BUDGET_STRICT', False):
+            raise QueryBudgetExceeded(
+                f"{metrics.view_name}: {metrics.query_count} sorgu "
+                f"(bütçe: {metrics.query_budget})"
+            )
+        return response
+
+    def log(self, request, response, metrics):
+        data = metrics.as_dict()
+        data.update({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+        })
+        level = logging.WARNING if metrics.over_budget else logging.INFO
+        logger.log(level, json.dumps(data, ensure_ascii=False), extra={'request_metrics': data})
+
+
+class _ExecuteWrappers:
+    """Tüm veritabanı bağlantılarına sorgu ölçüm sarmalayıcısını ekler"""
+
+    def __enter__(self):
+        self._contexts = [
+            connection.execute_wrapper(_record_query) for connection in connections.all()
+        ]
+        for context in self._contexts:
+            context.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        for context in reversed(self._contexts):
+            context.__exit__(*exc_info)
+        return False
+
+
+class QueryBudgetTestMixin:
+    """
+    Testler için yardımcı: yanıtın sorgu bütçesine uyduğunu doğrular.
+
+        class DashboardTests(QueryBudgetTestMixin, TestCase):
+            def test_budget(self):
+                response = self.client.get(reverse('dashboard:index'))
+                self.assertWithinQueryBudget(response)
+    """
+
+    def assertWithinQueryBudget(self, response, max_queries=None):
+        metrics = getattr(response, 'request_metrics', None)
+        if metrics is None:
+            self.fail(
+                "Yanıtta ölçüm bulunamadı; RequestMetricsMiddleware etkin olmalıdır."
+            )
+        budget = max_queries if max_queries is not None else metrics.query_budget
+        if budget is None:
+            self.fail(f"{metrics.view_name} için QUERY_BUDGETS içinde bütçe tanımlı değil.")
+        self.assertLessEqual(
+            metrics.query_count,
+            budget,
+            f"{metrics.view_name} {metrics.query_count} sorgu çalıştırdı (bütçe: {budget})",
+        )
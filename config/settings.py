@@ -62,6 +62,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'config.instrumentation.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -74,6 +75,38 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'config.urls'
 
+# İstek ölçümleri (config.instrumentation)
+# Server-Timing başlığı yalnızca geliştirme ortamında eklenir
+REQUEST_METRICS_HEADER = DEBUG
+# Görünüm başına en fazla sorgu sayısı; aşılırsa uyarı loglanır,
+# QUERY_BUDGET_STRICT açıksa (testler gibi) istek hata verir
+QUERY_BUDGETS = {
+    'dashboard:index': 10,
+    'dashboard:personal_menu': 12,
+    'projects:project_list': 8,
+    'tasks:task_list': 10,
+    'communications:chat_list': 12,
+    'communications:chat_detail': 15,
+}
+QUERY_BUDGET_STRICT = False
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'glichflow.performance': {
+            'handlers': ['console'],
+            'level': 'INFO' if DEBUG else 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -204,8 +237,89 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'github_integration.tasks.sync_stale_issues',
         'schedule': crontab(hour=2, minute=0),  # Her gün saat 02:00'da çalışır
     },
+    
+    # Bildirim özeti (NOTIFICATION_DIGEST_ENABLED kapalıysa görev hiçbir şey yapmaz)
+    'send-notification-digests': {
+        'task': 'communications.tasks.send_notification_digests',
+        'schedule': crontab(hour=8, minute=30),  # Her gün saat 08:30'da çalışır
+    },
+    
+    # Eski bildirimlerin ve okunma kayıtlarının arşive taşınması
+    'archive-old-records': {
+        'task': 'communications.tasks.archive_old_records',
+        'schedule': crontab(hour=3, minute=30),  # Her gün saat 03:30'da çalışır
+    },
 }
 
+# Bildirim Ayarları
+# --------------------------------------------------
+# Aynı tür ve hedef için bu süre (saniye) içinde gelen okunmamış bildirimler tek kayıtta birleştirilir
+NOTIFICATION_COALESCE_WINDOW = 30 * 60
+# Günlük özet: bu süreden (saat) eski okunmamış bildirimler kullanıcı başına tek özet bildirimine dönüştürülür
+NOTIFICATION_DIGEST_ENABLED = False
+NOTIFICATION_DIGEST_AFTER_HOURS = 24
+NOTIFICATION_DIGEST_MIN_COUNT = 5
+# Arşivleme: bu süreden (gün) eski okunmuş bildirimler ve eski mesajların okunma kayıtları arşive taşınır
+NOTIFICATION_ARCHIVE_AFTER_DAYS = 90
+MESSAGE_READ_STATUS_ARCHIVE_AFTER_DAYS = 180
+ARCHIVE_BATCH_SIZE = 5000
+
+# Kullanıcı etiketlerinin istekler arası önbellekte tutulma süresi (saniye).
+# Önbellek sürümlü olarak geçersiz kılınır; süre yalnızca süreçler arası
+# paylaşılmayan önbelleklerde (LocMemCache) gecikmenin üst sınırıdır.
+USER_TAG_CACHE_TIMEOUT = 300
+
+# Ana panel istatistiklerinin önbellekte tutulma süresi (saniye). Proje, görev
+# ve ekip kayıtları değiştiğinde önbellek sürümlü olarak geçersiz kılınır.
+DASHBOARD_CACHE_TIMEOUT = 60
+# Kişisel menü: tabloda gösterilen en fazla görev, rapor tipi başına rapor
+# sayısı ve görev/proje/rapor bölümlerinin parça önbelleği süresi (saniye)
+PERSONAL_MENU_TASK_LIMIT = 50
+PERSONAL_MENU_REPORTS_PER_TYPE = 5
+PERSONAL_MENU_CACHE_TIMEOUT = 300
+
+# Üst menüdeki görev/proje/PRD arama kutusunda gösterilen en fazla sonuç
+SEARCH_RESULT_LIMIT = 8
+
+# Görev listesi: sayfa başına görev ve sayfa numarasıyla açılabilen son sayfa;
+# daha derin sayfalara imleçle (keyset) gidilir
+TASK_LIST_PAGE_SIZE = 50
+TASK_LIST_MAX_OFFSET_PAGES = 10
+
+# Görev bağımlılık planı: önbellek süresi (saniye), günlük çalışma saati ve
+# tahmini süresi girilmemiş görevler için varsayılan süre (saat)
+TASK_GRAPH_CACHE_TIMEOUT = 600
+TASK_GRAPH_HOURS_PER_DAY = 8
+TASK_GRAPH_DEFAULT_HOURS = 8
+
+# Alt görev ağacının yüklenebileceği en fazla derinlik (bozuk üst görev zincirlerine karşı)
+TASK_TREE_MAX_DEPTH = 20
+
+# Proje panosundaki kullanıcı sözlüğünün önbellekte tutulma süresi (saniye);
+# pano sürümü değiştiğinde ayrıca yenilenir
+TASK_BOARD_USERS_CACHE_TIMEOUT = 300
+
+# Toplu görev güncellemesinde tek istekte değiştirilebilecek en fazla görev sayısı
+TASK_BULK_MAX_TASKS = 500
+
+# Yetki kontrollü dosya sunumu (PRD, ekler, satış dosyaları, mesaj ekleri):
+# 'django' dosyayı uygulama akıtır; 'nginx' X-Accel-Redirect, 'sendfile'
+# X-Sendfile başlığıyla gönderimi web sunucusuna bırakır. nginx için
+# FILE_SERVE_ACCEL_PREFIX, MEDIA_ROOT'a bağlı "internal" bir konum olmalıdır.
+FILE_SERVE_MODE = 'django'
+FILE_SERVE_ACCEL_PREFIX = '/protected-media/'
+
+# Render edilmiş PRD Markdown dokümanlarının önbellekte tutulma süresi (saniye).
+# Anahtar içerik özetini içerdiği için yeni yüklenen doküman eski kaydı kullanmaz.
+PRD_MARKDOWN_CACHE_TIMEOUT = 30 * 24 * 60 * 60
+
+# Mesaj eklerindeki görseller için arka planda üretilen kopyalar (en büyük kenar, piksel)
+MESSAGE_THUMBNAIL_SIZE = 320
+MESSAGE_WEB_IMAGE_SIZE = 1600
+MESSAGE_WEB_IMAGE_QUALITY = 82
+# Bu boyutu (bayt) aşan EXIF verisi orijinal görselden temizlenir
+MESSAGE_MAX_EXIF_BYTES = 16 * 1024
+
 # GitHub Entegrasyonu Ayarları
 # --------------------------------------------------
 # GitHub OAuth için gerekli bilgiler
@@ -0,0 +1,235 @@
+import contextlib
+import io
+import json
+import logging
+import math
+import os
+import resource
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from communications.models import MessageGroup
+from reports.models import Report
+
+# Her rol için sayfalar bu rolde bir kullanıcıyla ölçülür
+ROLES = ('admin', 'project_manager', 'team_member', 'seller')
+
+
+def percentile(values, percent):
+    """Sıralı değerlerden en yakın sıra yöntemiyle yüzdelik döndürür"""
+    ordered = sorted(values)
+    index = max(0, math.ceil(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        'Ana sayfalar için uçtan uca performans ölçümü yapar (p50/p95 gecikme, sorgu sayısı, bellek). '
+        'Önce generate_synthetic_data ile veri üretin. '
+        'Örn: benchmark_pages --output bench.json --baseline baseline.json'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='Sayfa başına ölçülen istek sayısı')
+        parser.add_argument('--warmup', type=int, default=2, help='Ölçüm öncesi ısınma isteği sayısı')
+        parser.add_argument('--roles', default=','.join(ROLES), help='Virgülle ayrılmış roller')
+        parser.add_argument('--pages', help='Yalnızca bu sayfaları ölç (virgülle ayrılmış, örn: dashboard:index)')
+        parser.add_argument('--output', help='Sonuçların yazılacağı JSON dosyası')
+        parser.add_argument('--baseline', help='Karşılaştırılacak önceki JSON sonuç dosyası')
+        parser.add_argument('--threshold', type=float, default=20.0,
+                            help='p95 gecikmede gerileme sayılacak artış yüzdesi (varsayılan: 20)')
+        parser.add_argument('--fail-on-regression', action='store_true',
+                            help='Gerileme varsa hata koduyla çık')
+
+    def handle(self, *args, **options):
+        roles = [role.strip() for role in options['roles'].split(',') if role.strip()]
+        only_pages = {page.strip() for page in (options['pages'] or '').split(',') if page.strip()}
+
+        # Ölçüm sırasında istek başına performans logları (bütçe uyarıları dahil)
+        # bastırılır; sorgu sayıları zaten sonuç tablosunda yer alır
+        logging.getLogger('glichflow.performance').setLevel(logging.ERROR)
+
+        results = {}
+        for role in roles:
+            user = self.pick_user(role)
+            if not user:
+                self.stdout.write(self.style.WARNING(f"'{role}' rolünde kullanıcı bulunamadı, atlanıyor."))
+                continue
+            client = Client()
+            client.force_login(user)
+            for name, url in self.pages(user, role):
+                if only_pages and name not in only_pages:
+                    continue
+                key = f"{name}@{role}"
+                results[key] = self.measure(client, url, options['iterations'], options['warmup'])
+                self.report_line(key, results[key])
+
+        if not results:
+            raise CommandError('Ölçülecek sayfa bulunamadı. Önce generate_synthetic_data çalıştırın.')
+
+        data = {
+            'meta': {
+                'commit': self.git_commit(),
+                'created_at': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'iterations': options['iterations'],
+                'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            },
+            'results': results,
+        }
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(data, output, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"Sonuçlar {options['output']} dosyasına yazıldı."))
+
+        if options['baseline']:
+            regressions = self.compare(options['baseline'], results, options['threshold'])
+            if regressions and options['fail_on_regression']:
+                raise CommandError(f"{len(regressions)} sayfada performans gerilemesi var.")
+
+    # Kullanıcı ve sayfa seçimi
+
+    def pick_user(self, role):
+        """Rol için en çok veriye sahip (en kötü durum) kullanıcıyı seçer"""
+        users = CustomUser.objects.filter(is_active=True)
+        if role == 'seller':
+            users = users.filter(tags__name='seller')
+        else:
+            users = users.filter(role=role)
+        return users.annotate(
+            task_count=Count('assigned_tasks', distinct=True)
+        ).order_by('-task_count', 'id').first()
+
+    def pages(self, user, role):
+        today = timezone.localdate()
+        pages = [
+            ('dashboard:index', reverse('dashboard:index')),
+            ('dashboard:personal_menu', reverse('dashboard:personal_menu')),
+            ('tasks:task_list', reverse('tasks:task_list')),
+            ('projects:project_list', reverse('projects:project_list')),
+            ('communications:chat_list', reverse('communications:chat_list')),
+        ]
+
+        group = MessageGroup.objects.filter(members=user).annotate(
+            message_count=Count('messages')
+        ).order_by('-message_count').first()
+        if group:
+            pages.append(('communications:chat_detail', reverse('communications:chat_detail', args=[group.pk])))
+
+        report = Report.objects.filter(project__isnull=True).order_by('id').first() or Report.objects.order_by('id').first()
+        if report:
+            pages.append(('reports:report_detail', reverse('reports:report_detail', args=[report.pk])))
+
+        if role == 'seller':
+            pages.append(('sellers:revenue_report', reverse('sellers:revenue_report')))
+
+        start = today.replace(day=1)
+        end = start + timedelta(days=42)
+        pages.append((
+            'calendar:events_api',
+            f"{reverse('calendar:events_api')}?start={start.isoformat()}&end={end.isoformat()}"
+        ))
+        return pages
+
+    # Ölçüm
+
+    def measure(self, client, url, iterations, warmup):
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(warmup):
+                client.get(url)
+
+            timings = []
+            queries = []
+            status = None
+            for _ in range(iterations):
+                start = time.perf_counter()
+                response, query_count = self.request(client, url)
+                timings.append((time.perf_counter() - start) * 1000)
+                queries.append(query_count)
+                status = response.status_code
+
+            # Bellek ölçümü ayrı bir istekte yapılır; tracemalloc gecikmeyi etkiler
+            tracemalloc.start()
+            client.get(url)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        return {
+            'url': url,
+            'status': status,
+            'p50_ms': round(statistics.median(timings), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'mean_ms': round(statistics.mean(timings), 2),
+            'queries': max(queries),
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+
+    def request(self, client, url):
+        """İsteği yapar; sorgu sayısını ölçüm ara katmanından, yoksa doğrudan sayarak alır"""
+        if 'config.instrumentation.RequestMetricsMiddleware' in settings.MIDDLEWARE:
+            response = client.get(url)
+            metrics = getattr(response, 'request_metrics', None)
+            if metrics is not None:
+                return response, metrics.query_count
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        return response, len(context.captured_queries)
+
+    # Raporlama
+
+    def report_line(self, key, result):
+        style = self.style.SUCCESS if result['status'] == 200 else self.style.WARNING
+        self.stdout.write(style(
+            f"{key:<45} {result['status']}  p50 {result['p50_ms']:>8.1f} ms  "
+            f"p95 {result['p95_ms']:>8.1f} ms  {result['queries']:>5} sorgu  "
+            f"{result['peak_memory_kb']:>9.1f} KB"
+        ))
+
+    def compare(self, baseline_path, results, threshold):
+        if not os.path.exists(baseline_path):
+            raise CommandError(f"Karşılaştırma dosyası bulunamadı: {baseline_path}")
+        with open(baseline_path, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+
+        self.stdout.write(f"\nKarşılaştırma: {baseline['meta'].get('commit') or baseline_path}")
+        regressions = []
+        for key, result in results.items():
+            previous = baseline['results'].get(key)
+            if not previous:
+                continue
+            p95_change = (result['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100 if previous['p95_ms'] else 0
+            query_change = result['queries'] - previous['queries']
+            regressed = p95_change > threshold or query_change > 0
+            line = (
+                f"{key:<45} p95 {previous['p95_ms']:>8.1f} -> {result['p95_ms']:>8.1f} ms ({p95_change:+.0f}%)  "
+                f"sorgu {previous['queries']} -> {result['queries']}"
+            )
+            if regressed:
+                regressions.append(key)
+                self.stdout.write(self.style.ERROR(line + '  GERİLEME'))
+            else:
+                self.stdout.write(line)
+        return regressions
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
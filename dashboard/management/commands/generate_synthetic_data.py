@@ -0,0 +1,718 @@
+import math
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, time as dt_time, timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import CustomUser, Tag
+from articles.models import Article
+from calendar_app.models import CalendarEvent
+from communications.models import (
+    MessageGroup, MessageGroupMember, Message, MessageReadStatus,
+    DirectMessage, DirectMessageContent, Notification
+)
+from projects.models import Project
+from reports.models import Report
+from sellers.models import Customer, ProjectSale
+from tasks.models import Task, TimeLog
+
+# Sentetik kullanıcıların kullanıcı adı öneki; --flush bu önekle eşleşen verileri siler
+SYNTHETIC_PREFIX = 'synth_'
+
+SCALES = {
+    'small': {
+        'users': 50, 'projects': 20, 'tasks': 2_000, 'timelogs': 5_000,
+        'groups': 30, 'messages': 20_000, 'direct_chats': 60, 'direct_messages': 5_000,
+        'notifications': 5_000, 'sales': 100, 'events': 2_000, 'articles': 100, 'reports': 10,
+    },
+    'medium': {
+        'users': 200, 'projects': 200, 'tasks': 20_000, 'timelogs': 60_000,
+        'groups': 150, 'messages': 500_000, 'direct_chats': 600, 'direct_messages': 100_000,
+        'notifications': 100_000, 'sales': 1_000, 'events': 20_000, 'articles': 500, 'reports': 50,
+    },
+    'large': {
+        'users': 1_000, 'projects': 2_000, 'tasks': 100_000, 'timelogs': 300_000,
+        'groups': 600, 'messages': 5_000_000, 'direct_chats': 3_000, 'direct_messages': 1_000_000,
+        'notifications': 500_000, 'sales': 5_000, 'events': 100_000, 'articles': 2_000, 'reports': 200,
+    },
+}
+
+FIRST_NAMES = (
+    'Ahmet', 'Mehmet', 'Ayşe', 'Fatma', 'Emre', 'Zeynep', 'Can', 'Elif', 'Burak', 'Selin',
+    'Murat', 'Deniz', 'Ece', 'Kerem', 'Gizem', 'Oğuz', 'İrem', 'Barış', 'Şule', 'Tolga',
+)
+LAST_NAMES = (
+    'Yılmaz', 'Kaya', 'Demir', 'Şahin', 'Çelik', 'Yıldız', 'Öztürk', 'Aydın', 'Arslan', 'Doğan',
+    'Kılıç', 'Aslan', 'Çetin', 'Koç', 'Kurt', 'Özdemir', 'Şimşek', 'Polat', 'Erdoğan', 'Güneş',
+)
+DEPARTMENTS = ('Yazılım', 'Tasarım', 'Pazarlama', 'Satış', 'Muhasebe', 'Destek', 'Ürün')
+PROJECT_WORDS = (
+    'Portal', 'Mobil', 'Ödeme', 'Raporlama', 'Entegrasyon', 'Altyapı', 'Kampanya', 'Müşteri',
+    'Stok', 'Analitik', 'Arama', 'Bildirim', 'Fatura', 'Sipariş', 'Panel', 'Güvenlik',
+)
+TASK_VERBS = (
+    'Tasarla', 'Geliştir', 'Test et', 'Gözden geçir', 'Belgele', 'Düzelt', 'Optimize et',
+    'Yayına al', 'Planla', 'Analiz et',
+)
+TASK_OBJECTS = (
+    'giriş ekranı', 'API uç noktası', 'veritabanı şeması', 'rapor sayfası', 'ödeme akışı',
+    'bildirim servisi', 'arama özelliği', 'yetkilendirme', 'önbellek katmanı', 'dosya yükleme',
+    'e-posta şablonu', 'dashboard grafikleri', 'mobil görünüm', 'CI hattı', 'yedekleme betiği',
+)
+WORDS = (
+    'proje', 'görev', 'toplantı', 'tasarım', 'test', 'hata', 'sürüm', 'müşteri', 'rapor', 'plan',
+    'bugün', 'yarın', 'hafta', 'tamam', 'kontrol', 'güncelleme', 'öneri', 'çalışma', 'teslim',
+    'inceleme', 'sunucu', 'veri', 'ekran', 'akış', 'bütçe', 'öncelik', 'ekip', 'not', 'dosya',
+    'bakıyorum', 'hallettim', 'bekliyoruz', 'eklendi', 'düzeltildi', 'lütfen', 'teşekkürler',
+)
+CITIES = ('İstanbul', 'Ankara', 'İzmir', 'Bursa', 'Antalya', 'Konya', 'Eskişehir', 'Trabzon')
+PROJECT_TYPES = ('Web Site', 'SaaS', 'Mobil Uygulama', 'E-ticaret', 'Kurumsal Yazılım')
+
+USER_ROLE_WEIGHTS = (('admin', 1), ('project_manager', 9), ('team_member', 85), ('guest', 5))
+USER_TAG_SHARES = (('seller', 0.05), ('muhasebeci', 0.03), ('muhasebeadmin', 0.01), ('makale', 0.05),
+                   ('adminmakale', 0.01), ('idea', 0.05))
+PROJECT_STATUS_WEIGHTS = (
+    ('not_started', 10), ('in_progress', 45), ('on_hold', 8), ('completed', 32), ('cancelled', 5),
+)
+PRIORITY_WEIGHTS = (('low', 20), ('medium', 50), ('high', 22), ('urgent', 8))
+SALE_STATUS_WEIGHTS = (
+    ('draft', 10), ('quoted', 20), ('in_progress', 30), ('completed', 35), ('cancelled', 5),
+)
+EVENT_TYPE_WEIGHTS = (
+    ('task', 40), ('meeting', 25), ('deadline', 15), ('project', 8), ('payment', 5),
+    ('milestone', 4), ('custom', 3),
+)
+ARTICLE_STATUS_WEIGHTS = (('draft', 25), ('published', 65), ('archived', 10))
+NOTIFICATION_TYPE_WEIGHTS = (('info', 60), ('success', 20), ('warning', 15), ('error', 5))
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """
+    auto_now / auto_now_add alanlarını geçici olarak kapatır; böylece
+    oluşturma tarihleri geçmişe yayılmış olarak kaydedilebilir.
+    """
+    patched = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                patched.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in patched:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        'Yük ve performans testleri için tohumlanmış (deterministik) sentetik veri üretir. '
+        'Örn: generate_synthetic_data --scale large --seed 42'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=sorted(SCALES), default='small',
+                            help='Hazır ölçek (varsayılan: small)')
+        parser.add_argument('--seed', type=int, default=42, help='Rastgele sayı tohumu')
+        parser.add_argument('--base-date', help='Verilerin göreli olduğu tarih (YYYY-AA-GG, varsayılan: bugün)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Toplu eklemelerde tek seferdeki kayıt sayısı')
+        parser.add_argument('--read-status-days', type=int, default=30,
+                            help='Okunma kayıtları yalnızca bu süredeki (gün) grup mesajları için üretilir')
+        parser.add_argument('--flush', action='store_true', help='Önce mevcut sentetik verileri siler')
+        parser.add_argument('--with-search-index', action='store_true',
+                            help='Sonunda mesaj arama indeksini yeniden oluşturur')
+        for name in SCALES['small']:
+            parser.add_argument(f"--{name.replace('_', '-')}", type=int, dest=name,
+                                help=f'{name} sayısı (ölçek değerini geçersiz kılar)')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.read_status_days = options['read_status_days']
+        self.counts = {
+            name: options[name] if options.get(name) is not None else value
+            for name, value in SCALES[options['scale']].items()
+        }
+
+        if options['base_date']:
+            try:
+                base_date = datetime.strptime(options['base_date'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--base-date YYYY-AA-GG biçiminde olmalıdır.')
+        else:
+            base_date = timezone.localdate()
+        self.today = base_date
+        self.now = timezone.make_aware(datetime.combine(base_date, dt_time(18, 0)))
+
+        if options['flush']:
+            self.flush()
+        elif CustomUser.objects.filter(username__startswith=SYNTHETIC_PREFIX).exists():
+            raise CommandError('Sentetik veri zaten var. Yeniden üretmek için --flush kullanın.')
+
+        started = time.monotonic()
+        with explicit_timestamps(
+            Project, Task, TimeLog, MessageGroup, MessageGroupMember, Message,
+            DirectMessage, DirectMessageContent, Notification, Customer, ProjectSale,
+            CalendarEvent, Article, Report
+        ):
+            self.step('Kullanıcılar', self.create_users)
+            self.step('Projeler', self.create_projects)
+            self.step('Görevler', self.create_tasks)
+            self.step('Zaman kayıtları', self.create_timelogs)
+            self.step('Grup mesajları', self.create_group_messages)
+            self.step('Direkt mesajlar', self.create_direct_messages)
+            self.step('Bildirimler', self.create_notifications)
+            self.step('Satışlar', self.create_sales)
+            self.step('Takvim etkinlikleri', self.create_events)
+            self.step('Makaleler', self.create_articles)
+            self.step('Raporlar', self.create_reports)
+
+        # Toplu eklemelerde sinyaller çalışmadığı için türetilmiş alanlar yeniden hesaplanır
+        call_command('refresh_chat_summaries', verbosity=0, stdout=self.stdout)
+        call_command('rebuild_time_totals', stdout=self.stdout)
+        call_command('rebuild_search_index', stdout=self.stdout)
+        if options['with_search_index']:
+            call_command('rebuild_message_search_index', stdout=self.stdout)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Sentetik veri {time.monotonic() - started:.1f} saniyede oluşturuldu."
+        ))
+
+    # Yardımcılar
+
+    def step(self, label, func):
+        started = time.monotonic()
+        created = func()
+        self.stdout.write(f"  {label}: {created} kayıt ({time.monotonic() - started:.1f} sn)")
+
+    def weighted(self, choices):
+        values, weights = zip(*choices)
+        return self.rng.choices(values, weights=weights)[0]
+
+    def pareto_split(self, total, buckets, alpha=1.2):
+        """Toplamı, birkaç büyük ve çok sayıda küçük parçaya (uzun kuyruklu) böler"""
+        if buckets <= 0:
+            return []
+        weights = [self.rng.paretovariate(alpha) for _ in range(buckets)]
+        scale = total / sum(weights)
+        sizes = [int(weight * scale) for weight in weights]
+        for index in self.rng.sample(range(buckets), min(buckets, total - sum(sizes))):
+            sizes[index] += 1
+        return sizes
+
+    def past_datetime(self, max_days, min_days=0):
+        seconds = self.rng.uniform(min_days * 86400, max_days * 86400)
+        return self.now - timedelta(seconds=seconds)
+
+    def sentence(self, low=3, high=18):
+        length = max(low, min(high, int(self.rng.lognormvariate(math.log(7), 0.5))))
+        text = ' '.join(self.rng.choice(WORDS) for _ in range(length))
+        return text[0].upper() + text[1:] + self.rng.choice(('.', '.', '.', '?', '!'))
+
+    def insert(self, model, objects):
+        """Nesneleri partiler halinde ekler, eklenen nesneleri döndürür"""
+        created = []
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                created.extend(self._insert_batch(model, batch))
+                batch = []
+        if batch:
+            created.extend(self._insert_batch(model, batch))
+        return created
+
+    def _insert_batch(self, model, batch):
+        with transaction.atomic():
+            return model.objects.bulk_create(batch, batch_size=self.batch_size)
+
+    def stream(self, model, objects):
+        """Nesneleri bellekte tutmadan partiler halinde ekler, eklenen sayıyı döndürür"""
+        count = 0
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                self._insert_batch(model, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            self._insert_batch(model, batch)
+            count += len(batch)
+        return count
+
+    def flush(self):
+        self.stdout.write('Mevcut sentetik veriler siliniyor...')
+        users = CustomUser.objects.filter(username__startswith=SYNTHETIC_PREFIX)
+        Project.objects.filter(manager__in=users).delete()
+        MessageGroup.objects.filter(group_members__user__in=users).distinct().delete()
+        users.delete()
+
+    # Üreticiler
+
+    def create_users(self):
+        password = make_password('synthetic')
+        # Ölçümlerde her rol bulunsun diye ilk kullanıcılar sabit rollerle oluşturulur
+        fixed_roles = ('admin', 'project_manager')
+        users = []
+        for index in range(self.counts['users']):
+            first_name = self.rng.choice(FIRST_NAMES)
+            last_name = self.rng.choice(LAST_NAMES)
+            users.append(CustomUser(
+                username=f"{SYNTHETIC_PREFIX}{index:06d}",
+                first_name=first_name,
+                last_name=last_name,
+                email=f"{SYNTHETIC_PREFIX}{index:06d}@example.com",
+                password=password,
+                role=fixed_roles[index] if index < len(fixed_roles) else self.weighted(USER_ROLE_WEIGHTS),
+                department=self.rng.choice(DEPARTMENTS),
+                date_joined=self.past_datetime(900, 30),
+            ))
+        self.users = self.insert(CustomUser, users)
+        self.user_ids = [user.pk for user in self.users]
+        self.managers = [user.pk for user in self.users if user.role in ('admin', 'project_manager')] or self.user_ids[:1]
+
+        # Ek yetki etiketleri
+        tag_links = []
+        self.tagged = {}
+        for name, share in USER_TAG_SHARES:
+            tag, _ = Tag.objects.get_or_create(name=name)
+            holders = self.rng.sample(self.user_ids, max(1, int(len(self.user_ids) * share)))
+            self.tagged[name] = holders
+            tag_links.extend(CustomUser.tags.through(customuser_id=user_id, tag_id=tag.pk) for user_id in holders)
+        self.insert(CustomUser.tags.through, tag_links)
+        return len(self.users)
+
+    def create_projects(self):
+        projects = []
+        for index in range(self.counts['projects']):
+            status = self.weighted(PROJECT_STATUS_WEIGHTS)
+            start_date = self.today - timedelta(days=self.rng.randint(0, 720))
+            end_date = start_date + timedelta(days=self.rng.randint(30, 365))
+            budget = Decimal(int(self.rng.lognormvariate(math.log(150_000), 0.8))).quantize(Decimal('1'))
+            created_at = timezone.make_aware(datetime.combine(start_date, dt_time(9, 0))) - timedelta(days=self.rng.randint(0, 14))
+            projects.append(Project(
+                name=f"{self.rng.choice(PROJECT_WORDS)} {self.rng.choice(PROJECT_WORDS)} {index + 1:05d}",
+                description=self.sentence(8, 30),
+                start_date=start_date,
+                end_date=end_date,
+                status=status,
+                priority=self.weighted(PRIORITY_WEIGHTS),
+                manager_id=self.rng.choice(self.managers),
+                budget=min(budget, Decimal('99999999')),
+                cost=None,
+                created_at=created_at,
+                updated_at=created_at,
+            ))
+        self.projects = self.insert(Project, projects)
+
+        # Ekip büyüklükleri uzun kuyruklu: çoğu proje küçük, birkaçı kalabalık
+        self.project_members = {}
+        links = []
+        for project in self.projects:
+            size = min(len(self.user_ids), max(2, int(self.rng.paretovariate(1.5) * 3)))
+            members = set(self.rng.sample(self.user_ids, size))
+            members.add(project.manager_id)
+            self.project_members[project.pk] = list(members)
+            links.extend(
+                Project.team_members.through(project_id=project.pk, customuser_id=user_id)
+                for user_id in members
+            )
+        self.insert(Project.team_members.through, links)
+        return len(self.projects)
+
+    def _task_status(self, project, due_date):
+        if project.status == 'completed':
+            return self.weighted((('completed', 92), ('cancelled', 8)))
+        if project.status == 'not_started':
+            return 'todo'
+        if project.status == 'cancelled':
+            return self.weighted((('cancelled', 60), ('todo', 25), ('completed', 15)))
+        if due_date < self.today:
+            return self.weighted((('completed', 70), ('in_progress', 15), ('review', 8), ('todo', 7)))
+        return self.weighted((('todo', 40), ('in_progress', 30), ('review', 10), ('completed', 20)))
+
+    def create_tasks(self):
+        sizes = self.pareto_split(self.counts['tasks'], len(self.projects))
+        tasks = []
+        for project, size in zip(self.projects, sizes):
+            span = max((project.end_date - project.start_date).days, 1)
+            members = self.project_members[project.pk]
+            for _ in range(size):
+                start_date = project.start_date + timedelta(days=self.rng.randint(0, span))
+                due_date = start_date + timedelta(days=self.rng.randint(1, 30))
+                status = self._task_status(project, due_date)
+                estimate = Decimal(self.rng.choice((1, 2, 3, 4, 6, 8, 12, 16, 24, 40)))
+                created_at = timezone.make_aware(datetime.combine(start_date, dt_time(9, 0))) - timedelta(days=self.rng.randint(0, 10))
+                tasks.append(Task(
+                    title=f"{self.rng.choice(TASK_OBJECTS).capitalize()}: {self.rng.choice(TASK_VERBS).lower()}",
+                    description=self.sentence(5, 40),
+                    project_id=project.pk,
+                    creator_id=project.manager_id,
+                    assignee_id=self.rng.choice(members) if self.rng.random() < 0.9 else None,
+                    status=status,
+                    priority=self.weighted(PRIORITY_WEIGHTS),
+                    estimate_hours=estimate,
+                    start_date=start_date,
+                    due_date=due_date,
+                    completed_date=min(due_date + timedelta(days=self.rng.randint(-3, 5)), self.today)
+                    if status == 'completed' else None,
+                    created_at=created_at,
+                    updated_at=created_at,
+                ))
+        self.tasks = self.insert(Task, tasks)
+
+        # Alt görevler ve bağımlılıklar: aynı projedeki daha önceki görevlere bağlanır (döngüsüz)
+        by_project = {}
+        for task in self.tasks:
+            by_project.setdefault(task.project_id, []).append(task)
+        subtasks = []
+        dependencies = []
+        for project_tasks in by_project.values():
+            for position, task in enumerate(project_tasks[1:], start=1):
+                roll = self.rng.random()
+                if roll < 0.10:
+                    task.parent_task_id = project_tasks[self.rng.randrange(position)].pk
+                    subtasks.append(task)
+                elif roll < 0.25:
+                    for earlier in {self.rng.randrange(position) for _ in range(self.rng.randint(1, 2))}:
+                        dependencies.append(Task.dependencies.through(
+                            from_task_id=task.pk, to_task_id=project_tasks[earlier].pk
+                        ))
+        for start in range(0, len(subtasks), self.batch_size):
+            Task.objects.bulk_update(subtasks[start:start + self.batch_size], ['parent_task'])
+        self.insert(Task.dependencies.through, dependencies)
+        return len(self.tasks)
+
+    def create_timelogs(self):
+        worked = [
+            task for task in self.tasks
+            if task.assignee_id and task.status in ('in_progress', 'review', 'completed')
+        ]
+        if not worked:
+            return 0
+        sizes = self.pareto_split(self.counts['timelogs'], len(worked), alpha=2.0)
+        logs = []
+        actual_hours = {}
+        for task, size in zip(worked, sizes):
+            last_day = min(task.completed_date or self.today, self.today)
+            span = max((last_day - task.start_date).days, 0)
+            for _ in range(size):
+                hours = Decimal(self.rng.choice((0.5, 1, 1, 1.5, 2, 2, 3, 4, 6, 8))).quantize(Decimal('0.01'))
+                # Görev toplamı Task.actual_hours alanına sığmalı
+                if actual_hours.get(task.pk, Decimal('0')) + hours > Decimal('9999.99'):
+                    break
+                log_date = task.start_date + timedelta(days=self.rng.randint(0, span))
+                created_at = timezone.make_aware(datetime.combine(log_date, dt_time(17, 30)))
+                logs.append(TimeLog(
+                    task_id=task.pk,
+                    user_id=task.assignee_id,
+                    date=log_date,
+                    hours=hours,
+                    description=self.sentence(3, 10) if self.rng.random() < 0.4 else '',
+                    created_at=created_at,
+                    updated_at=created_at,
+                ))
+                actual_hours[task.pk] = actual_hours.get(task.pk, Decimal('0')) + hours
+        # Görevlerin gerçekleşen süreleri ve zaman toplamları rebuild_time_totals ile hesaplanır
+        return self.stream(TimeLog, logs)
+
+    def create_group_messages(self):
+        groups = []
+        group_members = {}
+        projects = self.rng.sample(self.projects, min(len(self.projects), self.counts['groups'] // 2))
+        for project in projects:
+            groups.append(MessageGroup(
+                name=project.name, type='project', related_project_id=project.pk,
+                created_at=timezone.make_aware(datetime.combine(project.start_date, dt_time(9, 0))),
+                updated_at=self.now,
+            ))
+        for index in range(self.counts['groups'] - len(groups)):
+            groups.append(MessageGroup(
+                name=f"{self.rng.choice(DEPARTMENTS)} Ekibi {index + 1}", type='group',
+                created_at=self.past_datetime(720, 365), updated_at=self.now,
+            ))
+        groups = self.insert(MessageGroup, groups)
+
+        members = []
+        for group in groups:
+            if group.related_project_id:
+                user_ids = self.project_members[group.related_project_id]
+            else:
+                size = min(len(self.user_ids), max(3, int(self.rng.paretovariate(1.3) * 4)))
+                user_ids = self.rng.sample(self.user_ids, size)
+            group_members[group.pk] = user_ids
+            members.extend(
+                MessageGroupMember(
+                    group_id=group.pk, user_id=user_id,
+                    role='admin' if position == 0 else 'member', joined_at=group.created_at,
+                )
+                for position, user_id in enumerate(user_ids)
+            )
+        self.insert(MessageGroupMember, members)
+
+        # Mesaj hacmi gruplar arasında uzun kuyruklu dağılır; zaman damgaları sıralı üretilir
+        read_cutoff = self.now - timedelta(days=self.read_status_days)
+        sizes = self.pareto_split(self.counts['messages'], len(groups))
+        count = 0
+        for group, size in zip(groups, sizes):
+            user_ids = group_members[group.pk]
+            span = (self.now - group.created_at).total_seconds()
+            offsets = sorted(self.rng.uniform(0, span) for _ in range(size))
+            messages = (
+                Message(
+                    sender_id=self.rng.choice(user_ids),
+                    group_id=group.pk,
+                    content=self.sentence(),
+                    message_type='text',
+                    created_at=group.created_at + timedelta(seconds=offset),
+                    updated_at=group.created_at + timedelta(seconds=offset),
+                )
+                for offset in offsets
+            )
+            for start in range(0, size, self.batch_size):
+                batch = list(islice(messages, self.batch_size))
+                created = self._insert_batch(Message, batch)
+                count += len(created)
+                self._create_read_statuses(created, user_ids, read_cutoff)
+        return count
+
+    def _create_read_statuses(self, messages, user_ids, read_cutoff):
+        statuses = []
+        for message in messages:
+            if message.created_at < read_cutoff:
+                continue
+            age_hours = (self.now - message.created_at).total_seconds() / 3600
+            for user_id in user_ids:
+                if user_id == message.sender_id:
+                    continue
+                # Yeni mesajların okunmamış olma olasılığı daha yüksek
+                is_read = self.rng.random() < min(0.98, 0.4 + age_hours / 48)
+                statuses.append(MessageReadStatus(
+                    message_id=message.pk, user_id=user_id, is_read=is_read,
+                    read_at=message.created_at + timedelta(minutes=self.rng.randint(1, 600)) if is_read else None,
+                ))
+        if statuses:
+            self.stream(MessageReadStatus, statuses)
+
+    def create_direct_messages(self):
+        pairs = set()
+        max_pairs = len(self.user_ids) * (len(self.user_ids) - 1) // 2
+        while len(pairs) < min(self.counts['direct_chats'], max_pairs):
+            first, second = sorted(self.rng.sample(self.user_ids, 2))
+            pairs.add((first, second))
+        chats = self.insert(DirectMessage, (
+            DirectMessage(
+                user1_id=first, user2_id=second,
+                created_at=self.past_datetime(540, 30), updated_at=self.now,
+            )
+            for first, second in sorted(pairs)
+        ))
+
+        sizes = self.pareto_split(self.counts['direct_messages'], len(chats))
+        count = 0
+        for chat, size in zip(chats, sizes):
+            span = (self.now - chat.created_at).total_seconds()
+            offsets = sorted(self.rng.uniform(0, span) for _ in range(size))
+            unread = {chat.user1_id: 0, chat.user2_id: 0}
+            contents = []
+            for position, offset in enumerate(offsets):
+                sender_id = self.rng.choice((chat.user1_id, chat.user2_id))
+                recipient_id = chat.user2_id if sender_id == chat.user1_id else chat.user1_id
+                # Sohbetin son birkaç mesajı okunmamış kalabilir
+                is_read = position < size - 5 or self.rng.random() < 0.5
+                if not is_read:
+                    unread[recipient_id] += 1
+                sent_at = chat.created_at + timedelta(seconds=offset)
+                contents.append(DirectMessageContent(
+                    direct_message_id=chat.pk, sender_id=sender_id, content=self.sentence(),
+                    message_type='text', is_read=is_read,
+                    read_at=sent_at + timedelta(minutes=self.rng.randint(1, 300)) if is_read else None,
+                    sent_at=sent_at,
+                ))
+            count += self.stream(DirectMessageContent, contents)
+            chat.user1_unread = unread[chat.user1_id]
+            chat.user2_unread = unread[chat.user2_id]
+            if offsets:
+                chat.updated_at = chat.created_at + timedelta(seconds=offsets[-1])
+        for start in range(0, len(chats), self.batch_size):
+            DirectMessage.objects.bulk_update(
+                chats[start:start + self.batch_size], ['user1_unread', 'user2_unread', 'updated_at']
+            )
+        return count
+
+    def create_notifications(self):
+        sizes = self.pareto_split(self.counts['notifications'], len(self.user_ids))
+        tasks = self.tasks or [None]
+
+        def notifications():
+            for user_id, size in zip(self.user_ids, sizes):
+                for _ in range(size):
+                    task = self.rng.choice(tasks)
+                    created_at = self.past_datetime(365)
+                    age_days = (self.now - created_at).days
+                    is_read = self.rng.random() < (0.97 if age_days > 14 else 0.5)
+                    yield Notification(
+                        recipient_id=user_id,
+                        title=self.rng.choice((
+                            'Görev Durumu Değişti', 'Yeni Görev Atandı', 'Yeni Yorum',
+                            'Yaklaşan Görev Teslim Tarihi', 'Yeni Mesaj',
+                        )),
+                        content=self.sentence(4, 16),
+                        notification_type=self.weighted(NOTIFICATION_TYPE_WEIGHTS),
+                        related_task_id=task.pk if task else None,
+                        related_project_id=task.project_id if task else None,
+                        is_read=is_read,
+                        read_at=created_at + timedelta(hours=self.rng.randint(1, 72)) if is_read else None,
+                        created_at=created_at,
+                    )
+
+        return self.stream(Notification, notifications())
+
+    def create_sales(self):
+        sellers = self.tagged.get('seller') or self.user_ids[:1]
+        customers = []
+        for index in range(max(1, self.counts['sales'] // 3)):
+            is_company = self.rng.random() < 0.6
+            created_at = self.past_datetime(720, 60)
+            customers.append(Customer(
+                customer_type='company' if is_company else 'individual',
+                first_name='' if is_company else self.rng.choice(FIRST_NAMES),
+                last_name='' if is_company else self.rng.choice(LAST_NAMES),
+                company_name=f"{self.rng.choice(LAST_NAMES)} {self.rng.choice(('A.Ş.', 'Ltd. Şti.', 'Teknoloji'))}" if is_company else '',
+                email=f"customer{index:06d}@example.com",
+                city=self.rng.choice(CITIES),
+                created_by_id=self.rng.choice(sellers),
+                created_at=created_at,
+                updated_at=created_at,
+            ))
+        customers = self.insert(Customer, customers)
+
+        def sales():
+            for _ in range(self.counts['sales']):
+                customer = self.rng.choice(customers)
+                status = self.weighted(SALE_STATUS_WEIGHTS)
+                base_price = Decimal(int(self.rng.lognormvariate(math.log(40_000), 0.9)))
+                extra = Decimal(int(base_price * Decimal(self.rng.choice((0, 0, 0.1, 0.2, 0.35)))))
+                additional = Decimal(self.rng.choice((0, 0, 1500, 3000, 7500)))
+                quote_date = self.today - timedelta(days=self.rng.randint(0, 700))
+                start_date = quote_date + timedelta(days=self.rng.randint(3, 30)) if status != 'draft' else None
+                estimated = self.rng.randint(14, 180)
+                end_date = start_date + timedelta(days=int(estimated * self.rng.uniform(0.8, 1.5))) \
+                    if start_date and status == 'completed' else None
+                project = self.rng.choice(self.projects) if self.projects and self.rng.random() < 0.4 else None
+                created_at = timezone.make_aware(datetime.combine(quote_date, dt_time(10, 0)))
+                yield ProjectSale(
+                    project_name=f"{customer.company_name or customer.last_name} {self.rng.choice(PROJECT_TYPES)}",
+                    project_description=self.sentence(8, 30),
+                    project_type=self.rng.choice(PROJECT_TYPES),
+                    customer_id=customer.pk,
+                    linked_project_id=project.pk if project else None,
+                    base_price=base_price,
+                    extra_services_total=extra,
+                    additional_costs_total=additional,
+                    final_price=base_price + extra + additional,
+                    estimated_duration_days=estimated,
+                    actual_duration_days=(end_date - start_date).days if end_date else None,
+                    quote_date=quote_date,
+                    start_date=start_date,
+                    end_date=end_date,
+                    delivery_date=end_date,
+                    status=status,
+                    seller_id=customer.created_by_id,
+                    created_at=created_at,
+                    updated_at=created_at,
+                )
+
+        return self.stream(ProjectSale, sales())
+
+    def create_events(self):
+        sizes = self.pareto_split(self.counts['events'], len(self.user_ids), alpha=2.0)
+        colors = {'task': '#007bff', 'meeting': '#6f42c1', 'deadline': '#dc3545', 'project': '#28a745',
+                  'payment': '#ffc107', 'milestone': '#17a2b8', 'custom': '#6c757d'}
+        event_labels = {value: str(label) for value, label in CalendarEvent.EVENT_TYPE_CHOICES}
+
+        def events():
+            for user_id, size in zip(self.user_ids, sizes):
+                for _ in range(size):
+                    event_type = self.weighted(EVENT_TYPE_WEIGHTS)
+                    start = self.now + timedelta(minutes=30 * self.rng.randint(-180 * 48, 90 * 48))
+                    is_all_day = event_type in ('deadline', 'milestone', 'payment')
+                    yield CalendarEvent(
+                        title=f"{event_labels[event_type]}: {self.sentence(2, 5)}",
+                        description=self.sentence(4, 20) if self.rng.random() < 0.5 else '',
+                        event_type=event_type,
+                        priority=self.weighted(PRIORITY_WEIGHTS),
+                        start_date=start,
+                        end_date=None if is_all_day else start + timedelta(minutes=self.rng.choice((30, 60, 90, 120))),
+                        is_all_day=is_all_day,
+                        color=colors[event_type],
+                        user_id=user_id,
+                        is_completed=start < self.now and self.rng.random() < 0.8,
+                        created_at=min(start, self.now) - timedelta(days=self.rng.randint(0, 30)),
+                        updated_at=self.now,
+                    )
+
+        return self.stream(CalendarEvent, events())
+
+    def create_articles(self):
+        authors = self.tagged.get('makale') or self.user_ids[:1]
+        categories = [value for value, _ in Article.CATEGORY_CHOICES]
+
+        def articles():
+            for index in range(self.counts['articles']):
+                status = self.weighted(ARTICLE_STATUS_WEIGHTS)
+                created_at = self.past_datetime(720)
+                paragraphs = [
+                    ' '.join(self.sentence(8, 25) for _ in range(self.rng.randint(2, 6)))
+                    for _ in range(self.rng.randint(3, 12))
+                ]
+                title = f"{self.rng.choice(TASK_OBJECTS).capitalize()} {self.rng.choice(('rehberi', 'hakkında notlar', 'nasıl yapılır', 'incelemesi'))}"
+                yield Article(
+                    title=title,
+                    slug=f"sentetik-makale-{index + 1:06d}",
+                    content='\n\n'.join(f"## Bölüm {number + 1}\n\n{text}" for number, text in enumerate(paragraphs)),
+                    excerpt=paragraphs[0][:200],
+                    category=self.rng.choice(categories),
+                    status=status,
+                    author_id=self.rng.choice(authors),
+                    tags=', '.join(self.rng.sample(WORDS, 3)),
+                    view_count=int(self.rng.paretovariate(1.1) * 10) if status == 'published' else 0,
+                    is_featured=status == 'published' and self.rng.random() < 0.05,
+                    created_at=created_at,
+                    updated_at=created_at,
+                    published_at=created_at + timedelta(days=self.rng.randint(0, 5)) if status != 'draft' else None,
+                )
+
+        return self.stream(Article, articles())
+
+    def create_reports(self):
+        report_types = [value for value, _ in Report.REPORT_TYPE_CHOICES if value != 'custom']
+        reports = []
+        for index in range(self.counts['reports']):
+            report_type = report_types[index % len(report_types)]
+            # Raporların bir kısmı tüm projeleri kapsar
+            project = self.rng.choice(self.projects) if self.projects and self.rng.random() < 0.7 else None
+            date_to = self.today - timedelta(days=self.rng.randint(0, 30))
+            created_at = self.past_datetime(180)
+            reports.append(Report(
+                title=f"{Report.REPORT_TYPE_CHOICES[report_types.index(report_type)][1]} {index + 1}",
+                report_type=report_type,
+                project_id=project.pk if project else None,
+                created_by_id=project.manager_id if project else self.rng.choice(self.managers),
+                date_from=date_to - timedelta(days=self.rng.choice((30, 90, 180))),
+                date_to=date_to,
+                created_at=created_at,
+                updated_at=created_at,
+            ))
+        return len(self.insert(Report, reports))
+
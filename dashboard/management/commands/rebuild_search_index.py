@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.search import rebuild_index, work_index
+
+
+class Command(BaseCommand):
+    help = 'Görev, proje ve PRD tam metin arama indeksini sıfırdan oluşturur'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Tek işlemde indekslenecek kayıt sayısı',
+        )
+
+    def handle(self, *args, **options):
+        if not work_index.is_supported:
+            self.stdout.write(self.style.ERROR("Bu veritabanı tam metin aramayı desteklemiyor."))
+            return
+
+        self.stdout.write("Arama indeksi yeniden oluşturuluyor...")
+        task_count, project_count, prd_count = rebuild_index(options['batch_size'])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"İndeksleme tamamlandı. {task_count} görev, {project_count} proje, "
+                f"{prd_count} PRD indekslendi."
+            )
+        )
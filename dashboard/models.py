@@ -1,3 +1,205 @@
-from django.db import models
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, Count, F, IntegerField, Q, Value, When, Window
+from django.db.models.functions import RowNumber
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
 
-# Create your models here.
+from projects.models import PRD, Project
+from reports.models import Report
+from tasks.models import Task
+from teams.models import Team, TeamMember
+
+# Ana panel verileri kısa süreli önbellekte tutulur. Proje, görev veya ekip
+# kayıtları değiştiğinde sürüm arttırılır ve eski anahtarlar kendiliğinden
+# geçersiz olur. Sinyal tetiklemeyen toplu güncellemeler (QuerySet.update)
+# için gecikmenin üst sınırı DASHBOARD_CACHE_TIMEOUT süresidir.
+DASHBOARD_CACHE_TIMEOUT = getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 60)
+DASHBOARD_VERSION_KEY = 'dashboard:version'
+DASHBOARD_STATS_KEY = 'dashboard:stats:{scope}:{version}:{date}'
+
+# Kişisel menüde gösterilen görev sayısı ve rapor tipi başına rapor sayısı.
+# Kişisel menü parçaları da aynı sürüm ile önbelleklenir.
+PERSONAL_MENU_TASK_LIMIT = getattr(settings, 'PERSONAL_MENU_TASK_LIMIT', 50)
+PERSONAL_MENU_REPORTS_PER_TYPE = getattr(settings, 'PERSONAL_MENU_REPORTS_PER_TYPE', 5)
+PERSONAL_MENU_CACHE_TIMEOUT = getattr(settings, 'PERSONAL_MENU_CACHE_TIMEOUT', 300)
+
+
+def sees_all_projects(user):
+    """Kullanıcının tüm projeleri görüp göremeyeceğini döndürür"""
+    return user.role in ('admin', 'project_manager')
+
+
+def get_visible_projects(user):
+    """Kullanıcının ana panelde görebileceği projeler"""
+    if sees_all_projects(user):
+        return Project.objects.all()
+    return Project.objects.for_member(user)
+
+
+def get_personal_tasks(user):
+    """
+    Kullanıcıya atanan, açık projelerdeki görevler. Açık görevler önce,
+    tamamlanmış ve iptal edilmiş görevler en sonda listelenir.
+    """
+    return Task.objects.filter(assignee=user).exclude(
+        project__status__in=['completed', 'cancelled']
+    ).select_related('project').annotate(
+        is_closed=Case(
+            When(status__in=['completed', 'cancelled'], then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+    ).order_by('is_closed', 'status', 'due_date')
+
+
+def get_related_reports(user):
+    """Kullanıcının projeleriyle ilgili veya kullanıcının oluşturduğu raporlar"""
+    return Report.objects.filter(
+        Q(project__in=Project.objects.for_member(user).values('id')) | Q(created_by=user)
+    )
+
+
+def get_top_reports_by_type(user, per_type=None):
+    """
+    Her rapor tipi için en yeni raporları tek bir pencere fonksiyonu
+    sorgusuyla getirir: {rapor_tipi: [rapor, ...]}
+    """
+    per_type = per_type or PERSONAL_MENU_REPORTS_PER_TYPE
+    reports = get_related_reports(user).select_related('project', 'created_by').annotate(
+        type_rank=Window(
+            RowNumber(),
+            partition_by=F('report_type'),
+            order_by=[F('created_at').desc(), F('id').desc()],
+        )
+    ).filter(type_rank__lte=per_type).order_by('report_type', 'type_rank')
+
+    reports_by_type = {}
+    for report in reports:
+        reports_by_type.setdefault(report.report_type, []).append(report)
+    return reports_by_type
+
+
+def build_dashboard_stats(user):
+    """
+    Ana panel verilerini hesaplar. Durum ve gecikme sayaçları model başına
+    tek bir koşullu toplama sorgusuyla hesaplanır.
+    """
+    today = timezone.localdate()
+    projects = get_visible_projects(user)
+    tasks = Task.objects.all() if sees_all_projects(user) else Task.objects.filter(project__in=projects)
+
+    project_stats = projects.aggregate(
+        total_projects=Count('id'),
+        active_projects=Count('id', filter=Q(status='in_progress')),
+        completed_projects=Count('id', filter=Q(status='completed')),
+        overdue_projects=Count('id', filter=Q(end_date__lt=today) & ~Q(status='completed')),
+    )
+    task_stats = tasks.aggregate(
+        total_tasks=Count('id'),
+        completed_tasks=Count('id', filter=Q(status='completed')),
+        in_progress_tasks=Count('id', filter=Q(status='in_progress')),
+        todo_tasks=Count('id', filter=Q(status='todo')),
+        delayed_tasks=Count('id', filter=Q(due_date__lt=today) & ~Q(status='completed')),
+    )
+
+    stats = {
+        **project_stats,
+        **task_stats,
+        'recent_tasks': list(tasks.select_related('project').order_by('-created_at')[:5]),
+        'upcoming_tasks': list(
+            tasks.filter(status__in=['todo', 'in_progress'], due_date__gte=today)
+            .select_related('project').order_by('due_date')[:5]
+        ),
+        'active_project_list': list(
+            projects.filter(status='in_progress').select_related('manager')
+            .with_progress().order_by('-updated_at')[:4]
+        ),
+        'team_count': Team.objects.count(),
+        'team_member_count': TeamMember.objects.count(),
+    }
+    return stats
+
+
+def get_dashboard_stats(user):
+    """
+    Ana panel verilerini önbellekten döndürür. Tüm projeleri gören roller
+    aynı veriyi paylaşır; diğer kullanıcılar için veri kullanıcıya özeldir.
+    """
+    scope = 'all' if sees_all_projects(user) else f'user:{user.pk}'
+    key = DASHBOARD_STATS_KEY.format(
+        scope=scope,
+        version=get_dashboard_version(),
+        date=timezone.localdate().isoformat(),
+    )
+    stats = cache.get(key)
+    if stats is None:
+        stats = build_dashboard_stats(user)
+        cache.set(key, stats, DASHBOARD_CACHE_TIMEOUT)
+    return stats
+
+
+def get_dashboard_version():
+    """Ana panel ve kişisel menü önbelleklerinin güncel sürümü"""
+    return cache.get(DASHBOARD_VERSION_KEY, 1)
+
+
+def invalidate_dashboard_cache():
+    """Tüm kullanıcıların ana panel önbelleğini geçersiz kılar"""
+    try:
+        cache.incr(DASHBOARD_VERSION_KEY)
+    except ValueError:
+        cache.set(DASHBOARD_VERSION_KEY, 2, None)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+@receiver(post_save, sender=TeamMember)
+@receiver(post_delete, sender=TeamMember)
+@receiver(post_save, sender=Report)
+@receiver(post_delete, sender=Report)
+def handle_dashboard_data_change(sender, **kwargs):
+    """Ana panelde veya kişisel menüde gösterilen kayıtlar değiştiğinde önbelleği geçersiz kılar"""
+    invalidate_dashboard_cache()
+
+
+@receiver(m2m_changed, sender=Project.team_members.through)
+def handle_project_members_change(sender, action, **kwargs):
+    """Proje üyeleri değiştiğinde kullanıcıların görebildiği projeler değişir"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_dashboard_cache()
+
+
+@receiver(post_save, sender=Task)
+def index_task_for_search(sender, instance, **kwargs):
+    """Görevi arama indeksine ekler veya günceller"""
+    from dashboard.search import safe_work_index, index_task
+    safe_work_index(index_task, instance)
+
+
+@receiver(post_save, sender=Project)
+def index_project_for_search(sender, instance, **kwargs):
+    """Projeyi arama indeksine ekler veya günceller"""
+    from dashboard.search import safe_work_index, index_project
+    safe_work_index(index_project, instance)
+
+
+@receiver(post_save, sender=PRD)
+def index_prd_for_search(sender, instance, **kwargs):
+    """PRD'yi arama indeksine ekler veya günceller"""
+    from dashboard.search import safe_work_index, index_prd
+    safe_work_index(index_prd, instance)
+
+
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=PRD)
+def remove_from_search(sender, instance, **kwargs):
+    """Silinen kaydı arama indeksinden çıkarır"""
+    from dashboard.search import safe_work_index, work_index, KIND_BY_MODEL
+    safe_work_index(work_index.delete, KIND_BY_MODEL[sender.__name__], instance.pk)
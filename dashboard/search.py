@@ -0,0 +1,324 @@
+"""
+Görev, proje ve PRD'ler için birleşik tam metin arama.
+
+communications.search.FullTextIndex üzerine kuruludur: geliştirmede SQLite
+FTS5, üretimde PostgreSQL tsvector + GIN indeksi kullanılır. Başlık ve
+içerik ayrı tutulur; sonuçlar alaka düzeyine göre sıralanır (SQLite'ta
+bm25, PostgreSQL'de ağırlıklı tsvector ile ts_rank_cd) ve başlık
+eşleşmeleri öne çıkar. Metin fold_text ile normalleştirilip önekle
+arandığı için "gorevl" yazmak "Görevlerin" ile eşleşir.
+
+İndeks, kayıtlar kaydedildiğinde ve silindiğinde sinyallerle güncellenir
+(bkz. dashboard.models). Tablo migrate sonrasında oluşturulur ve boşsa
+mevcut kayıtlarla doldurulur; rebuild_search_index komutu indeksi sıfırdan kurar.
+"""
+import logging
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.urls import reverse
+
+from communications.search import FullTextIndex, fold_text, highlight
+from projects.models import PRD, Project
+from tasks.models import Task
+
+from .models import sees_all_projects
+
+logger = logging.getLogger(__name__)
+
+# Arama kutusunda (typeahead) döndürülen en fazla sonuç sayısı
+SEARCH_RESULT_LIMIT = getattr(settings, 'SEARCH_RESULT_LIMIT', 8)
+# bm25 sıralamasında başlık sütununun içeriğe göre ağırlığı
+SEARCH_TITLE_WEIGHT = 10.0
+
+TASK = 'task'
+PROJECT = 'project'
+PRD_KIND = 'prd'
+KINDS = (TASK, PROJECT, PRD_KIND)
+KIND_BY_MODEL = {'Task': TASK, 'Project': PROJECT, 'PRD': PRD_KIND}
+
+# PRD içeriğinde aranan alanlar
+PRD_TEXT_FIELDS = (
+    'product_summary', 'target_audience', 'functional_requirements',
+    'non_functional_requirements', 'user_stories', 'acceptance_criteria',
+    'technical_requirements', 'design_constraints',
+)
+
+
+class RankedFullTextIndex(FullTextIndex):
+    """
+    Başlık ve içeriği ayrı sütunlarda tutan, sonuçları alaka düzeyine göre
+    sıralayan indeks. Kayıt silme, temizleme ve sorgu üretimi üst sınıftan gelir.
+    """
+
+    def table_statements(self, vendor):
+        if vendor == 'sqlite':
+            return [
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+                f"title, body, kind UNINDEXED, object_id UNINDEXED, container_id UNINDEXED, "
+                f"created UNINDEXED, tokenize='unicode61 remove_diacritics 2')"
+            ]
+        return [
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            f"kind varchar(16) NOT NULL, object_id bigint NOT NULL, "
+            f"container_id bigint NOT NULL, created double precision NOT NULL, "
+            f"title text NOT NULL, body text NOT NULL, document tsvector NOT NULL, "
+            f"PRIMARY KEY (kind, object_id))",
+            *self.index_statements(),
+        ]
+
+    def upsert(self, kind, object_id, container_id, created, title, body=''):
+        """Bir kaydı indekse ekler veya günceller"""
+        if not self.is_supported:
+            return
+        created_ts = created.timestamp()
+        title = fold_text(title)
+        body = fold_text(body)
+
+        with connection.cursor() as cursor:
+            if self.vendor == 'sqlite':
+                cursor.execute(
+                    f"INSERT OR REPLACE INTO {self.table} "
+                    f"(rowid, title, body, kind, object_id, container_id, created) "
+                    f"VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                    [self.rowid(kind, object_id), title, body, kind, object_id, container_id, created_ts]
+                )
+            else:
+                cursor.execute(
+                    f"INSERT INTO {self.table} (kind, object_id, container_id, created, title, body, document) "
+                    f"VALUES (%s, %s, %s, %s, %s, %s, "
+                    f"setweight(to_tsvector(%s, %s), 'A') || setweight(to_tsvector(%s, %s), 'B')) "
+                    f"ON CONFLICT (kind, object_id) DO UPDATE SET "
+                    f"container_id = EXCLUDED.container_id, created = EXCLUDED.created, "
+                    f"title = EXCLUDED.title, body = EXCLUDED.body, document = EXCLUDED.document",
+                    [kind, object_id, container_id, created_ts, title, body,
+                     self.pg_config, title, self.pg_config, body]
+                )
+
+    def _match(self, query):
+        if self.vendor == 'sqlite':
+            return f"{self.table} MATCH %s", [query]
+        return "document @@ to_tsquery(%s, %s)", [self.pg_config, query]
+
+    def matching_ids(self, kind, text):
+        """
+        Eşleşen kayıt ID'lerini veren alt sorgu (QuerySet filtrelerinde
+        id__in ile kullanılır). Arama desteklenmiyorsa veya metinde terim
+        yoksa None döndürür.
+        """
+        query = self.build_query(text)
+        if not query or not self.is_supported:
+            return None
+        match_sql, params = self._match(query)
+        return RawSQL(
+            f"SELECT object_id FROM {self.table} WHERE {match_sql} AND kind = %s",
+            params + [kind]
+        )
+
+    def search_ranked(self, text, scopes, limit=20):
+        """
+        Kapsamlar içinde arama yapar ve en alakalı sonuçları döndürür.
+
+        scopes: (tür, sütun, ID listesi) demetleri. sütun 'container_id' veya
+        'object_id' olabilir; ID listesi None ise tür kısıtlamasız aranır.
+
+        (kind, object_id) demetlerinin listesini döndürür.
+        """
+        query = self.build_query(text)
+        if not query or not self.is_supported:
+            return []
+
+        scope_sql = []
+        scope_params = []
+        for kind, column, ids in scopes:
+            if ids is None:
+                scope_sql.append("kind = %s")
+                scope_params.append(kind)
+            elif ids:
+                ids = list(ids)
+                placeholders = ', '.join(['%s'] * len(ids))
+                scope_sql.append(f"(kind = %s AND {column} IN ({placeholders}))")
+                scope_params += [kind] + ids
+        if not scope_sql:
+            return []
+
+        match_sql, params = self._match(query)
+        if self.vendor == 'sqlite':
+            rank_sql = f"bm25({self.table}, %s, 1.0)"
+            rank_params = [SEARCH_TITLE_WEIGHT]
+            order = "rank ASC"
+        else:
+            rank_sql = "ts_rank_cd(document, to_tsquery(%s, %s))"
+            rank_params = [self.pg_config, query]
+            order = "rank DESC"
+
+        sql = (
+            f"SELECT kind, object_id, {rank_sql} AS rank FROM {self.table} "
+            f"WHERE {match_sql} AND ({' OR '.join(scope_sql)}) "
+            f"ORDER BY {order}, created DESC LIMIT %s"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, rank_params + params + scope_params + [limit])
+            return [(kind, object_id) for kind, object_id, _ in cursor.fetchall()]
+
+
+work_index = RankedFullTextIndex('dashboard_work_search', kinds=KINDS)
+
+
+def create_search_tables(using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    post_migrate: görev/proje/PRD arama tablosunu oluşturur. İndeks boşsa
+    (ilk kurulum) mevcut kayıtlar indekslenir; böylece liste sayfalarındaki
+    aramalar rebuild_search_index çalıştırılmadan da tüm kayıtları bulur.
+    """
+    work_index.create_table(using)
+    if using == DEFAULT_DB_ALIAS and work_index.is_supported and work_index.is_empty():
+        rebuild_index()
+
+
+def index_task(task):
+    work_index.upsert(TASK, task.pk, task.project_id, task.created_at, task.title, task.description)
+
+
+def index_project(project):
+    work_index.upsert(PROJECT, project.pk, project.pk, project.created_at, project.name, project.description)
+
+
+def prd_text(prd):
+    return '\n'.join(getattr(prd, field) or '' for field in PRD_TEXT_FIELDS)
+
+
+def index_prd(prd):
+    work_index.upsert(PRD_KIND, prd.pk, prd.project_id or 0, prd.created_at, prd.title, prd_text(prd))
+
+
+def _index_all(queryset, index_func, batch_size):
+    count = 0
+    last_id = 0
+    while True:
+        batch = list(queryset.filter(id__gt=last_id).order_by('id')[:batch_size])
+        if not batch:
+            break
+        with transaction.atomic():
+            for obj in batch:
+                index_func(obj)
+        count += len(batch)
+        last_id = batch[-1].id
+    return count
+
+
+def rebuild_index(batch_size=2000):
+    """İndeksi sıfırdan kurar; (görev, proje, PRD) sayılarını döndürür"""
+    work_index.clear()
+    return (
+        _index_all(
+            Task.objects.only('id', 'project_id', 'title', 'description', 'created_at'),
+            index_task, batch_size
+        ),
+        _index_all(
+            Project.objects.only('id', 'name', 'description', 'created_at'),
+            index_project, batch_size
+        ),
+        _index_all(
+            PRD.objects.only('id', 'project_id', 'title', 'created_at', *PRD_TEXT_FIELDS),
+            index_prd, batch_size
+        ),
+    )
+
+
+def safe_work_index(func, *args):
+    """İndeks hatalarının kayıt işlemini engellemesine izin vermez"""
+    try:
+        with transaction.atomic():
+            func(*args)
+    except Exception as e:
+        logger.error(f"Arama indeksi güncellenemedi: {str(e)}")
+
+
+def filter_by_search(queryset, kind, text, fallback_fields):
+    """
+    Liste sayfalarındaki arama filtresi. İndeks kullanılabiliyorsa eşleşmeler
+    indeksten gelir; aksi halde alanlarda icontains ile aranır.
+    """
+    try:
+        matches = work_index.matching_ids(kind, text)
+    except Exception as e:
+        logger.error(f"Arama indeksi kullanılamadı: {str(e)}")
+        matches = None
+    if matches is not None:
+        return queryset.filter(id__in=matches)
+    condition = Q()
+    for field in fallback_fields:
+        condition |= Q(**{f'{field}__icontains': text})
+    return queryset.filter(condition)
+
+
+def get_search_scopes(user, kinds=KINDS):
+    """Kullanıcının görebileceği kayıtlar için arama kapsamları"""
+    if sees_all_projects(user):
+        return [(kind, 'container_id', None) for kind in kinds]
+
+    project_ids = list(Project.objects.for_member(user).values_list('id', flat=True))
+    scopes = []
+    if TASK in kinds:
+        scopes.append((TASK, 'container_id', project_ids))
+        scopes.append((TASK, 'object_id', Task.objects.filter(assignee=user).values_list('id', flat=True)))
+    if PROJECT in kinds:
+        scopes.append((PROJECT, 'container_id', project_ids))
+    if PRD_KIND in kinds:
+        scopes.append((PRD_KIND, 'object_id', PRD.objects.filter(
+            Q(created_by=user) | Q(assigned_by=user)
+        ).values_list('id', flat=True)))
+    return scopes
+
+
+def search(user, text, kinds=KINDS, limit=None):
+    """
+    Kullanıcının görebileceği görev, proje ve PRD'lerde arar. Sonuçlar
+    alaka sırasına göre sözlük listesi olarak döner: type, id, title,
+    title_html (eşleşmeler <mark> ile), context ve url.
+    """
+    limit = limit or SEARCH_RESULT_LIMIT
+    hits = work_index.search_ranked(text, get_search_scopes(user, kinds), limit)
+
+    ids = {kind: [object_id for hit_kind, object_id in hits if hit_kind == kind] for kind in KINDS}
+    objects = {}
+    if ids[TASK]:
+        for task in Task.objects.filter(id__in=ids[TASK]).select_related('project').only(
+            'id', 'title', 'status', 'project__name'
+        ):
+            objects[(TASK, task.id)] = {
+                'title': task.title,
+                'context': f"{task.project.name} · {task.get_status_display()}",
+                'url': reverse('tasks:task_detail', args=[task.id]),
+            }
+    if ids[PROJECT]:
+        for project in Project.objects.filter(id__in=ids[PROJECT]).only('id', 'name', 'status'):
+            objects[(PROJECT, project.id)] = {
+                'title': project.name,
+                'context': project.get_status_display(),
+                'url': reverse('projects:project_detail', args=[project.id]),
+            }
+    if ids[PRD_KIND]:
+        for prd in PRD.objects.filter(id__in=ids[PRD_KIND]).only('id', 'title', 'status'):
+            objects[(PRD_KIND, prd.id)] = {
+                'title': prd.title,
+                'context': f"PRD · {prd.get_status_display()}",
+                'url': reverse('projects:prd_detail', args=[prd.id]),
+            }
+
+    results = []
+    for kind, object_id in hits:
+        item = objects.get((kind, object_id))
+        if item is None:
+            # İndekste kalmış, silinmiş kayıt
+            continue
+        results.append({
+            'type': kind,
+            'id': object_id,
+            'title_html': highlight(item['title'], text),
+            **item,
+        })
+    return results
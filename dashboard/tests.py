@@ -1,3 +1,175 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.db import connection
 from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from config.instrumentation import QueryBudgetTestMixin
+from dashboard.search import create_search_tables, work_index
+from projects.models import PRD, Project
+from reports.models import Report
+from tasks.models import Task
+
+
+class DashboardQueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    """Ana panelin sorgu sayısı, veri miktarından bağımsız olarak bütçe içinde kalmalı"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='manager', password='test', role='admin')
+        for index in range(10):
+            project = Project.objects.create(
+                name=f'Proje {index}',
+                manager=self.user,
+                start_date=date.today(),
+                end_date=date.today() + timedelta(days=30),
+            )
+            project.team_members.add(self.user)
+            for task_index in range(5):
+                Task.objects.create(
+                    title=f'Görev {task_index}',
+                    project=project,
+                    creator=self.user,
+                    assignee=self.user,
+                    due_date=date.today() + timedelta(days=task_index),
+                )
+        self.client.force_login(self.user)
+
+    def test_index_within_query_budget(self):
+        response = self.client.get(reverse('dashboard:index'))
+        self.assertEqual(response.status_code, 200)
+        self.assertWithinQueryBudget(response)
+
+    def test_server_timing_header(self):
+        with self.settings(REQUEST_METRICS_HEADER=True):
+            response = self.client.get(reverse('dashboard:index'))
+        self.assertIn('db;dur=', response['Server-Timing'])
+
+    def test_cached_stats_invalidated_on_task_write(self):
+        self.client.get(reverse('dashboard:index'))
+        cached = self.client.get(reverse('dashboard:index'))
+        self.assertEqual(cached.context['total_tasks'], 50)
+        self.assertLessEqual(cached.request_metrics.query_count, 3)
+
+        Task.objects.create(title='Yeni', project=Project.objects.first(), creator=self.user)
+        response = self.client.get(reverse('dashboard:index'))
+        self.assertEqual(response.context['total_tasks'], 51)
+
+
+class PersonalMenuTests(QueryBudgetTestMixin, TestCase):
+    """Kişisel menü rapor tipi başına en yeni raporları ve sınırlı görev listesini göstermeli"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='member', password='test', role='team_member')
+        self.project = Project.objects.create(name='Proje', manager=self.user, start_date=date.today())
+        for index in range(7):
+            Report.objects.create(
+                title=f'Rapor {index}', report_type='workload', project=self.project, created_by=self.user
+            )
+        Report.objects.create(title='Zaman', report_type='time_usage', created_by=self.user)
+        for index in range(3):
+            Task.objects.create(title=f'Görev {index}', project=self.project, creator=self.user, assignee=self.user)
+        self.client.force_login(self.user)
+
+    def test_reports_limited_per_type(self):
+        response = self.client.get(reverse('dashboard:personal_menu'))
+        self.assertEqual(response.status_code, 200)
+        categories = response.context['report_categories']
+        self.assertEqual(len(categories['workload']['reports']), 5)
+        self.assertEqual(categories['workload']['reports'][0].title, 'Rapor 6')
+        self.assertEqual(len(categories['time_usage']['reports']), 1)
+        self.assertWithinQueryBudget(response)
+
+    def test_task_list_capped(self):
+        with mock.patch('dashboard.views.PERSONAL_MENU_TASK_LIMIT', 2):
+            response = self.client.get(reverse('dashboard:personal_menu'))
+        self.assertEqual(len(response.context['assigned_tasks']), 2)
+        self.assertEqual(response.context['assigned_task_count'](), 3)
+
+
+class WorkSearchTests(TestCase):
+    """Birleşik arama: Türkçe önek eşleşmesi, sıralama ve erişim kısıtlaması"""
+
+    def setUp(self):
+        self.manager = CustomUser.objects.create_user(username='manager', password='test', role='admin')
+        self.member = CustomUser.objects.create_user(username='member', password='test', role='team_member')
+        self.project = Project.objects.create(
+            name='Ödeme Altyapısı',
+            description='Kredi kartı entegrasyonu',
+            manager=self.manager,
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=30),
+        )
+        self.project.team_members.add(self.member)
+        self.other = Project.objects.create(
+            name='İç Araçlar',
+            manager=self.manager,
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=30),
+        )
+        self.body_match = Task.objects.create(
+            title='Hata düzeltmeleri', description='Ödeme sayfasındaki çökme',
+            project=self.project, creator=self.manager,
+        )
+        self.title_match = Task.objects.create(
+            title='Ödeme formu doğrulaması', project=self.project, creator=self.manager,
+        )
+        self.hidden = Task.objects.create(title='Ödeme raporu', project=self.other, creator=self.manager)
+        self.prd = PRD.objects.create(
+            title='Mobil uygulama', functional_requirements='Ödeme adımları', created_by=self.member,
+        )
+
+    def search(self, user, query, **params):
+        self.client.force_login(user)
+        response = self.client.get(reverse('dashboard:search'), {'q': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [(item['type'], item['id']) for item in response.json()['results']]
+
+    def test_prefix_match_ignores_turkish_letters(self):
+        results = self.search(self.manager, 'ODEM')
+        self.assertIn(('project', self.project.id), results)
+        self.assertIn(('task', self.hidden.id), results)
+        self.assertIn(('prd', self.prd.id), results)
+        self.assertEqual(self.search(self.manager, 'iç araç'), [('project', self.other.id)])
+
+    def test_title_matches_ranked_first(self):
+        results = self.search(self.manager, 'ödeme', type='task')
+        self.assertLess(results.index(('task', self.title_match.id)), results.index(('task', self.body_match.id)))
+
+    def test_member_sees_only_visible_records(self):
+        results = self.search(self.member, 'ödeme')
+        self.assertIn(('task', self.body_match.id), results)
+        self.assertIn(('prd', self.prd.id), results)
+        self.assertNotIn(('task', self.hidden.id), results)
+
+    def test_index_follows_updates_and_deletes(self):
+        self.title_match.title = 'Fatura formu'
+        self.title_match.save()
+        self.assertNotIn(('task', self.title_match.id), self.search(self.manager, 'ödeme'))
+        self.assertIn(('task', self.title_match.id), self.search(self.manager, 'fatura'))
+        self.title_match.delete()
+        self.assertEqual(self.search(self.manager, 'fatura'), [])
+
+    def test_existing_records_indexed_after_migrate(self):
+        work_index.clear()
+        self.assertEqual(self.search(self.manager, 'ödeme'), [])
+        create_search_tables()
+        self.assertIn(('task', self.title_match.id), self.search(self.manager, 'ödeme'))
+
+        # Güncellemeler satırı yerinde değiştirir; tablo tekrar doldurulmaz
+        self.title_match.save()
+        with mock.patch('dashboard.search.rebuild_index') as rebuild:
+            create_search_tables()
+        rebuild.assert_not_called()
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {work_index.table}")
+            self.assertEqual(cursor.fetchone()[0], 6)
 
-# Create your tests here.
+    def test_task_list_search_uses_index(self):
+        self.client.force_login(self.manager)
+        response = self.client.get(reverse('tasks:task_list'), {'search': 'odeme'})
+        self.assertEqual(
+            {task.id for task in response.context['tasks']},
+            {self.body_match.id, self.title_match.id, self.hidden.id},
+        )
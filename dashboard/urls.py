@@ -6,5 +6,6 @@ app_name = 'dashboard'
 urlpatterns = [
     path('', views.index, name='index'),
     path('personal-menu/', views.personal_menu, name='personal_menu'),
+    path('search/', views.search, name='search'),
     # Add more URL patterns for the dashboard app
 ] 
\ No newline at end of file
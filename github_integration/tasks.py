@@ -334,6 +334,44 @@ def sync_stale_issues():
     logger.info(f"Completed sync of stale issues. Success: {sync_count}, Errors: {error_count}")
     return f"Synced {sync_count} issues, {error_count} errors"
 
+@shared_task
+def sync_tasks_with_github(task_ids):
+    """
+    Toplu güncellenen görevlerin GitHub issue'larını tek işte senkronize eder
+    (durum değişikliğine göre issue kapatma/açma, başlık ve içerik güncelleme).
+    Repository başına proje yöneticisinin GitHub profili bir kez alınır.
+    """
+    issues = GitHubIssue.objects.filter(
+        task_id__in=task_ids
+    ).select_related('repository__project', 'task__project')
+    
+    profiles = {}
+    sync_count = 0
+    error_count = 0
+    
+    for github_issue in issues:
+        repository = github_issue.repository
+        if repository.id not in profiles:
+            profiles[repository.id] = GitHubProfile.objects.filter(
+                user_id=repository.project.manager_id
+            ).first()
+        github_profile = profiles[repository.id]
+        
+        if not github_profile:
+            logger.warning(f"No GitHub profile found for project manager of {repository}")
+            error_count += 1
+            continue
+        
+        success, message = sync_task_with_github_issue(github_issue.task, github_profile)
+        if success:
+            sync_count += 1
+        else:
+            error_count += 1
+            logger.error(f"Failed to sync issue: #{github_issue.issue_number}. Error: {message}")
+    
+    logger.info(f"Completed bulk task sync. Success: {sync_count}, Errors: {error_count}")
+    return f"Synced {sync_count} issues, {error_count} errors"
+
 @shared_task
 def sync_recent_issue_comments():
     """
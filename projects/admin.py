@@ -53,6 +53,10 @@ class ProjectAdmin(admin.ModelAdmin):
     )
     
     inlines = [AttachmentInline, PRDInline]
+    
+    def get_queryset(self, request):
+        # İlerleme ve gecikme sütunları için satır başına sorgu çalıştırılmaz
+        return super().get_queryset(request).select_related('manager').with_progress()
 
 @admin.register(Attachment)
 class AttachmentAdmin(admin.ModelAdmin):
@@ -0,0 +1,71 @@
+"""
+PRD dokümanları için önbellekli Markdown render.
+
+Render edilen HTML, dosya içeriğinin SHA-256 özeti ve Markdown eklenti
+listesiyle anahtarlanarak önbellekte tutulur. Özet, doküman yüklenirken
+hesaplanıp PRD.document_hash alanına yazılır (bkz. projects.models); böylece
+tekrar eden görüntülemeler dosyayı okumadan tek bir önbellek sorgusuyla
+yanıtlanır. Yeni doküman yüklendiğinde özet değişir ve eski kayıt kendiliğinden
+geçersiz olur; ilk render arka planda (Celery) önceden yapılır.
+"""
+import hashlib
+import os
+
+import markdown
+from django.conf import settings
+from django.core.cache import cache
+
+PRD_MARKDOWN_EXTENSIONS = ('extra', 'codehilite', 'toc')
+PRD_MARKDOWN_CACHE_TIMEOUT = getattr(settings, 'PRD_MARKDOWN_CACHE_TIMEOUT', 30 * 24 * 60 * 60)
+PRD_MARKDOWN_KEY = 'prd:markdown:{extensions}:{digest}'
+
+MARKDOWN_FILE_EXTENSIONS = ('.md', '.markdown')
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def is_markdown_document(name):
+    return os.path.splitext(name or '')[1].lower() in MARKDOWN_FILE_EXTENSIONS
+
+
+def hash_file(file):
+    """Dosya içeriğinin SHA-256 özeti; dosya konumu başa alınır"""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def markdown_cache_key(digest):
+    return PRD_MARKDOWN_KEY.format(extensions='-'.join(PRD_MARKDOWN_EXTENSIONS), digest=digest)
+
+
+def render_markdown(text):
+    return markdown.Markdown(extensions=list(PRD_MARKDOWN_EXTENSIONS)).convert(text)
+
+
+def get_rendered_document(prd):
+    """
+    PRD'nin Markdown dokümanını HTML olarak döndürür. Önbellekte varsa dosya
+    okunmaz; yoksa dosya okunur, özeti güncellenir ve sonuç önbelleğe yazılır.
+    """
+    if prd.document_hash:
+        html = cache.get(markdown_cache_key(prd.document_hash))
+        if html is not None:
+            return html
+
+    with prd.document.storage.open(prd.document.name, 'rb') as file:
+        raw = file.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    if digest != prd.document_hash:
+        # Eski kayıtlar veya yükleme dışında değişen dosyalar; sinyaller tetiklenmez
+        type(prd).objects.filter(pk=prd.pk).update(document_hash=digest)
+        prd.document_hash = digest
+
+    key = markdown_cache_key(digest)
+    html = cache.get(key)
+    if html is None:
+        html = render_markdown(raw.decode('utf-8'))
+        cache.set(key, html, PRD_MARKDOWN_CACHE_TIMEOUT)
+    return html
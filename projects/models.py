@@ -1,7 +1,65 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
 from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+
+class ProjectQuerySet(models.QuerySet):
+    """
+    Proje sorguları için yardımcılar.
+    """
+    
+    def for_member(self, user):
+        """
+        Kullanıcının yöneticisi veya üyesi olduğu projeler. distinct() yerine
+        alt sorgu kullanılır; böylece toplamalar birleştirme kaynaklı
+        tekrarlardan etkilenmez.
+        """
+        member_project_ids = Project.team_members.through.objects.filter(
+            customuser_id=user.pk
+        ).values('project_id')
+        return self.filter(Q(manager=user) | Q(id__in=member_project_ids))
+    
+    def with_progress(self):
+        """
+        Projelere task_total, task_completed, progress_pct ve is_overdue
+        alanlarını SQL ile ekler. Görev sayıları ilişkili alt sorgularla
+        hesaplanır; diğer filtrelerdeki birleştirmeler sayıları etkilemez.
+        """
+        from tasks.models import Task
+        
+        def task_count(**filters):
+            tasks = Task.objects.filter(project=OuterRef('pk'), **filters).order_by()
+            return Coalesce(
+                Subquery(tasks.values('project').annotate(count=Count('id')).values('count')),
+                Value(0),
+            )
+        
+        return self.annotate(
+            task_total=task_count(),
+            task_completed=task_count(status='completed'),
+        ).annotate(
+            progress_pct=Case(
+                When(task_total=0, then=Value(0)),
+                default=F('task_completed') * 100 / F('task_total'),
+                output_field=models.IntegerField(),
+            ),
+            is_overdue=Case(
+                When(
+                    Q(end_date__lt=timezone.now().date()) & ~Q(status='completed'),
+                    then=Value(True),
+                ),
+                default=Value(False),
+                output_field=models.BooleanField(),
+            ),
+        )
+
+
 class Project(models.Model):
     """
     Proje modeli. Şirket/ekip projelerini temsil eder.
@@ -50,6 +108,8 @@ class Project(models.Model):
     created_at = models.DateTimeField(_('Oluşturulma Tarihi'), auto_now_add=True)
     updated_at = models.DateTimeField(_('Güncellenme Tarihi'), auto_now=True)
     
+    objects = ProjectQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('Proje')
         verbose_name_plural = _('Projeler')
@@ -61,8 +121,18 @@ class Project(models.Model):
     @property
     def progress(self):
         """
-        Projenin ilerleme durumunu hesaplar.
+        Projenin ilerleme durumunu hesaplar. Sorgu with_progress() ile
+        oluşturulduysa ek sorgu çalıştırılmaz.
         """
+        progress_pct = getattr(self, 'progress_pct', None)
+        if progress_pct is not None:
+            return progress_pct
+        
+        total = getattr(self, 'task_total', None)
+        completed = getattr(self, 'task_completed', None)
+        if total is not None and completed is not None:
+            return int((completed / total) * 100) if total else 0
+        
         tasks = self.tasks.all()
         if not tasks:
             return 0
@@ -73,12 +143,21 @@ class Project(models.Model):
     @property
     def is_overdue(self):
         """
-        Projenin son tarihinin geçip geçmediğini kontrol eder.
+        Projenin son tarihinin geçip geçmediğini kontrol eder. Sorgu
+        with_progress() ile oluşturulduysa SQL'de hesaplanan değer kullanılır.
         """
-        from django.utils import timezone
+        annotated = self.__dict__.get('_is_overdue')
+        if annotated is not None:
+            return annotated
+        
         if self.end_date and self.status != 'completed':
             return self.end_date < timezone.now().date()
         return False
+    
+    @is_overdue.setter
+    def is_overdue(self, value):
+        # with_progress() anotasyonu model örneğine bu özellik üzerinden atanır
+        self.__dict__['_is_overdue'] = value
 
 
 class PRD(models.Model):
@@ -128,6 +207,9 @@ class PRD(models.Model):
         blank=True
     )
     
+    # Doküman içeriğinin SHA-256 özeti; render önbelleğinin anahtarı (bkz. projects.documents)
+    document_hash = models.CharField(_('Doküman Özeti'), max_length=64, blank=True, editable=False)
+    
     # PRD'nin atandığı proje (opsiyonel)
     project = models.ForeignKey(
         Project,
@@ -196,6 +278,10 @@ class PRD(models.Model):
     def __str__(self):
         return self.title
     
+    def get_document_url(self):
+        """PRD dosyasını yetki kontrolüyle sunan adres (MEDIA_URL yerine)"""
+        return reverse('projects:prd_document_file', kwargs={'prd_id': self.id})
+    
     def clean(self):
         """
         PRD'nin ya bir projeye ya da bir göreve atanmış olması gerekir.
@@ -267,3 +353,36 @@ class Attachment(models.Model):
     
     def __str__(self):
         return self.name
+    
+    def get_file_url(self):
+        """Dosyayı yetki kontrolüyle sunan adres (MEDIA_URL yerine)"""
+        return reverse('projects:attachment_file', kwargs={'attachment_id': self.id})
+
+
+@receiver(pre_save, sender=PRD)
+def update_prd_document_hash(sender, instance, **kwargs):
+    """Yeni yüklenen dokümanın içerik özetini hesaplar; doküman kaldırılırsa özeti temizler"""
+    from .documents import hash_file
+
+    instance._document_uploaded = False
+    if not instance.document:
+        instance.document_hash = ''
+    elif not instance.document._committed:
+        instance.document_hash = hash_file(instance.document.file)
+        instance._document_uploaded = True
+
+
+@receiver(post_save, sender=PRD)
+def schedule_prd_document_render(sender, instance, **kwargs):
+    """
+    Yeni Markdown dokümanının render önbelleğini işlem onaylandıktan sonra
+    arka planda doldurur. Kuyruk kapalıysa yükleme bekletilmez; doküman ilk
+    görüntülendiğinde render edilir.
+    """
+    from .documents import is_markdown_document
+
+    if not getattr(instance, '_document_uploaded', False) or not is_markdown_document(instance.document.name):
+        return
+    from communications.models import enqueue_task
+    from .tasks import render_prd_document
+    transaction.on_commit(lambda: enqueue_task(render_prd_document, instance.pk, fallback=False))
@@ -0,0 +1,15 @@
+from celery import shared_task
+
+
+@shared_task
+def render_prd_document(prd_id):
+    """PRD'nin Markdown dokümanını render edip önbelleğe yazar"""
+    from projects.documents import get_rendered_document, is_markdown_document
+    from projects.models import PRD
+
+    prd = PRD.objects.filter(pk=prd_id).first()
+    if not prd or not is_markdown_document(prd.document.name):
+        return "Render edilecek Markdown doküman yok."
+
+    get_rendered_document(prd)
+    return f"PRD dokümanı render edildi: {prd.document_hash[:12]}"
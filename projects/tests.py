@@ -1,3 +1,158 @@
-from django.test import TestCase
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from config.instrumentation import QueryBudgetTestMixin
+from tasks.models import Task
+
+from .documents import markdown_cache_key, render_markdown as markdown_render
+from .models import PRD, Project
+from .tasks import render_prd_document
+
+
+class ProjectProgressAnnotationTests(QueryBudgetTestMixin, TestCase):
+    """with_progress() anotasyonları model özellikleriyle aynı sonucu vermeli"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='member', password='test', role='team_member')
+        yesterday = date.today() - timedelta(days=1)
+        self.overdue = Project.objects.create(name='Gecikmiş', manager=self.user, start_date=yesterday, end_date=yesterday)
+        self.empty = Project.objects.create(name='Boş', start_date=yesterday, end_date=yesterday, status='completed')
+        self.empty.team_members.add(self.user)
+        for status in ('completed', 'completed', 'todo'):
+            Task.objects.create(title=status, project=self.overdue, creator=self.user, status=status)
+
+    def test_annotations_match_properties(self):
+        for project in Project.objects.with_progress():
+            plain = Project.objects.get(pk=project.pk)
+            self.assertEqual(project.progress, plain.progress)
+            self.assertEqual(project.is_overdue, plain.is_overdue)
+        annotated = Project.objects.with_progress().get(pk=self.overdue.pk)
+        self.assertEqual((annotated.task_total, annotated.task_completed, annotated.progress_pct), (3, 2, 66))
+        self.assertTrue(annotated.is_overdue)
+
+    def test_for_member_counts_are_not_duplicated(self):
+        self.overdue.team_members.add(self.user, CustomUser.objects.create_user(username='other'))
+        projects = Project.objects.for_member(self.user).with_progress()
+        self.assertEqual(projects.count(), 2)
+        self.assertEqual(projects.get(pk=self.overdue.pk).task_total, 3)
+
+    def test_project_list_within_query_budget(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('projects:project_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['overdue_projects'], 1)
+        self.assertWithinQueryBudget(response)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class PRDDocumentFileTests(TestCase):
+    """PRD dosyası akıtılarak, Range ve koşullu isteklerle sunulmalı"""
+
+    def setUp(self):
+        self.owner = CustomUser.objects.create_user(username='owner', password='test')
+        self.stranger = CustomUser.objects.create_user(username='stranger', password='test')
+        self.content = bytes(range(256)) * 40
+        self.prd = PRD.objects.create(
+            title='Belge', created_by=self.owner,
+            document=SimpleUploadedFile('belge.pdf', self.content, content_type='application/pdf'),
+        )
+        self.url = reverse('projects:prd_document_file', args=[self.prd.id])
+        self.client.force_login(self.owner)
+
+    def test_full_response_is_streamed(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+
+    def test_range_request(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(self.content)}')
+        self.assertEqual(b''.join(response.streaming_content), self.content[100:200])
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-10')
+        self.assertEqual(b''.join(response.streaming_content), self.content[-10:])
+
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+
+    def test_conditional_request(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # Dosya değiştiyse If-Range eşleşmez ve dosyanın tamamı gönderilir
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"eski"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_permission_checked(self):
+        self.client.force_login(self.stranger)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_offload_to_nginx(self):
+        with mock.patch('config.files.FILE_SERVE_MODE', 'nginx'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.prd.document.name}')
+        self.assertEqual(response.content, b'')
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class PRDMarkdownCacheTests(TestCase):
+    """Markdown dokümanı yüklenirken render edilmeli, tekrar görüntülemeler önbellekten gelmeli"""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = CustomUser.objects.create_user(username='owner', password='test')
+        self.client.force_login(self.owner)
+
+    def create_prd(self, text, broker_error=None):
+        # Kuyruk yerine görev doğrudan çalıştırılır (veya kuyruk hatası taklit edilir)
+        def apply_async(args, **kwargs):
+            if broker_error:
+                raise broker_error
+            render_prd_document(*args)
+
+        with mock.patch.object(render_prd_document, 'apply_async', side_effect=apply_async), \
+                self.captureOnCommitCallbacks(execute=True):
+            return PRD.objects.create(
+                title='Belge', created_by=self.owner,
+                document=SimpleUploadedFile('belge.md', text.encode('utf-8')),
+            )
+
+    def test_rendered_on_upload_and_served_from_cache(self):
+        prd = self.create_prd('# Başlık\n\n```python\nprint(1)\n```\n')
+        self.assertEqual(len(prd.document_hash), 64)
+        self.assertIsNotNone(cache.get(markdown_cache_key(prd.document_hash)))
+
+        with mock.patch('projects.documents.render_markdown') as render_markdown:
+            response = self.client.get(reverse('projects:prd_document_view', args=[prd.id]))
+        render_markdown.assert_not_called()
+        self.assertContains(response, 'Başlık</h1>')
+
+    def test_upload_not_blocked_when_broker_is_down(self):
+        with mock.patch('projects.documents.render_markdown', wraps=markdown_render) as render_markdown:
+            prd = self.create_prd('# Sonra', broker_error=ConnectionError())
+            render_markdown.assert_not_called()
+            response = self.client.get(reverse('projects:prd_document_view', args=[prd.id]))
+        render_markdown.assert_called_once()
+        self.assertContains(response, 'Sonra</h1>')
+
+    def test_new_document_invalidates(self):
+        prd = self.create_prd('# Eski')
+        old_hash = prd.document_hash
+        prd.document = SimpleUploadedFile('belge.md', '# Yeni'.encode('utf-8'))
+        with self.captureOnCommitCallbacks(execute=True):
+            prd.save()
+        self.assertNotEqual(prd.document_hash, old_hash)
+        response = self.client.get(reverse('projects:prd_document_view', args=[prd.id]))
+        self.assertContains(response, 'Yeni</h1>')
@@ -11,6 +11,7 @@ urlpatterns = [
     path('<int:project_id>/delete/', views.project_delete, name='project_delete'),
     path('<int:project_id>/attachment/', views.attachment_upload, name='attachment_upload'),
     path('attachment/<int:attachment_id>/delete/', views.attachment_delete, name='attachment_delete'),
+    path('attachment/<int:attachment_id>/file/', views.attachment_file, name='attachment_file'),
     
     # PRD URL'leri
     path('prd/', views.prd_list, name='prd_list'),
@@ -23,4 +24,5 @@ urlpatterns = [
     path('prd/<int:prd_id>/toggle-assign/', views.prd_toggle_assign, name='prd_toggle_assign'),
     path('prd/<int:prd_id>/detail/', views.prd_detail_ajax, name='prd_detail_ajax'),
     path('prd/<int:prd_id>/document/', views.prd_document_view, name='prd_document_view'),
+    path('prd/<int:prd_id>/document/file/', views.prd_document_file, name='prd_document_file'),
 ] 
\ No newline at end of file
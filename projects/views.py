@@ -1,7 +1,6 @@
 import os
 import mimetypes
-import markdown
-from django.http import HttpResponse, Http404
+from django.http import Http404
 from django.conf import settings
 from django.utils.safestring import mark_safe
 
@@ -17,7 +16,11 @@ from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 
 from .models import Project, Attachment, PRD
+from .documents import get_rendered_document
 from tasks.models import Task
+from tasks.tree import get_project_tree
+from dashboard.search import filter_by_search
+from config.files import serve_file
 
 @login_required
 def project_list(request):
@@ -30,14 +33,12 @@ def project_list(request):
     search = request.GET.get('search')
     
     # Temel sorgu
-    projects = Project.objects.all().prefetch_related('team_members', 'tasks')
+    projects = Project.objects.all()
     
     # Kullanıcı rolüne göre filtreleme
     if request.user.role != 'admin' and request.user.role != 'project_manager':
         # Yönetici değilse, sadece kendi projelerini görebilir
-        projects = projects.filter(
-            Q(manager=request.user) | Q(team_members=request.user)
-        ).distinct()
+        projects = projects.for_member(request.user)
     
     # Diğer filtreleri uygulama
     if status:
@@ -47,23 +48,22 @@ def project_list(request):
         projects = projects.filter(priority=priority)
     
     if search:
-        projects = projects.filter(
-            Q(name__icontains=search) | 
-            Q(description__icontains=search)
-        )
+        projects = filter_by_search(projects, 'project', search, ('name', 'description'))
     
-    # İstatistikleri hesapla
-    total_projects = projects.count()
-    active_projects = projects.filter(status='in_progress').count()
-    completed_projects = projects.filter(status='completed').count()
-    overdue_projects = projects.filter(end_date__lt=timezone.now().date()).exclude(status='completed').count()
+    # İstatistikleri tek sorguda hesapla
+    stats = projects.aggregate(
+        total_projects=Count('id'),
+        active_projects=Count('id', filter=Q(status='in_progress')),
+        completed_projects=Count('id', filter=Q(status='completed')),
+        overdue_projects=Count('id', filter=Q(end_date__lt=timezone.now().date()) & ~Q(status='completed')),
+    )
+    
+    # İlerleme ve gecikme bilgisi SQL'de hesaplanır (bkz. ProjectQuerySet.with_progress)
+    projects = projects.select_related('manager').with_progress()
     
     context = {
         'projects': projects,
-        'total_projects': total_projects,
-        'active_projects': active_projects,
-        'completed_projects': completed_projects,
-        'overdue_projects': overdue_projects,
+        **stats,
         'status_filter': status,
         'priority_filter': priority,
         'search_query': search,
@@ -87,25 +87,20 @@ def project_detail(request, project_id):
             messages.error(request, 'Bu projeyi görüntüleme yetkiniz yok.')
             return redirect('projects:project_list')
     
-    # Görevler ve metrikleri getir
-    tasks = project.tasks.all().select_related('assignee')
+    # Görev hiyerarşisi tek sorguda yüklenir; düğümler ağaç sırasıyla listelenir
+    task_nodes = [node for root in get_project_tree(project.id) for node in root.walk()]
     
     # Görev istatistikleri
-    task_counts = {
-        'total': tasks.count(),
-        'todo': tasks.filter(status='todo').count(),
-        'in_progress': tasks.filter(status='in_progress').count(),
-        'review': tasks.filter(status='review').count(),
-        'completed': tasks.filter(status='completed').count(),
-        'cancelled': tasks.filter(status='cancelled').count(),
-    }
+    task_counts = {'total': len(task_nodes), 'todo': 0, 'in_progress': 0, 'review': 0, 'completed': 0, 'cancelled': 0}
+    for node in task_nodes:
+        task_counts[node.task.status] = task_counts.get(node.task.status, 0) + 1
     
     # Dosya ekleri
     attachments = project.attachments.all().select_related('uploaded_by')
     
     context = {
         'project': project,
-        'tasks': tasks,
+        'task_nodes': task_nodes,
         'task_counts': task_counts,
         'attachments': attachments,
         'title': project.name,
@@ -327,6 +322,29 @@ def attachment_upload(request, project_id):
     
     return render(request, 'projects/attachment_form.html', context)
 
+def can_view_attachment(user, attachment):
+    """
+    Yöneticiler, dosyayı yükleyen, ekin projesinin yöneticisi/üyeleri ve
+    görev ekleri için görevin atandığı kullanıcı dosyayı görebilir.
+    """
+    if user.role in ('admin', 'project_manager') or attachment.uploaded_by_id == user.id:
+        return True
+    if attachment.task_id and attachment.task.assignee_id == user.id:
+        return True
+    project_id = attachment.project_id or (attachment.task.project_id if attachment.task_id else None)
+    return project_id is not None and Project.objects.for_member(user).filter(id=project_id).exists()
+
+@login_required
+def attachment_file(request, attachment_id):
+    """Dosya ekini akıtarak sunar; ?download=1 ile indirilir"""
+    attachment = get_object_or_404(Attachment.objects.select_related('task'), id=attachment_id)
+    if not can_view_attachment(request.user, attachment):
+        raise Http404("Dosya bulunamadı.")
+    return serve_file(
+        request, attachment.file,
+        as_attachment=request.GET.get('download') == '1',
+    )
+
 @login_required
 def attachment_delete(request, attachment_id):
     """
@@ -400,11 +418,9 @@ def prd_list(request):
         prds = prds.filter(status=status)
     
     if search:
-        prds = prds.filter(
-            Q(title__icontains=search) | 
-            Q(product_summary__icontains=search) |
-            Q(target_audience__icontains=search) |
-            Q(functional_requirements__icontains=search)
+        prds = filter_by_search(
+            prds, 'prd', search,
+            ('title', 'product_summary', 'target_audience', 'functional_requirements')
         )
     
     if assigned_to:
@@ -788,6 +804,23 @@ def prd_delete(request, prd_id):
     
     return render(request, 'projects/prd_delete.html', context)
 
+def can_view_prd_document(user, prd):
+    """Yöneticiler, PRD'yi oluşturan ve atayan kullanıcı PRD dosyasını görebilir"""
+    if user.role in ('admin', 'project_manager'):
+        return True
+    return user == prd.created_by or user == prd.assigned_by
+
+@login_required
+def prd_document_file(request, prd_id):
+    """
+    PRD dosyasını olduğu gibi (akıtarak, Range ve ETag desteğiyle) sunar.
+    ?download=1 ile indirilir.
+    """
+    prd = get_object_or_404(PRD, id=prd_id)
+    if not can_view_prd_document(request.user, prd):
+        raise Http404("PRD dosyası bulunamadı.")
+    return serve_file(request, prd.document, as_attachment=request.GET.get('download') == '1')
+
 @login_required
 def prd_document_view(request, prd_id):
     """
@@ -796,10 +829,9 @@ def prd_document_view(request, prd_id):
     prd = get_object_or_404(PRD, id=prd_id)
     
     # Yetkilendirme kontrolü
-    if request.user.role != 'admin' and request.user.role != 'project_manager':
-        if request.user != prd.created_by and request.user != prd.assigned_by:
-            messages.error(request, 'Bu PRD\'yi görüntüleme yetkiniz yok.')
-            return redirect('projects:prd_list')
+    if not can_view_prd_document(request.user, prd):
+        messages.error(request, 'Bu PRD\'yi görüntüleme yetkiniz yok.')
+        return redirect('projects:prd_list')
     
     if not prd.document:
         raise Http404("PRD dosyası bulunamadı.")
@@ -813,12 +845,8 @@ def prd_document_view(request, prd_id):
     # Markdown dosyası ise
     if file_extension in ['.md', '.markdown']:
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-            
-            # Markdown'ı HTML'e çevir
-            md = markdown.Markdown(extensions=['extra', 'codehilite', 'toc'])
-            html_content = md.convert(content)
+            # Render edilmiş HTML içerik özetiyle önbellekten gelir (bkz. projects.documents)
+            html_content = get_rendered_document(prd)
             
             context = {
                 'prd': prd,
@@ -833,16 +861,9 @@ def prd_document_view(request, prd_id):
             messages.error(request, f'Dosya okuma hatası: {str(e)}')
             return redirect('projects:prd_detail', prd_id=prd.id)
     
-    # PDF dosyası ise
+    # PDF dosyası ise (Range desteğiyle akıtılır; görüntüleyici sayfa atlayabilir)
     elif file_extension == '.pdf':
-        try:
-            with open(file_path, 'rb') as file:
-                response = HttpResponse(file.read(), content_type='application/pdf')
-                response['Content-Disposition'] = f'inline; filename="{os.path.basename(file_path)}"'
-                return response
-        except Exception as e:
-            messages.error(request, f'PDF dosyası okuma hatası: {str(e)}')
-            return redirect('projects:prd_detail', prd_id=prd.id)
+        return serve_file(request, prd.document, content_type='application/pdf')
     
     # Diğer dosya türleri için basit metin görüntüleme
     else:
@@ -866,10 +887,7 @@ def prd_document_view(request, prd_id):
                 return render(request, 'projects/prd_document_view.html', context)
             else:
                 # İndirilebilir dosya
-                with open(file_path, 'rb') as file:
-                    response = HttpResponse(file.read(), content_type=mime_type or 'application/octet-stream')
-                    response['Content-Disposition'] = f'inline; filename="{os.path.basename(file_path)}"'
-                    return response
+                return serve_file(request, prd.document)
                     
         except Exception as e:
             messages.error(request, f'Dosya okuma hatası: {str(e)}')
@@ -9,7 +9,7 @@ from datetime import datetime, timedelta
 
 from .models import Report, ReportSubscription
 from projects.models import Project
-from tasks.models import Task, TimeLog
+from tasks.models import DailyTimeTotal, Task
 from accounts.models import CustomUser
 
 # Create your views here.
@@ -286,18 +286,16 @@ def generate_project_progress_data(report):
     date_from = report.date_from
     date_to = report.date_to or timezone.now().date()
     
-    # Proje kontrolü
-    if report.project:
-        projects = [report.project]
-    else:
-        projects = Project.objects.all()
+    # Proje kontrolü; görev sayıları ve gecikme bilgisi SQL'de hesaplanır
+    projects = Project.objects.with_progress()
+    if report.project_id:
+        projects = projects.filter(pk=report.project_id)
     
     # Proje verilerini topla
     project_data = []
     for project in projects:
-        tasks = project.tasks.all()
-        total_tasks = tasks.count()
-        completed_tasks = tasks.filter(status='completed').count()
+        total_tasks = project.task_total
+        completed_tasks = project.task_completed
         progress = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
         
         project_data.append({
@@ -321,11 +319,11 @@ def generate_time_usage_data(report):
     date_from = report.date_from
     date_to = report.date_to or timezone.now().date()
     
-    # Proje kontrolü
+    # Proje kontrolü (zaman kayıtları yerine önceden hesaplanmış günlük toplamlar)
     if report.project:
-        time_logs = TimeLog.objects.filter(task__project=report.project)
+        time_logs = DailyTimeTotal.objects.filter(project=report.project)
     else:
-        time_logs = TimeLog.objects.all()
+        time_logs = DailyTimeTotal.objects.all()
     
     # Tarih aralığına göre filtrele
     if date_from:
@@ -350,7 +348,7 @@ def generate_time_usage_data(report):
             item['percentage'] = 0
     
     # Projelere göre saatler
-    project_hours = time_logs.values('task__project__name') \
+    project_hours = time_logs.values('project__name') \
                             .annotate(total_hours=Sum('hours')) \
                             .order_by('-total_hours')
     
@@ -424,7 +422,7 @@ def generate_user_performance_data(report):
         total_completed_tasks += completed_count
         
         # Toplam süre
-        time_logs = TimeLog.objects.filter(user=user)
+        time_logs = DailyTimeTotal.objects.filter(user=user)
         if date_from:
             time_logs = time_logs.filter(date__gte=date_from)
         if date_to:
@@ -541,7 +539,7 @@ def generate_workload_data(report):
         
         # Son 30 günde harcanan süre
         thirty_days_ago = today - timedelta(days=30)
-        recent_hours = TimeLog.objects.filter(
+        recent_hours = DailyTimeTotal.objects.filter(
             user=user,
             date__gte=thirty_days_ago
         ).aggregate(total=Sum('hours'))['total'] or 0
@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator
 import os
@@ -320,6 +321,10 @@ class ProjectFile(models.Model):
     def __str__(self):
         return f"{self.sale.project_name} - {self.version_number} ({self.file_type})"
     
+    def get_file_url(self):
+        """Dosyayı yetki kontrolüyle sunan adres (MEDIA_URL yerine)"""
+        return reverse('sellers:file_download', kwargs={'pk': self.pk})
+    
     def save(self, *args, **kwargs):
         """Dosya boyutunu hesapla ve dosya adını otomatik doldur"""
         if self.file:
@@ -25,6 +25,7 @@ urlpatterns = [
     path('sales/<int:sale_pk>/files/upload/', views.file_upload, name='file_upload'),
     path('files/<int:pk>/delete/', views.file_delete, name='file_delete'),
     path('files/<int:pk>/preview/', views.file_preview, name='file_preview'),
+    path('files/<int:pk>/download/', views.file_download, name='file_download'),
     
     # Fiyatlandırma
     path('sales/<int:sale_pk>/pricing/', views.price_calculator, name='price_calculator'),
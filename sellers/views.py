@@ -12,6 +12,7 @@ import json
 import os
 
 from accounts.models import CustomUser
+from config.files import serve_file
 from .models import Customer, ProjectSale, ProjectFile, SaleExtraService, AdditionalCost, PaymentReceipt
 from .forms import (
     CustomerForm, ProjectSaleForm, ProjectFileForm, 
@@ -332,6 +333,18 @@ def file_delete(request, pk):
     return redirect('sellers:sale_detail', pk=sale_pk)
 
 
+@login_required
+@seller_required
+def file_download(request, pk):
+    """Proje dosyasını akıtarak sunar (Range desteğiyle; video/ses önizlemesi de bunu kullanır)"""
+    file_obj = get_object_or_404(ProjectFile, pk=pk, uploaded_by=request.user)
+    return serve_file(
+        request, file_obj.file,
+        filename=file_obj.file_name or None,
+        as_attachment=request.GET.get('download') == '1',
+    )
+
+
 @login_required
 @seller_required
 def file_preview(request, pk):
@@ -0,0 +1,106 @@
+"""
+Proje panosu (Kanban) için JSON verisi.
+
+Görevler duruma göre sütunlara ayrılır ve kısa bir biçimde döndürülür
+(id, başlık, atanan kullanıcı ID'si, öncelik). Kullanıcı adları her görevde
+tekrarlanmaz; ayrı bir kullanıcı sözlüğü olarak gönderilir ve önbellekte
+tutulur.
+
+Her görev yazımında projenin pano sürümü arttırılır (bkz. tasks.models).
+Yanıtların ETag'i bu sürümdür; değişiklik yoksa If-None-Match ile 304 döner.
+?since=<sürüm> ile yalnızca o sürümden sonra değişen ve kaldırılan görevler
+döndürülür.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from accounts.models import CustomUser
+
+from .models import Task, TaskBoardChange
+
+TASK_BOARD_USERS_CACHE_TIMEOUT = getattr(settings, 'TASK_BOARD_USERS_CACHE_TIMEOUT', 300)
+TASK_BOARD_USERS_KEY = 'tasks:board:users:{project_id}:{version}'
+
+BOARD_FIELDS = ('id', 'title', 'status', 'assignee_id', 'priority')
+
+
+def board_etag(project_id, version):
+    return f'"board-{project_id}-{version}"'
+
+
+def _task_data(row):
+    task_id, title, _, assignee_id, priority = row
+    return {'id': task_id, 'title': title, 'assignee': assignee_id, 'priority': priority}
+
+
+def get_board_users(project_id, version):
+    """
+    Panoda görünebilecek kullanıcılar (proje yöneticisi, üyeler ve görevlere
+    atananlar): {id: {'name', 'username'}}. Pano sürümüyle birlikte yenilenir.
+    """
+    key = TASK_BOARD_USERS_KEY.format(project_id=project_id, version=version)
+    users = cache.get(key)
+    if users is None:
+        rows = CustomUser.objects.filter(
+            Q(managed_projects__id=project_id)
+            | Q(assigned_projects__id=project_id)
+            | Q(id__in=Task.objects.filter(project_id=project_id, assignee__isnull=False).values('assignee_id'))
+        ).distinct().values_list('id', 'username', 'first_name', 'last_name')
+        users = {
+            user_id: {'name': f"{first_name} {last_name}".strip() or username, 'username': username}
+            for user_id, username, first_name, last_name in rows
+        }
+        cache.set(key, users, TASK_BOARD_USERS_CACHE_TIMEOUT)
+    return users
+
+
+def get_board(project_id, version):
+    """
+    Projenin tüm panosu. Sürüm görevlerden önce okunmalıdır; arada yapılan
+    bir yazım en fazla bir sonraki delta isteğinde tekrar gönderilir.
+    """
+    columns = {status: [] for status, _ in Task.STATUS_CHOICES}
+    rows = Task.objects.filter(project_id=project_id).order_by('id').values_list(*BOARD_FIELDS)
+    for row in rows:
+        columns[row[2]].append(_task_data(row))
+    return {
+        'version': version,
+        'full': True,
+        'columns': columns,
+        'users': get_board_users(project_id, version),
+    }
+
+
+def get_board_delta(project_id, version, since):
+    """
+    since sürümünden sonra değişen görevler (yeni durumlarıyla) ve panodan
+    kaldırılan görev ID'leri.
+    """
+    changes = TaskBoardChange.objects.filter(
+        project_id=project_id, version__gt=since
+    ).values_list('task_id', 'removed')
+    removed = []
+    changed_ids = []
+    for task_id, is_removed in changes:
+        (removed if is_removed else changed_ids).append(task_id)
+
+    changed = []
+    found = set()
+    if changed_ids:
+        rows = Task.objects.filter(project_id=project_id, id__in=changed_ids).order_by('id').values_list(*BOARD_FIELDS)
+        for row in rows:
+            found.add(row[0])
+            changed.append({**_task_data(row), 'status': row[2]})
+    # Değişiklik kaydından sonra silinen veya taşınan görevler
+    removed.extend(task_id for task_id in changed_ids if task_id not in found)
+
+    users = get_board_users(project_id, version) if changed else {}
+    assignee_ids = {task['assignee'] for task in changed}
+    return {
+        'version': version,
+        'full': False,
+        'changed': changed,
+        'removed': sorted(removed),
+        'users': {user_id: data for user_id, data in users.items() if user_id in assignee_ids},
+    }
@@ -0,0 +1,218 @@
+"""
+Toplu görev işlemleri.
+
+Seçilen görevlerin durumu, atanan kişisi ve önceliği tek bir işlem (transaction)
+içinde bulk_update ile değiştirilir. Bildirim alıcıları bir kez hesaplanır ve
+alıcı başına tek bildirim toplu olarak eklenir; birleştirme penceresindeki
+okunmamış toplu bildirimler yeni kayıt yerine güncellenir. GitHub issue'suna
+bağlı görevlerin senkronizasyonu işlem onaylandıktan sonra tek bir arka plan
+görevine bırakılır ve hiçbir durumda istek içinde çalıştırılmaz.
+
+bulk_update sinyal tetiklemediği için bağımlılık planı ve ana panel
+önbellekleri burada açıkça geçersiz kılınır; proje panolarının sürümü de
+proje başına bir kez arttırılır.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from communications.models import Notification, bulk_create_notifications, enqueue_task, make_coalesce_key
+
+from .models import Task, invalidate_project_graph, record_board_changes
+
+# Tek istekte değiştirilebilecek en fazla görev sayısı
+TASK_BULK_MAX_TASKS = getattr(settings, 'TASK_BULK_MAX_TASKS', 500)
+# Toplu bildirim içeriğinde adı yazılan en fazla görev sayısı
+TASK_BULK_NOTIFICATION_TITLES = 5
+
+BULK_FIELDS = ('status', 'assignee', 'priority')
+
+
+class BulkUpdateError(ValueError):
+    """Geçersiz toplu işlem isteği"""
+
+
+def clean_changes(data):
+    """
+    İstek verisinden uygulanacak değişiklikleri doğrular. Boş bırakılan
+    alanlar değiştirilmez; atanan kişi için 'none' ataması kaldırır.
+    """
+    changes = {}
+    status = data.get('status')
+    if status:
+        if status not in dict(Task.STATUS_CHOICES):
+            raise BulkUpdateError('Geçersiz durum.')
+        changes['status'] = status
+    priority = data.get('priority')
+    if priority:
+        if priority not in dict(Task.PRIORITY_CHOICES):
+            raise BulkUpdateError('Geçersiz öncelik.')
+        changes['priority'] = priority
+    assignee = data.get('assignee')
+    if assignee:
+        if assignee == 'none':
+            changes['assignee'] = None
+        else:
+            try:
+                changes['assignee'] = CustomUser.objects.get(pk=int(assignee), is_active=True)
+            except (ValueError, CustomUser.DoesNotExist):
+                raise BulkUpdateError('Geçersiz kullanıcı.')
+    if not changes:
+        raise BulkUpdateError('Değiştirilecek bir alan seçin.')
+    return changes
+
+
+def _can_change(user, task, changes):
+    """Görev düzenleme sayfasıyla aynı kural (bkz. Task.get_edit_access)"""
+    access = task.get_edit_access(user)
+    return access == 'all' or (access == 'status' and set(changes) == {'status'})
+
+
+def bulk_update_tasks(user, task_ids, changes):
+    """
+    Değişiklikleri yetkili olunan görevlere uygular.
+
+    Dönüş: {'updated': [görev id], 'skipped': [yetki olmayan görev id],
+    'not_found': [bulunamayan görev id], 'notifications': eklenen bildirim sayısı}
+    """
+    task_ids = list(dict.fromkeys(task_ids))
+    if not task_ids:
+        raise BulkUpdateError('Görev seçilmedi.')
+    if len(task_ids) > TASK_BULK_MAX_TASKS:
+        raise BulkUpdateError(f'Tek seferde en fazla {TASK_BULK_MAX_TASKS} görev güncellenebilir.')
+
+    today = timezone.localdate()
+    new_assignee = changes.get('assignee')
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.select_for_update(of=('self',))
+            .select_related('project')
+            .filter(id__in=task_ids)
+        )
+        found = {task.id for task in tasks}
+        skipped = []
+        changed = []
+        events = []
+        for task in tasks:
+            if not _can_change(user, task, changes):
+                skipped.append(task.id)
+                continue
+            status_changed = 'status' in changes and task.status != changes['status']
+            assignee_changed = 'assignee' in changes and task.assignee_id != (new_assignee.pk if new_assignee else None)
+            priority_changed = 'priority' in changes and task.priority != changes['priority']
+            if not (status_changed or assignee_changed or priority_changed):
+                continue
+            if status_changed:
+                if changes['status'] == 'completed':
+                    task.completed_date = today
+                elif task.status == 'completed':
+                    task.completed_date = None
+                task.status = changes['status']
+            if assignee_changed:
+                task.assignee = new_assignee
+            if priority_changed:
+                task.priority = changes['priority']
+            task.updated_at = timezone.now()
+            changed.append(task)
+            events.append((task, status_changed, assignee_changed))
+
+        Task.objects.bulk_update(
+            changed,
+            ['status', 'completed_date', 'assignee', 'priority', 'updated_at'],
+            batch_size=500,
+        )
+        notifications = build_notifications(user, events)
+        # Art arda yapılan toplu düzenlemeler okunmamış bildirimlerle birleştirilir
+        bulk_create_notifications(notifications)
+
+        if changed:
+            changed_ids = [task.id for task in changed]
+            invalidate_project_graph(task.project_id for task in changed)
+            by_project = {}
+            for task in changed:
+                by_project.setdefault(task.project_id, []).append(task.id)
+            for project_id, ids in by_project.items():
+                record_board_changes(project_id, ids)
+            transaction.on_commit(lambda: _after_commit(changed_ids))
+
+    return {
+        'updated': [task.id for task in changed],
+        'skipped': skipped,
+        'not_found': [task_id for task_id in task_ids if task_id not in found],
+        'notifications': len(notifications),
+    }
+
+
+def build_notifications(user, events):
+    """
+    Bildirim alıcılarını bir kez hesaplar ve alıcı başına tek bildirim
+    hazırlar. Tek görevden etkilenen alıcıya görevin kendisiyle ilgili,
+    birden fazla görevden etkilenene özet bir bildirim gider.
+    """
+    actor = user.get_full_name() or user.username
+    per_recipient = {}
+    for task, status_changed, assignee_changed in events:
+        recipients = set()
+        if status_changed:
+            recipients.update([task.project.manager_id, task.creator_id, task.assignee_id])
+        if assignee_changed:
+            recipients.update([task.project.manager_id, task.assignee_id])
+        recipients.discard(None)
+        recipients.discard(user.id)
+        for recipient_id in recipients:
+            per_recipient.setdefault(recipient_id, []).append((task, status_changed, assignee_changed))
+
+    status_labels = dict(Task.STATUS_CHOICES)
+    notifications = []
+    for recipient_id, items in per_recipient.items():
+        if len(items) == 1:
+            task, status_changed, assignee_changed = items[0]
+            if assignee_changed and task.assignee_id == recipient_id:
+                title = f"Görev atandı: {task.title}"
+                content = f"{actor} size görev atadı: {task.title}"
+            elif status_changed:
+                title = f"Görev durumu değişti: {task.title}"
+                content = f"{actor} görevi '{status_labels.get(task.status, task.status)}' olarak işaretledi: {task.title}"
+            else:
+                title = f"Görev atandı: {task.title}"
+                content = f"{actor} görevin atamasını değiştirdi: {task.title}"
+            notifications.append(Notification(
+                recipient_id=recipient_id,
+                sender=user,
+                title=title,
+                content=content,
+                notification_type='success' if status_changed and task.status == 'completed' else 'info',
+                related_task=task,
+                related_project=task.project,
+                coalesce_key=make_coalesce_key('task_bulk', target=f"task:{task.id}"),
+            ))
+            continue
+
+        titles = [task.title for task, _, _ in items[:TASK_BULK_NOTIFICATION_TITLES]]
+        more = len(items) - len(titles)
+        project_ids = {task.project_id for task, _, _ in items}
+        notifications.append(Notification(
+            recipient_id=recipient_id,
+            sender=user,
+            title=f"{len(items)} görev güncellendi",
+            content=f"{actor} {len(items)} görevi toplu olarak güncelledi: " + ", ".join(titles)
+            + (f" ve {more} görev daha" if more else ""),
+            notification_type='info',
+            related_project=items[0][0].project if len(project_ids) == 1 else None,
+            coalesce_key=make_coalesce_key('task_bulk', target=f"user:{user.id}"),
+        ))
+    return notifications
+
+
+def _after_commit(task_ids):
+    """Ana panel önbelleğini yeniler ve GitHub'a bağlı görevleri tek arka plan görevinde senkronize eder"""
+    from dashboard.models import invalidate_dashboard_cache
+    from github_integration.models import GitHubIssue
+    from github_integration.tasks import sync_tasks_with_github
+
+    invalidate_dashboard_cache()
+    linked = list(GitHubIssue.objects.filter(task_id__in=task_ids).values_list('task_id', flat=True))
+    if linked:
+        # İstek içinde GitHub'a gidilmez; kuyruk kapalıysa sync_stale_issues telafi eder
+        enqueue_task(sync_tasks_with_github, linked, fallback=False)
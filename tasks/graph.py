@@ -0,0 +1,315 @@
+"""
+Görev bağımlılık grafiği ve zaman planı hesaplamaları.
+
+Bir projenin görevleri ve bağımlılıkları iki sorguda yüklenir, görevler
+0..n-1 arası indekslere çevrilir ve komşuluk listeleri üzerinde çalışılır:
+
+- topolojik sıra (Kahn algoritması) ve döngü tespiti (Tarjan, iteratif),
+- estimate_hours ile en erken başlangıç/bitiş (ileri geçiş),
+- due_date ve proje bitişi ile en geç başlangıç/bitiş (geri geçiş),
+- bolluk (slack) ve kritik yol.
+
+Süreler saat cinsindendir; saatler TASK_GRAPH_HOURS_PER_DAY ile takvim
+günlerine çevrilir (hafta sonları ayrıca dikkate alınmaz). Sonuçlar proje
+başına önbellekte tutulur; görev veya bağımlılık değiştiğinde projenin
+grafik sürümü arttırılır (bkz. tasks.models).
+"""
+from collections import deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Task, get_graph_version
+
+TASK_GRAPH_CACHE_TIMEOUT = getattr(settings, 'TASK_GRAPH_CACHE_TIMEOUT', 600)
+TASK_GRAPH_HOURS_PER_DAY = getattr(settings, 'TASK_GRAPH_HOURS_PER_DAY', 8)
+# Tahmini süresi girilmemiş görevler için varsayılan süre (saat)
+TASK_GRAPH_DEFAULT_HOURS = getattr(settings, 'TASK_GRAPH_DEFAULT_HOURS', 8)
+TASK_GRAPH_KEY = 'tasks:graph:{project_id}:{version}'
+
+# Kayan nokta karşılaştırmaları için tolerans (saat)
+EPSILON = 1e-6
+
+
+class TaskGraph:
+    """
+    Bir projenin görev grafiği. Görevler indekslerle, bağımlılıklar
+    önkoşul -> bağımlı görev yönünde komşuluk listeleriyle tutulur.
+    """
+
+    def __init__(self, anchor, ids, titles, statuses, durations, releases, deadlines, edges):
+        self.anchor = anchor
+        self.ids = ids
+        self.titles = titles
+        self.statuses = statuses
+        self.durations = durations
+        self.releases = releases
+        self.deadlines = deadlines
+        size = len(ids)
+        self.successors = [[] for _ in range(size)]
+        self.predecessors = [[] for _ in range(size)]
+        for source, target in edges:
+            self.successors[source].append(target)
+            self.predecessors[target].append(source)
+
+    @classmethod
+    def load(cls, project_id):
+        """Projenin görev grafiğini iki sorguda yükler"""
+        rows = list(
+            Task.objects.filter(project_id=project_id)
+            .order_by('id')
+            .values_list('id', 'title', 'status', 'estimate_hours', 'start_date', 'due_date',
+                         'project__start_date')
+        )
+        anchor = rows[0][6] if rows else None
+        index = {row[0]: position for position, row in enumerate(rows)}
+
+        # Bağımlılık satırı: from_task, to_task'ı bekler (to_task -> from_task kenarı).
+        # Başka projelerdeki önkoşullar plana dahil edilmez.
+        edges = []
+        dependency_rows = Task.dependencies.through.objects.filter(
+            from_task__project_id=project_id
+        ).values_list('to_task_id', 'from_task_id')
+        for prerequisite_id, dependent_id in dependency_rows:
+            if prerequisite_id in index and dependent_id in index:
+                edges.append((index[prerequisite_id], index[dependent_id]))
+
+        durations = []
+        releases = []
+        deadlines = []
+        for _, _, status, estimate, start_date, due_date, _ in rows:
+            if status == 'cancelled':
+                durations.append(0.0)
+            else:
+                durations.append(float(estimate) if estimate is not None else float(TASK_GRAPH_DEFAULT_HOURS))
+            releases.append(cls._hours_from(anchor, start_date, end_of_day=False))
+            deadlines.append(cls._hours_from(anchor, due_date, end_of_day=True))
+
+        return cls(
+            anchor=anchor,
+            ids=[row[0] for row in rows],
+            titles=[row[1] for row in rows],
+            statuses=[row[2] for row in rows],
+            durations=durations,
+            releases=releases,
+            deadlines=deadlines,
+            edges=edges,
+        )
+
+    @staticmethod
+    def _hours_from(anchor, value, end_of_day):
+        """Tarihi proje başlangıcından itibaren çalışma saatine çevirir"""
+        if anchor is None or value is None:
+            return None
+        days = (value - anchor).days + (1 if end_of_day else 0)
+        return float(days * TASK_GRAPH_HOURS_PER_DAY)
+
+    def to_date(self, hours, finish=False):
+        """
+        Proje başlangıcından itibaren geçen saati takvim gününe çevirir.
+        Bitişlerde gün sonunda biten iş o güne sayılır.
+        """
+        if self.anchor is None or hours is None:
+            return None
+        if finish and hours > 0:
+            hours -= EPSILON
+        return self.anchor + timedelta(days=int(hours // TASK_GRAPH_HOURS_PER_DAY))
+
+    def topological_order(self):
+        """
+        Kahn algoritmasıyla topolojik sıra (indeks listesi) döndürür.
+        Döngüdeki veya döngüye bağlı görevler sıraya girmez.
+        """
+        indegree = [len(predecessors) for predecessors in self.predecessors]
+        queue = deque(node for node, degree in enumerate(indegree) if degree == 0)
+        order = []
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for successor in self.successors[node]:
+                indegree[successor] -= 1
+                if indegree[successor] == 0:
+                    queue.append(successor)
+        return order
+
+    def find_cycles(self, nodes=None):
+        """
+        Döngüleri (birden fazla görevli güçlü bağlı bileşenler veya kendine
+        bağımlı görevler) indeks listeleri olarak döndürür. Tarjan
+        algoritmasının özyinelemesiz uygulaması.
+        """
+        nodes = range(len(self.ids)) if nodes is None else nodes
+        allowed = set(nodes)
+        counter = 0
+        indexes = {}
+        lowlinks = {}
+        stack = []
+        on_stack = set()
+        cycles = []
+
+        for root in nodes:
+            if root in indexes:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, child_position = work.pop()
+                if child_position == 0:
+                    indexes[node] = lowlinks[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack.add(node)
+                recurse = False
+                successors = self.successors[node]
+                for position in range(child_position, len(successors)):
+                    successor = successors[position]
+                    if successor not in allowed:
+                        continue
+                    if successor not in indexes:
+                        work.append((node, position + 1))
+                        work.append((successor, 0))
+                        recurse = True
+                        break
+                    if successor in on_stack:
+                        lowlinks[node] = min(lowlinks[node], indexes[successor])
+                if recurse:
+                    continue
+                if lowlinks[node] == indexes[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in self.successors[node]:
+                        cycles.append(sorted(component))
+                if work:
+                    parent = work[-1][0]
+                    lowlinks[parent] = min(lowlinks[parent], lowlinks[node])
+        return cycles
+
+    def schedule(self):
+        """
+        Zaman planını hesaplar. Döngü varsa plan yalnızca topolojik sıraya
+        girebilen görevler için hesaplanır; diğerleri None değer alır.
+        """
+        size = len(self.ids)
+        order = self.topological_order()
+        blocked = [] if len(order) == size else sorted(set(range(size)) - set(order))
+        cycles = self.find_cycles(blocked) if blocked else []
+
+        # İleri geçiş: en erken başlangıç ve bitiş
+        earliest_start = [None] * size
+        earliest_finish = [None] * size
+        for node in order:
+            start = self.releases[node] or 0.0
+            for predecessor in self.predecessors[node]:
+                start = max(start, earliest_finish[predecessor])
+            earliest_start[node] = start
+            earliest_finish[node] = start + self.durations[node]
+
+        project_finish = max((earliest_finish[node] for node in order), default=0.0)
+
+        # Geri geçiş: en geç bitiş ve başlangıç (son tarihler de sınır)
+        latest_start = [None] * size
+        latest_finish = [None] * size
+        for node in reversed(order):
+            finish = project_finish
+            if self.deadlines[node] is not None:
+                finish = min(finish, self.deadlines[node])
+            for successor in self.successors[node]:
+                if latest_start[successor] is not None:
+                    finish = min(finish, latest_start[successor])
+            latest_finish[node] = finish
+            latest_start[node] = finish - self.durations[node]
+
+        slack = [
+            latest_start[node] - earliest_start[node] if earliest_start[node] is not None else None
+            for node in range(size)
+        ]
+
+        return {
+            'order': order,
+            'cycles': cycles,
+            'blocked': blocked,
+            'earliest_start': earliest_start,
+            'earliest_finish': earliest_finish,
+            'latest_start': latest_start,
+            'latest_finish': latest_finish,
+            'slack': slack,
+            'project_finish': project_finish,
+            'critical_path': self.critical_path(order, earliest_start, earliest_finish),
+        }
+
+    def critical_path(self, order, earliest_start, earliest_finish):
+        """
+        En erken biten son görevden geriye, boşluksuz bağlanan (bitişi
+        başlangıca eşit) önkoşullar izlenerek kritik yolu döndürür.
+        """
+        if not order:
+            return []
+        node = max(order, key=lambda candidate: (earliest_finish[candidate], -candidate))
+        path = [node]
+        while True:
+            tight = [
+                predecessor for predecessor in self.predecessors[node]
+                if earliest_finish[predecessor] is not None
+                and abs(earliest_finish[predecessor] - earliest_start[node]) < EPSILON
+            ]
+            if not tight:
+                break
+            node = max(tight, key=lambda candidate: (self.durations[candidate], -candidate))
+            path.append(node)
+        path.reverse()
+        return path
+
+    def as_dict(self):
+        """Gantt görünümü için JSON'a çevrilebilir plan"""
+        result = self.schedule()
+        critical = set(result['critical_path'])
+        ids = self.ids
+
+        def hours(value):
+            return round(value, 2) if value is not None else None
+
+        tasks = []
+        for node, task_id in enumerate(ids):
+            tasks.append({
+                'id': task_id,
+                'title': self.titles[node],
+                'status': self.statuses[node],
+                'duration_hours': hours(self.durations[node]),
+                'dependencies': [ids[predecessor] for predecessor in self.predecessors[node]],
+                'earliest_start': hours(result['earliest_start'][node]),
+                'earliest_finish': hours(result['earliest_finish'][node]),
+                'latest_start': hours(result['latest_start'][node]),
+                'latest_finish': hours(result['latest_finish'][node]),
+                'slack_hours': hours(result['slack'][node]),
+                'start_date': self.to_date(result['earliest_start'][node]),
+                'end_date': self.to_date(result['earliest_finish'][node], finish=True),
+                'critical': node in critical,
+            })
+
+        return {
+            'start_date': self.anchor,
+            'hours_per_day': TASK_GRAPH_HOURS_PER_DAY,
+            'project_finish_hours': hours(result['project_finish']),
+            'project_finish_date': self.to_date(result['project_finish'], finish=True),
+            'has_cycles': bool(result['cycles']),
+            'cycles': [[ids[node] for node in cycle] for cycle in result['cycles']],
+            'blocked': [ids[node] for node in result['blocked']],
+            'order': [ids[node] for node in result['order']],
+            'critical_path': [ids[node] for node in result['critical_path']],
+            'tasks': tasks,
+        }
+
+
+def get_project_schedule(project_id):
+    """Projenin zaman planını önbellekten (yoksa hesaplayarak) döndürür"""
+    key = TASK_GRAPH_KEY.format(project_id=project_id, version=get_graph_version(project_id))
+    data = cache.get(key)
+    if data is None:
+        data = TaskGraph.load(project_id).as_dict()
+        cache.set(key, data, TASK_GRAPH_CACHE_TIMEOUT)
+    return data
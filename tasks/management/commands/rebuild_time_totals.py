@@ -0,0 +1,90 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Sum
+
+from tasks.models import DailyTimeTotal, ProjectTimeTotal, Task, TimeLog
+
+
+class Command(BaseCommand):
+    help = (
+        'Görevlerin gerçekleşen sürelerini, proje ve günlük kullanıcı zaman toplamlarını '
+        'zaman kayıtlarından toplu olarak yeniden hesaplar ve farkları onarır. '
+        '--check ile yalnızca farklar raporlanır.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help='Değişiklik yapmadan farkları raporla; fark varsa hata koduyla çık')
+        parser.add_argument('--batch-size', type=int, default=2000,
+                            help='Tek sorguda yazılacak kayıt sayısı')
+
+    def handle(self, *args, **options):
+        check = options['check']
+        batch_size = options['batch_size']
+
+        with transaction.atomic():
+            task_fixes = self.sync_tasks(check, batch_size)
+            project_fixes = self.sync_totals(
+                ProjectTimeTotal, ('project_id',),
+                TimeLog.objects.values_list('task__project_id').annotate(total=Sum('hours')),
+                check, batch_size,
+            )
+            daily_fixes = self.sync_totals(
+                DailyTimeTotal, ('user_id', 'project_id', 'date'),
+                TimeLog.objects.values_list('user_id', 'task__project_id', 'date').annotate(total=Sum('hours')),
+                check, batch_size,
+            )
+
+        summary = (
+            f"Görev: {task_fixes}, proje toplamı: {project_fixes}, "
+            f"günlük toplam: {daily_fixes} kayıt {'farklı' if check else 'onarıldı'}."
+        )
+        if check and (task_fixes or project_fixes or daily_fixes):
+            raise CommandError(summary)
+        self.stdout.write(self.style.SUCCESS(summary))
+
+    def sync_tasks(self, check, batch_size):
+        """Zaman kaydı olan görevlerin actual_hours değerini kayıtların toplamına eşitler"""
+        expected = dict(TimeLog.objects.values_list('task_id').annotate(total=Sum('hours')).order_by())
+        changed = []
+        tasks = Task.objects.filter(id__in=TimeLog.objects.values('task_id')).only('id', 'actual_hours')
+        for task in tasks.iterator(chunk_size=batch_size):
+            if task.actual_hours != expected[task.id]:
+                task.actual_hours = expected[task.id]
+                changed.append(task)
+        if not check:
+            Task.objects.bulk_update(changed, ['actual_hours'], batch_size=batch_size)
+        return len(changed)
+
+    def sync_totals(self, model, key_fields, rows, check, batch_size):
+        """
+        Toplam tablosunu beklenen değerlere eşitler: eksik satırları ekler,
+        farklı olanları günceller, karşılığı kalmayanları siler. Kayıtları
+        silinmiş ve sıfıra inmiş satırlar fark sayılmaz.
+        """
+        expected = {tuple(row[:-1]): row[-1] for row in rows.order_by()}
+        to_update = []
+        to_delete = []
+        for total in model.objects.all().iterator(chunk_size=batch_size):
+            key = tuple(getattr(total, field) for field in key_fields)
+            hours = expected.pop(key, Decimal('0'))
+            if total.hours == hours:
+                continue
+            if hours:
+                total.hours = hours
+                to_update.append(total)
+            else:
+                to_delete.append(total.pk)
+        to_create = [
+            model(hours=hours, **dict(zip(key_fields, key)))
+            for key, hours in expected.items() if hours
+        ]
+
+        if not check:
+            for start in range(0, len(to_delete), batch_size):
+                model.objects.filter(pk__in=to_delete[start:start + batch_size]).delete()
+            model.objects.bulk_update(to_update, ['hours'], batch_size=batch_size)
+            model.objects.bulk_create(to_create, batch_size=batch_size)
+        return len(to_create) + len(to_update) + len(to_delete)
@@ -1,5 +1,12 @@
-from django.db import models
+from decimal import Decimal
+
+from django.db import IntegrityError, models, transaction
 from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 
 class Task(models.Model):
@@ -101,6 +108,24 @@ class Task(models.Model):
     def __str__(self):
         return self.title
     
+    def is_managed_by(self, user):
+        """Süper kullanıcı, proje yöneticisi rolündekiler ve projenin yöneticisi"""
+        return user.is_superuser or user.role == 'project_manager' or self.project.manager_id == user.id
+    
+    def get_edit_access(self, user):
+        """
+        Kullanıcının görevi düzenleme yetkisi: 'all' (tüm alanlar), 'status'
+        (yalnızca durum) veya None. Yöneticiler ve görevi oluşturan kişi tüm
+        alanları, göreve atanan kişi yalnızca durumu değiştirebilir.
+        """
+        if self.is_managed_by(user):
+            return 'all'
+        if self.assignee_id == user.id:
+            return 'status'
+        if self.creator_id == user.id:
+            return 'all'
+        return None
+    
     @property
     def is_overdue(self):
         """
@@ -146,6 +171,112 @@ class TimeLog(models.Model):
         return f"{self.task.title} - {self.user.username} - {self.date}"
 
 
+class ProjectTimeTotal(models.Model):
+    """
+    Projeye girilen toplam zaman. TimeLog kayıtları eklendikçe, değiştikçe
+    ve silindikçe artımlı güncellenir (bkz. apply_time_log_delta).
+    """
+    project = models.OneToOneField(
+        'projects.Project',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='time_total',
+        verbose_name=_('Proje')
+    )
+    hours = models.DecimalField(_('Saat'), max_digits=10, decimal_places=2, default=0)
+    
+    class Meta:
+        verbose_name = _('Proje Zaman Toplamı')
+        verbose_name_plural = _('Proje Zaman Toplamları')
+    
+    def __str__(self):
+        return f"{self.project} - {self.hours}"
+
+
+class DailyTimeTotal(models.Model):
+    """
+    Kullanıcının bir günde bir projeye girdiği toplam zaman. Raporlar
+    TimeLog tablosunu taramak yerine bu satırları toplar.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='daily_time_totals',
+        verbose_name=_('Kullanıcı')
+    )
+    project = models.ForeignKey(
+        'projects.Project',
+        on_delete=models.CASCADE,
+        related_name='daily_time_totals',
+        verbose_name=_('Proje')
+    )
+    date = models.DateField(_('Tarih'))
+    hours = models.DecimalField(_('Saat'), max_digits=8, decimal_places=2, default=0)
+    
+    class Meta:
+        verbose_name = _('Günlük Zaman Toplamı')
+        verbose_name_plural = _('Günlük Zaman Toplamları')
+        unique_together = ('user', 'project', 'date')
+        indexes = [
+            models.Index(fields=['project', 'date'], name='daily_time_project_idx'),
+            models.Index(fields=['date'], name='daily_time_date_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user} - {self.project} - {self.date}: {self.hours}"
+
+
+class ProjectBoardVersion(models.Model):
+    """
+    Proje panosunun (Kanban) sürüm sayacı. Projedeki her görev yazımında bir
+    arttırılır; pano yanıtlarının ETag'i ve ?since= delta sorguları bu
+    sürüme dayanır (bkz. tasks.board).
+    """
+    project = models.OneToOneField(
+        'projects.Project',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='board_version',
+        verbose_name=_('Proje')
+    )
+    version = models.PositiveBigIntegerField(_('Sürüm'), default=0)
+    
+    class Meta:
+        verbose_name = _('Pano Sürümü')
+        verbose_name_plural = _('Pano Sürümleri')
+    
+    def __str__(self):
+        return f"{self.project} - {self.version}"
+
+
+class TaskBoardChange(models.Model):
+    """
+    Bir görevin proje panosunda en son değiştiği sürüm. Silinen veya başka
+    projeye taşınan görevler removed=True ile işaretlenir; bu yüzden görev
+    yabancı anahtar değil, ID olarak tutulur.
+    """
+    project = models.ForeignKey(
+        'projects.Project',
+        on_delete=models.CASCADE,
+        related_name='board_changes',
+        verbose_name=_('Proje')
+    )
+    task_id = models.PositiveBigIntegerField(_('Görev ID'))
+    version = models.PositiveBigIntegerField(_('Sürüm'))
+    removed = models.BooleanField(_('Kaldırıldı'), default=False)
+    
+    class Meta:
+        verbose_name = _('Pano Değişikliği')
+        verbose_name_plural = _('Pano Değişiklikleri')
+        unique_together = ('project', 'task_id')
+        indexes = [
+            models.Index(fields=['project', 'version'], name='board_change_version_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.project} - {self.task_id}: {self.version}"
+
+
 class Comment(models.Model):
     """
     Görev yorumları. Kullanıcılar görevler hakkında yorum yapabilir.
@@ -175,3 +306,204 @@ class Comment(models.Model):
     
     def __str__(self):
         return f"{self.task.title} - {self.author.username}"
+
+
+# Bağımlılık grafiği önbelleği (bkz. tasks.graph). Proje başına sürüm
+# tutulur; görev veya bağımlılık değiştiğinde sürüm arttırılır ve eski
+# plan anahtarları kendiliğinden geçersiz olur.
+TASK_GRAPH_VERSION_KEY = 'tasks:graph:version:{project_id}'
+
+
+def get_graph_version(project_id):
+    return cache.get(TASK_GRAPH_VERSION_KEY.format(project_id=project_id), 1)
+
+
+def invalidate_project_graph(project_ids):
+    """Verilen projelerin bağımlılık grafiği önbelleğini geçersiz kılar"""
+    for project_id in set(project_ids):
+        key = TASK_GRAPH_VERSION_KEY.format(project_id=project_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, None)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def handle_task_graph_change(sender, instance, **kwargs):
+    """Görev eklendiğinde, değiştiğinde veya silindiğinde projenin planını geçersiz kılar"""
+    if instance.project_id:
+        invalidate_project_graph([instance.project_id])
+
+
+@receiver(m2m_changed, sender=Task.dependencies.through)
+def handle_task_dependencies_change(sender, instance, action, **kwargs):
+    """
+    Bağımlılıklar değiştiğinde projenin planını geçersiz kılar. Planda
+    yalnızca aynı projedeki görevler arasındaki bağımlılıklar kullanıldığı
+    için, ilişkinin hangi ucundan değiştirildiğinden bağımsız olarak
+    instance'ın projesi yeterlidir.
+    """
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_project_graph([instance.project_id])
+
+
+# Zaman toplamları (Task.actual_hours, ProjectTimeTotal, DailyTimeTotal)
+# TimeLog sinyallerinde F() farklarıyla artımlı güncellenir; toplamlar
+# yeniden hesaplanmaz. Sinyal tetiklemeyen toplu işlemlerden (bulk_create,
+# QuerySet.update/delete) veya görevin başka projeye taşınmasından sonra
+# toplamlar rebuild_time_totals komutuyla onarılır.
+
+def _add_hours(model, lookup, delta):
+    """
+    Toplam satırına farkı atomik olarak ekler; satır yoksa oluşturur.
+    Eşzamanlı oluşturmada benzersizlik hatası alınırsa yeniden günceller.
+    """
+    if model.objects.filter(**lookup).update(hours=F('hours') + delta) or delta <= 0:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(hours=delta, **lookup)
+    except IntegrityError:
+        model.objects.filter(**lookup).update(hours=F('hours') + delta)
+
+
+def apply_time_log_delta(task_id, project_id, user_id, date, delta):
+    """Bir zaman kaydı farkını görev, proje ve günlük kullanıcı toplamlarına uygular"""
+    if not delta:
+        return
+    Task.objects.filter(pk=task_id).update(
+        actual_hours=Coalesce(F('actual_hours'), Value(Decimal('0'))) + delta
+    )
+    if project_id is None:
+        return
+    _add_hours(ProjectTimeTotal, {'project_id': project_id}, delta)
+    _add_hours(DailyTimeTotal, {'user_id': user_id, 'project_id': project_id, 'date': date}, delta)
+
+
+def _time_log_key(time_log, task=None):
+    """Zaman kaydının toplamlarda etkilediği satırları belirleyen değerler"""
+    if task is None and 'task' in time_log._state.fields_cache:
+        task = time_log.task
+    if task is not None and task.pk == time_log.task_id:
+        project_id = task.project_id
+    else:
+        project_id = Task.objects.filter(pk=time_log.task_id).values_list('project_id', flat=True).first()
+    return time_log.task_id, project_id, time_log.user_id, time_log.date
+
+
+@receiver(pre_save, sender=TimeLog)
+def remember_time_log_previous(sender, instance, **kwargs):
+    """Güncellemelerde farkı hesaplayabilmek için kaydın önceki değerlerini saklar"""
+    instance._previous_time_log = None
+    if instance.pk:
+        instance._previous_time_log = TimeLog.objects.filter(pk=instance.pk).values_list(
+            'task_id', 'task__project_id', 'user_id', 'date', 'hours'
+        ).first()
+
+
+@receiver(post_save, sender=TimeLog)
+def handle_time_log_save(sender, instance, created, **kwargs):
+    """Eklenen veya değiştirilen zaman kaydının farkını toplamlara uygular"""
+    hours = Decimal(str(instance.hours))
+    key = _time_log_key(instance)
+    previous = getattr(instance, '_previous_time_log', None)
+    if created or previous is None:
+        apply_time_log_delta(*key, hours)
+        return
+    previous_key, previous_hours = tuple(previous[:4]), previous[4]
+    if previous_key == key:
+        apply_time_log_delta(*key, hours - previous_hours)
+    else:
+        apply_time_log_delta(*previous_key, -previous_hours)
+        apply_time_log_delta(*key, hours)
+
+
+def _is_project_delete(origin):
+    """Silme işlemi bir projenin silinmesinden mi kaynaklanıyor"""
+    origin_model = origin.model if isinstance(origin, models.QuerySet) else type(origin)
+    return bool(getattr(origin_model, '_meta', None) and origin_model._meta.label == 'projects.Project')
+
+
+@receiver(post_delete, sender=TimeLog)
+def handle_time_log_delete(sender, instance, origin=None, **kwargs):
+    """
+    Silinen zaman kaydının saatlerini toplamlardan düşer. Proje silinirken
+    projenin toplam satırları da silindiği için bir şey yapılmaz.
+    """
+    if _is_project_delete(origin):
+        return
+    task = origin if isinstance(origin, Task) else None
+    apply_time_log_delta(*_time_log_key(instance, task), -Decimal(str(instance.hours)))
+
+
+def get_board_version(project_id):
+    """Proje panosunun güncel sürümü (henüz yazım olmadıysa 0)"""
+    return ProjectBoardVersion.objects.filter(project_id=project_id).values_list('version', flat=True).first() or 0
+
+
+def _bump_board_version(project_id):
+    """
+    Sayacı atomik olarak arttırır ve yeni sürümü döndürür. Güncellenen satır
+    çevreleyen işlem bitene kadar kilitli kalır; bu yüzden yalnızca bir
+    transaction.atomic() bloğu içinde (bkz. record_board_changes) çağrılmalıdır.
+    Böylece aynı projeye yazan işlemler sıraya girer ve daha küçük sürüm alan
+    işlem her zaman önce onaylanır.
+    """
+    if not ProjectBoardVersion.objects.filter(project_id=project_id).update(version=F('version') + 1):
+        try:
+            with transaction.atomic():
+                ProjectBoardVersion.objects.create(project_id=project_id, version=1)
+            return 1
+        except IntegrityError:
+            ProjectBoardVersion.objects.filter(project_id=project_id).update(version=F('version') + 1)
+    return ProjectBoardVersion.objects.filter(project_id=project_id).values_list('version', flat=True).get()
+
+
+def record_board_changes(project_id, task_ids, removed=False):
+    """
+    Görevleri panoda değişmiş (veya kaldırılmış) olarak işaretler ve yeni
+    sürümü döndürür. Sürüm artışı ve değişiklik kayıtları aynı işlemde
+    yazılır; yeni sürümü gören okuyucu değişiklik kayıtlarını da görür.
+    """
+    with transaction.atomic():
+        version = _bump_board_version(project_id)
+        TaskBoardChange.objects.bulk_create(
+            [TaskBoardChange(project_id=project_id, task_id=task_id, version=version, removed=removed)
+             for task_id in set(task_ids)],
+            update_conflicts=True,
+            unique_fields=['project', 'task_id'],
+            update_fields=['version', 'removed'],
+        )
+    return version
+
+
+@receiver(pre_save, sender=Task)
+def remember_task_board_project(sender, instance, **kwargs):
+    """Görev başka projeye taşınırsa eski panodan kaldırabilmek için önceki projeyi saklar"""
+    instance._previous_project_id = None
+    if instance.pk:
+        instance._previous_project_id = Task.objects.filter(pk=instance.pk).values_list(
+            'project_id', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=Task)
+def handle_task_board_save(sender, instance, **kwargs):
+    """Eklenen veya değiştirilen görevin panosunun sürümünü arttırır"""
+    previous_project_id = getattr(instance, '_previous_project_id', None)
+    with transaction.atomic():
+        if previous_project_id and previous_project_id != instance.project_id:
+            record_board_changes(previous_project_id, [instance.pk], removed=True)
+        if instance.project_id:
+            record_board_changes(instance.project_id, [instance.pk])
+
+
+@receiver(post_delete, sender=Task)
+def handle_task_board_delete(sender, instance, origin=None, **kwargs):
+    """
+    Silinen görevi panodan kaldırır. Proje silinirken pano kayıtları da
+    silindiği için bir şey yapılmaz.
+    """
+    if instance.project_id and not _is_project_delete(origin):
+        record_board_changes(instance.project_id, [instance.pk], removed=True)
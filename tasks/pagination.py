@@ -0,0 +1,125 @@
+"""
+Görev listesi için sayfalama.
+
+İlk sayfalar klasik sayfa numarasıyla (OFFSET) açılır. Daha derin sayfalara
+imleçle (keyset) gidilir: "sonraki" ve "önceki" bağlantıları son/ilk satırın
+(created_at, id) değerini taşır ve sorgu OFFSET yerine bu değerden devam
+eder. Böylece 100 binlerce görevde de derin sayfalar hızlı kalır.
+"""
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Q
+
+TASK_LIST_PAGE_SIZE = getattr(settings, 'TASK_LIST_PAGE_SIZE', 50)
+# Sayfa numarasıyla (OFFSET) doğrudan açılabilen en son sayfa
+TASK_LIST_MAX_OFFSET_PAGES = getattr(settings, 'TASK_LIST_MAX_OFFSET_PAGES', 10)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+ORDERING = ('-created_at', '-id')
+
+
+def encode_cursor(task):
+    """Görevin sıralama anahtarını (mikrosaniye:id) imlece çevirir"""
+    microseconds = (task.created_at - EPOCH) // timedelta(microseconds=1)
+    return f"{microseconds}:{task.id}"
+
+
+def decode_cursor(value):
+    """Geçersiz imleçlerde None döndürür"""
+    try:
+        microseconds, task_id = value.split(':')
+        return EPOCH + timedelta(microseconds=int(microseconds)), int(task_id)
+    except (AttributeError, ValueError, OverflowError):
+        return None
+
+
+def _positive_int(value, default=1):
+    try:
+        return max(int(value), 1)
+    except (TypeError, ValueError):
+        return default
+
+
+def _querystring(params, **values):
+    """Filtre parametrelerini koruyarak sayfalama parametrelerini değiştirir"""
+    query = params.copy()
+    for key in ('page', 'after', 'before'):
+        query.pop(key, None)
+    for key, value in values.items():
+        query[key] = value
+    return query.urlencode()
+
+
+def paginate_tasks(tasks, params, total, per_page=None):
+    """
+    Görevleri en yeniden eskiye sayfalar.
+
+    params: istek parametreleri (QueryDict; page, after, before ve filtreler)
+    total: filtrelenmiş toplam görev sayısı (sayfa sayısı için; ayrıca sayılmaz)
+
+    Şablon için bir sözlük döndürür: object_list, number, num_pages,
+    has_previous, has_next, previous_query, next_query, page_range
+    ve page_query (sayfa numarası eklenecek filtre parametreleri).
+    """
+    per_page = per_page or TASK_LIST_PAGE_SIZE
+    num_pages = max(math.ceil(total / per_page), 1)
+    number = _positive_int(params.get('page'))
+    after = decode_cursor(params.get('after'))
+    before = decode_cursor(params.get('before'))
+
+    if after:
+        created_at, task_id = after
+        rows = list(
+            tasks.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=task_id))
+            .order_by(*ORDERING)[:per_page + 1]
+        )
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        has_previous = True
+    elif before:
+        created_at, task_id = before
+        rows = list(
+            tasks.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=task_id))
+            .order_by('created_at', 'id')[:per_page + 1]
+        )
+        has_previous = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        has_next = True
+        if not has_previous:
+            number = 1
+    else:
+        number = min(number, num_pages, TASK_LIST_MAX_OFFSET_PAGES)
+        offset = (number - 1) * per_page
+        rows = list(tasks.order_by(*ORDERING)[offset:offset + per_page + 1])
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        has_previous = number > 1
+
+    number = min(number, num_pages)
+    previous_query = None
+    if has_previous and rows:
+        if number - 1 <= TASK_LIST_MAX_OFFSET_PAGES:
+            previous_query = _querystring(params, page=number - 1)
+        else:
+            previous_query = _querystring(params, before=encode_cursor(rows[0]), page=number - 1)
+    next_query = None
+    if has_next and rows:
+        next_query = _querystring(params, after=encode_cursor(rows[-1]), page=number + 1)
+
+    # Doğrudan açılabilen sayfalar: geçerli sayfanın çevresi, OFFSET sınırı içinde
+    last_offset_page = min(num_pages, TASK_LIST_MAX_OFFSET_PAGES)
+    page_range = range(max(number - 2, 1), min(number + 2, last_offset_page) + 1)
+
+    return {
+        'object_list': rows,
+        'number': number,
+        'num_pages': num_pages,
+        'has_previous': previous_query is not None,
+        'has_next': next_query is not None,
+        'previous_query': previous_query,
+        'next_query': next_query,
+        'page_range': page_range,
+        'page_query': _querystring(params),
+    }
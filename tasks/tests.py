@@ -1,3 +1,417 @@
-from django.test import TestCase
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from config.instrumentation import QueryBudgetTestMixin
+from projects.models import Project
+
+from .models import (
+    DailyTimeTotal, ProjectTimeTotal, Task, TaskBoardChange, TimeLog, get_board_version, record_board_changes,
+)
+
+
+class TaskListPaginationTests(QueryBudgetTestMixin, TestCase):
+    """Görev listesi sayfalı olmalı; imleçle gezilen sayfalar tüm görevleri bir kez göstermeli"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='member', password='test', role='team_member')
+        other = CustomUser.objects.create_user(username='other', password='test', role='team_member')
+        project = Project.objects.create(name='Proje', manager=self.user, start_date=date.today())
+        project.team_members.add(self.user, other)
+        hidden = Project.objects.create(name='Gizli', manager=other, start_date=date.today())
+        Task.objects.bulk_create([
+            Task(title=f'Görev {index}', project=project, creator=self.user,
+                 status='completed' if index % 3 == 0 else 'todo')
+            for index in range(12)
+        ])
+        Task.objects.create(title='Başkası', project=hidden, creator=other)
+        self.client.force_login(self.user)
+
+    def test_keyset_pages_cover_all_tasks(self):
+        expected = list(
+            Task.objects.filter(project__name='Proje').order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        seen = []
+        url = reverse('tasks:task_list')
+        with mock.patch('tasks.pagination.TASK_LIST_PAGE_SIZE', 5):
+            while url:
+                response = self.client.get(url)
+                self.assertWithinQueryBudget(response)
+                seen.extend(task.id for task in response.context['tasks'])
+                page = response.context['page']
+                url = f"{reverse('tasks:task_list')}?{page['next_query']}" if page['has_next'] else None
+        self.assertEqual(seen, expected)
+        self.assertEqual(page['num_pages'], 3)
+
+    def test_status_counts(self):
+        response = self.client.get(reverse('tasks:task_list'))
+        self.assertEqual(response.context['total_tasks'], 12)
+        self.assertEqual(response.context['completed_tasks'], 4)
+        self.assertEqual(response.context['todo_tasks'], 8)
+
+    def test_project_autocomplete_only_visible_projects(self):
+        response = self.client.get(reverse('tasks:project_autocomplete'), {'q': 'e'})
+        self.assertEqual([item['text'] for item in response.json()['results']], ['Proje'])
+
+
+class ProjectScheduleTests(TestCase):
+    """Bağımlılık grafiğinden kritik yol, bolluk ve döngüler doğru hesaplanmalı"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='admin', password='test', role='admin')
+        self.project = Project.objects.create(name='Plan', start_date=date(2026, 1, 1))
+
+        def task(title, hours, **kwargs):
+            return Task.objects.create(title=title, project=self.project, estimate_hours=hours, **kwargs)
+
+        self.a = task('A', 8)
+        self.b = task('B', 16)
+        self.c = task('C', 4, due_date=date(2026, 1, 2))
+        self.d = task('D', 8)
+        self.b.dependencies.add(self.a)
+        self.c.dependencies.add(self.a)
+        self.d.dependencies.add(self.b, self.c)
+        self.client.force_login(self.user)
+
+    def get_schedule(self):
+        response = self.client.get(reverse('tasks:project_schedule', args=[self.project.id]))
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_critical_path_and_slack(self):
+        data = self.get_schedule()
+        tasks = {item['id']: item for item in data['tasks']}
+        self.assertEqual(data['critical_path'], [self.a.id, self.b.id, self.d.id])
+        self.assertEqual(data['project_finish_hours'], 32)
+        self.assertEqual(tasks[self.d.id]['earliest_start'], 24)
+        # C'nin son tarihi 2. günün sonu (16. saat): 12. saatte başlaması gerekir
+        self.assertEqual(tasks[self.c.id]['latest_start'], 12)
+        self.assertEqual(tasks[self.c.id]['slack_hours'], 4)
+        self.assertFalse(data['has_cycles'])
+
+    def test_cycle_detected_after_dependency_change(self):
+        self.get_schedule()
+        self.a.dependencies.add(self.d)
+        data = self.get_schedule()
+        self.assertTrue(data['has_cycles'])
+        self.assertEqual(data['cycles'], [sorted([self.a.id, self.b.id, self.c.id, self.d.id])])
+
+
+class TaskTreeTests(QueryBudgetTestMixin, TestCase):
+    """Alt görev ağacı tek sorguda yüklenmeli ve toplamlar alt ağacın tamamını kapsamalı"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='admin', password='test', role='admin')
+        self.project = Project.objects.create(name='Ağaç', start_date=date(2026, 1, 1))
+
+        def task(title, parent=None, **kwargs):
+            return Task.objects.create(title=title, project=self.project, parent_task=parent, **kwargs)
+
+        self.root = task('Kök', estimate_hours=2)
+        self.child = task('Alt', self.root, estimate_hours=3, actual_hours=1, status='completed')
+        self.grandchild = task('Alt alt', self.child, estimate_hours=5, actual_hours=4)
+        self.other_root = task('Diğer', status='completed')
+        self.client.force_login(self.user)
+
+    def test_rollups(self):
+        from .tree import get_project_tree, get_task_tree
+
+        with self.assertNumQueries(1):
+            tree = get_task_tree(self.root.id)
+        self.assertEqual([node.task.id for node in tree.walk()],
+                         [self.root.id, self.child.id, self.grandchild.id])
+        self.assertEqual(tree.estimate_total, 10)
+        self.assertEqual(tree.actual_total, 5)
+        self.assertEqual((tree.task_count, tree.completed_count, tree.completion), (3, 1, 33))
+        self.assertEqual(tree.children[0].estimate_total, 8)
+
+        # Kökler görev listesindeki gibi en yeniden eskiye sıralanır
+        roots = get_project_tree(self.project.id)
+        self.assertEqual([root.task.id for root in roots], [self.other_root.id, self.root.id])
+
+    def test_cycles_are_listed_as_roots(self):
+        from .tree import get_project_tree
+
+        first = Task.objects.create(title='Döngü 1', project=self.project)
+        second = Task.objects.create(title='Döngü 2', project=self.project, parent_task=first)
+        Task.objects.filter(pk=first.pk).update(parent_task=second)
+
+        with self.assertNumQueries(1):
+            roots = get_project_tree(self.project.id)
+        ids = [node.task.id for root in roots for node in root.walk()]
+        self.assertEqual(sorted(ids), sorted(Task.objects.filter(project=self.project).values_list('id', flat=True)))
+        self.assertEqual(len(ids), 6)
+
+        response = self.client.get(reverse('projects:project_detail', args=[self.project.id]))
+        self.assertEqual(response.context['task_counts']['total'], 6)
+
+    def test_views_show_full_hierarchy(self):
+        response = self.client.get(reverse('tasks:task_tree', args=[self.root.id]))
+        data = response.json()
+        self.assertEqual(data['children'][0]['children'][0]['id'], self.grandchild.id)
+        self.assertEqual(data['completion'], 33)
+
+        response = self.client.get(reverse('tasks:task_detail', args=[self.root.id]))
+        self.assertEqual(len(response.context['subtask_nodes']), 2)
+
+        response = self.client.get(reverse('projects:project_detail', args=[self.project.id]))
+        self.assertEqual(len(response.context['task_nodes']), 4)
+        self.assertEqual(response.context['task_counts']['completed'], 2)
+        self.assertContains(response, 'Alt alt')
+
+
+class TimeTotalsTests(TestCase):
+    """Zaman kayıtları görev, proje ve günlük toplamları artımlı güncellemeli"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='member', password='test', role='admin')
+        self.project = Project.objects.create(name='Zaman', start_date=date(2026, 1, 1))
+        self.other_project = Project.objects.create(name='Diğer', start_date=date(2026, 1, 1))
+        self.task = Task.objects.create(title='Görev', project=self.project)
+        self.other_task = Task.objects.create(title='Diğer görev', project=self.other_project)
+
+    def totals(self):
+        self.task.refresh_from_db()
+        return (
+            self.task.actual_hours,
+            ProjectTimeTotal.objects.get(project=self.project).hours,
+            DailyTimeTotal.objects.get(user=self.user, project=self.project, date=date(2026, 1, 5)).hours,
+        )
+
+    def test_create_update_delete(self):
+        self.client.force_login(self.user)
+        self.client.post(reverse('tasks:add_time_log', args=[self.task.id]),
+                         {'date': '2026-01-05', 'hours': '2.5'})
+        log = TimeLog.objects.create(task=self.task, user=self.user, date=date(2026, 1, 5), hours=Decimal('1'))
+        self.assertEqual(self.totals(), (Decimal('3.5'), Decimal('3.5'), Decimal('3.5')))
+
+        log.hours = Decimal('4')
+        log.save()
+        self.assertEqual(self.totals(), (Decimal('6.5'), Decimal('6.5'), Decimal('6.5')))
+
+        log.task = self.other_task
+        log.save()
+        self.assertEqual(self.totals(), (Decimal('2.5'), Decimal('2.5'), Decimal('2.5')))
+        self.assertEqual(ProjectTimeTotal.objects.get(project=self.other_project).hours, Decimal('4'))
+
+        log.delete()
+        self.assertEqual(ProjectTimeTotal.objects.get(project=self.other_project).hours, Decimal('0'))
+        call_command('rebuild_time_totals', '--check', stdout=StringIO())
+
+    def test_rebuild_repairs_bulk_inserts(self):
+        TimeLog.objects.bulk_create([
+            TimeLog(task=self.task, user=self.user, date=date(2026, 1, 5), hours=Decimal('2')),
+            TimeLog(task=self.task, user=self.user, date=date(2026, 1, 5), hours=Decimal('3')),
+        ])
+        with self.assertRaises(CommandError):
+            call_command('rebuild_time_totals', '--check', stdout=StringIO())
+        call_command('rebuild_time_totals', stdout=StringIO())
+        self.assertEqual(self.totals(), (Decimal('5'), Decimal('5'), Decimal('5')))
+
+
+class TaskBulkUpdateTests(TestCase):
+    """Toplu güncelleme yetkili görevleri tek işlemde değiştirmeli ve bildirimleri alıcı başına toplamalı"""
+
+    def setUp(self):
+        self.manager = CustomUser.objects.create_user(username='manager', password='test', role='team_member')
+        self.member = CustomUser.objects.create_user(username='member', password='test', role='team_member')
+        self.creator = CustomUser.objects.create_user(username='creator', password='test', role='team_member')
+        self.project = Project.objects.create(name='Sprint', manager=self.manager, start_date=date(2026, 1, 1))
+        self.other = Project.objects.create(name='Başka', start_date=date(2026, 1, 1))
+        self.tasks = [
+            Task.objects.create(title=f'Görev {index}', project=self.project, creator=self.creator)
+            for index in range(3)
+        ]
+        self.foreign = Task.objects.create(title='Başka görev', project=self.other, creator=self.creator)
+
+    def post(self, user, **data):
+        self.client.force_login(user)
+        return self.client.post(reverse('tasks:task_bulk_update'), data)
+
+    def test_manager_updates_and_notifications_are_batched(self):
+        from communications.models import Notification
+
+        ids = [task.id for task in self.tasks] + [self.foreign.id]
+        with mock.patch('tasks.bulk.enqueue_task') as enqueue:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.post(self.manager, task_ids=ids, status='completed', assignee=self.member.id)
+        data = response.json()
+        self.assertEqual(sorted(data['updated']), sorted(task.id for task in self.tasks))
+        self.assertEqual(data['skipped'], [self.foreign.id])
+        # GitHub'a bağlı görev olmadığı için arka plan işi kuyruğa gönderilmez
+        enqueue.assert_not_called()
+
+        self.assertEqual(Task.objects.filter(project=self.project, status='completed', assignee=self.member).count(), 3)
+        self.assertFalse(Task.objects.filter(project=self.project, completed_date__isnull=True).exists())
+        # Atanan kişi ve oluşturan kişi için görev başına değil, kişi başına tek bildirim
+        self.assertEqual(Notification.objects.filter(recipient=self.member).count(), 1)
+        self.assertEqual(Notification.objects.filter(recipient=self.creator).count(), 1)
+        self.assertFalse(Notification.objects.filter(recipient=self.manager).exists())
+
+    def test_repeated_edits_merge_unread_notifications(self):
+        from communications.models import Notification
+
+        ids = [task.id for task in self.tasks]
+        self.post(self.manager, task_ids=ids, status='in_progress')
+        self.post(self.manager, task_ids=ids, status='review')
+        notification = Notification.objects.get(recipient=self.creator)
+        self.assertEqual(notification.count, 2)
+        self.assertIn("3 görevi", notification.content)
+
+        notification.is_read = True
+        notification.save()
+        self.post(self.manager, task_ids=ids, status='completed')
+        self.assertEqual(Notification.objects.filter(recipient=self.creator).count(), 2)
+
+    def test_github_sync_never_runs_in_request(self):
+        from github_integration.models import GitHubIssue, GitHubRepository
+        from github_integration.tasks import sync_tasks_with_github
+
+        repository = GitHubRepository.objects.create(project=self.project, repository_owner='o', repository_name='r')
+        GitHubIssue.objects.create(
+            repository=repository, task=self.tasks[0], issue_number=1, issue_title='x', issue_url='http://x',
+            github_created_at=timezone.now(), github_updated_at=timezone.now(),
+        )
+        with mock.patch.object(sync_tasks_with_github, 'apply_async', side_effect=ConnectionError) as apply_async, \
+                mock.patch.object(sync_tasks_with_github, 'run') as run:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.post(self.manager, task_ids=[self.tasks[0].id], priority='high')
+        self.assertEqual(response.status_code, 200)
+        apply_async.assert_called_once()
+        self.assertEqual(apply_async.call_args.args[0], ([self.tasks[0].id],))
+        run.assert_not_called()
+
+    def test_assignee_can_only_change_status(self):
+        self.tasks[0].assignee = self.member
+        self.tasks[0].save()
+        response = self.post(self.member, task_ids=[self.tasks[0].id], priority='urgent')
+        self.assertEqual(response.json()['skipped'], [self.tasks[0].id])
+
+        response = self.post(self.member, task_ids=[self.tasks[0].id], status='in_progress')
+        self.assertEqual(response.json()['updated'], [self.tasks[0].id])
+
+    def test_same_rule_as_task_update(self):
+        # Görevi oluşturan kişi düzenleme sayfasındaki gibi tüm alanları değiştirebilir
+        response = self.post(self.creator, task_ids=[self.tasks[0].id], priority='urgent')
+        self.assertEqual(response.json()['updated'], [self.tasks[0].id])
+
+        # 'admin' rolü tek tek düzenleyemediği görevi toplu da düzenleyemez
+        admin = CustomUser.objects.create_user(username='admin', password='test', role='admin')
+        response = self.post(admin, task_ids=[self.tasks[1].id], priority='urgent')
+        self.assertEqual(response.json()['skipped'], [self.tasks[1].id])
+        self.client.post(reverse('tasks:task_update', args=[self.tasks[1].id]), {
+            'title': 'x', 'status': 'todo', 'priority': 'urgent',
+        })
+        self.tasks[1].refresh_from_db()
+        self.assertNotEqual(self.tasks[1].priority, 'urgent')
+
+        response = self.post(self.member, task_ids=[self.tasks[0].id], status='bogus')
+        self.assertEqual(response.status_code, 400)
+
+
+class ProjectBoardTests(TestCase):
+    """Pano sürümlü ETag ile 304 dönmeli, ?since= ile yalnızca değişiklikleri göndermeli"""
+
+    def setUp(self):
+        self.manager = CustomUser.objects.create_user(username='manager', password='test', role='team_member')
+        self.outsider = CustomUser.objects.create_user(username='outsider', password='test', role='team_member')
+        self.project = Project.objects.create(name='Pano', manager=self.manager, start_date=date(2026, 1, 1))
+        self.other = Project.objects.create(name='Başka', start_date=date(2026, 1, 1))
+        self.todo = Task.objects.create(title='Yapılacak', project=self.project, creator=self.manager)
+        self.doing = Task.objects.create(
+            title='Sürüyor', project=self.project, creator=self.manager,
+            assignee=self.manager, status='in_progress',
+        )
+        self.url = reverse('tasks:project_board', args=[self.project.id])
+        self.client.force_login(self.manager)
+
+    def test_full_board_and_not_modified(self):
+        response = self.client.get(self.url)
+        data = response.json()
+        self.assertTrue(data['full'])
+        self.assertEqual([task['id'] for task in data['columns']['todo']], [self.todo.id])
+        self.assertEqual(data['columns']['in_progress'][0]['assignee'], self.manager.id)
+        self.assertEqual(data['users'][str(self.manager.id)]['username'], 'manager')
+
+        # Oturum, kullanıcı, proje, üyelik ve pano sürümü; görevler okunmaz
+        with self.assertNumQueries(5):
+            cached = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+
+        self.todo.status = 'review'
+        self.todo.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_delta_since_version(self):
+        version = self.client.get(self.url).json()['version']
+        self.doing.status = 'completed'
+        self.doing.save()
+        self.todo.project = self.other
+        self.todo.save()
+        added = Task.objects.create(title='Yeni', project=self.project, creator=self.manager)
+        added_id = added.id
+        added.delete()
+        Task.objects.create(title='Son', project=self.project, creator=self.manager)
+
+        data = self.client.get(self.url, {'since': version}).json()
+        self.assertFalse(data['full'])
+        self.assertEqual([(task['id'], task['status']) for task in data['changed']][0], (self.doing.id, 'completed'))
+        self.assertEqual(len(data['changed']), 2)
+        self.assertEqual(data['removed'], sorted([self.todo.id, added_id]))
+        self.assertEqual(list(data['users']), [str(self.manager.id)])
+
+        latest = self.client.get(self.url, {'since': data['version']}).json()
+        self.assertEqual((latest['changed'], latest['removed']), ([], []))
+
+    def test_bulk_update_bumps_version(self):
+        version = self.client.get(self.url).json()['version']
+        self.client.post(reverse('tasks:task_bulk_update'), {'task_ids': [self.todo.id, self.doing.id], 'priority': 'urgent'})
+        data = self.client.get(self.url, {'since': version}).json()
+        self.assertEqual(data['version'], version + 1)
+        self.assertEqual({task['priority'] for task in data['changed']}, {'urgent'})
+
+    def test_version_not_bumped_without_change_rows(self):
+        # Değişiklik kaydı yazılamazsa sürüm artışı da geri alınmalı; aksi halde
+        # yeni sürümü gören okuyucu ?since= ile bu görevi hiç almaz
+        version = get_board_version(self.project.id)
+        with mock.patch.object(TaskBoardChange.objects, 'bulk_create', side_effect=DatabaseError), \
+                self.assertRaises(DatabaseError):
+            record_board_changes(self.project.id, [self.todo.id])
+        self.assertEqual(get_board_version(self.project.id), version)
+
+    def test_outsider_forbidden(self):
+        self.client.force_login(self.outsider)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class ProjectBoardVersionVisibilityTests(TransactionTestCase):
+    """Başka bir bağlantı yeni pano sürümünü, değişiklik kayıtları yazılmadan göremez"""
+
+    def setUp(self):
+        self.project = Project.objects.create(name='Pano', start_date=date(2026, 1, 1))
+        self.task = Task.objects.create(title='Görev', project=self.project)
+
+    def test_bump_uncommitted_until_change_rows_written(self):
+        # Sürüm ile değişiklik kaydı arasında araya giren okuyucu, işlem açık
+        # kaldığı sürece eski sürümü görür; autocommit olsaydı yeni sürümü görürdü
+        in_transaction = []
+        bulk_create = TaskBoardChange.objects.bulk_create
+
+        def write_changes(*args, **kwargs):
+            in_transaction.append(not connection.get_autocommit())
+            return bulk_create(*args, **kwargs)
+
+        with mock.patch.object(TaskBoardChange.objects, 'bulk_create', side_effect=write_changes):
+            self.task.status = 'review'
+            self.task.save()
+            self.task.project = Project.objects.create(name='Başka', start_date=date(2026, 1, 1))
+            self.task.save()
+        self.assertEqual(in_transaction, [True, True, True])
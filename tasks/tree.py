@@ -0,0 +1,172 @@
+"""
+Görev hiyerarşisi (alt görev ağacı) ve ağaç üzerinde toplamlar.
+
+Bir görevin veya projenin tüm alt ağacı tek bir özyinelemeli CTE
+(WITH RECURSIVE; SQLite ve PostgreSQL destekler) sorgusuyla yüklenir,
+ağaç bellekte kurulur ve her düğüm için alt ağacın tahmini/gerçekleşen
+saat toplamları ile tamamlanma oranı aşağıdan yukarıya hesaplanır.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import prefetch_related_objects
+
+from .models import Task
+
+# Bozuk parent_task zincirlerinde (döngü) sorgunun sonsuza gitmemesi için derinlik sınırı
+TASK_TREE_MAX_DEPTH = getattr(settings, 'TASK_TREE_MAX_DEPTH', 20)
+
+SUBTREE_SQL = """
+WITH RECURSIVE subtree (id, depth) AS (
+    SELECT {id} AS id, 0 AS depth FROM {table} WHERE {root_condition}
+    UNION ALL
+    SELECT child.{id}, subtree.depth + 1
+    FROM {table} child
+    JOIN subtree ON child.{parent} = subtree.id
+    WHERE subtree.depth < %s{child_condition}
+)
+SELECT task.*, subtree.depth AS tree_depth
+FROM {table} task
+JOIN subtree ON task.{id} = subtree.id{extra_rows}
+ORDER BY tree_depth, {id}
+"""
+
+
+class TaskNode:
+    """
+    Ağaçtaki bir görev. Toplamlar (estimate_total, actual_total, task_count,
+    completed_count) görevin kendisini ve tüm alt görevlerini kapsar.
+    """
+
+    def __init__(self, task, depth):
+        self.task = task
+        self.depth = depth
+        self.parent = None
+        self.children = []
+        self.estimate_total = task.estimate_hours or Decimal('0')
+        self.actual_total = task.actual_hours or Decimal('0')
+        self.task_count = 1
+        self.completed_count = 1 if task.status == 'completed' else 0
+
+    @property
+    def completion(self):
+        """Alt ağaçtaki tamamlanan görevlerin yüzdesi"""
+        return int(self.completed_count * 100 / self.task_count)
+
+    def walk(self):
+        """Düğümü ve altındaki düğümleri derinlik öncelikli sırayla döndürür"""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+    def as_dict(self):
+        """JSON'a çevrilebilir iç içe ağaç"""
+        return {
+            'id': self.task.id,
+            'title': self.task.title,
+            'status': self.task.status,
+            'assignee_id': self.task.assignee_id,
+            'depth': self.depth,
+            'estimate_hours': float(self.task.estimate_hours) if self.task.estimate_hours is not None else None,
+            'actual_hours': float(self.task.actual_hours) if self.task.actual_hours is not None else None,
+            'estimate_total': float(self.estimate_total),
+            'actual_total': float(self.actual_total),
+            'task_count': self.task_count,
+            'completed_count': self.completed_count,
+            'completion': self.completion,
+            'children': [child.as_dict() for child in self.children],
+        }
+
+
+def _load_nodes(root_condition, params, child_condition='', child_params=(), extra_rows='', extra_params=()):
+    """
+    Alt ağacı tek sorguda yükler ve kök düğümleri döndürür. extra_rows,
+    ağaçta bulunmayan satırları derinlik 0 (kök) olarak ekleyen bir
+    UNION ALL parçasıdır.
+    """
+    quote = connection.ops.quote_name
+    opts = Task._meta
+    sql = SUBTREE_SQL.format(
+        table=quote(opts.db_table),
+        id=quote(opts.pk.column),
+        parent=quote(opts.get_field('parent_task').column),
+        root_condition=root_condition,
+        child_condition=child_condition,
+        extra_rows=extra_rows,
+    )
+    tasks = list(Task.objects.raw(sql, [*params, TASK_TREE_MAX_DEPTH, *child_params, *extra_params]))
+    prefetch_related_objects(tasks, 'assignee')
+
+    # Satırlar derinliğe göre sıralı geldiği için ebeveyn her zaman önce kurulur.
+    # Döngü nedeniyle tekrar gelen görevler atlanır.
+    nodes = {}
+    roots = []
+    for task in tasks:
+        if task.id in nodes:
+            continue
+        node = TaskNode(task, task.tree_depth)
+        nodes[task.id] = node
+        parent = nodes.get(task.parent_task_id) if task.tree_depth else None
+        if parent is None:
+            roots.append(node)
+        else:
+            node.parent = parent
+            parent.children.append(node)
+
+    # Toplamlar yapraklardan köke doğru ebeveynlere eklenir
+    for node in reversed(list(nodes.values())):
+        parent = node.parent
+        if parent is not None:
+            parent.estimate_total += node.estimate_total
+            parent.actual_total += node.actual_total
+            parent.task_count += node.task_count
+            parent.completed_count += node.completed_count
+    return roots
+
+
+def get_task_tree(task_id):
+    """Görevi ve tüm alt görevlerini içeren ağacın kök düğümü (görev yoksa None)"""
+    quote = connection.ops.quote_name
+    roots = _load_nodes(f"{quote(Task._meta.pk.column)} = %s", [task_id])
+    return roots[0] if roots else None
+
+
+def get_project_tree(project_id):
+    """
+    Projenin görev ağacındaki kök düğümler. Üst görevi olmayan veya üst
+    görevi başka projede olan görevler köktür; alt ağaçlar proje içinde kalır.
+    Köklerden ulaşılamayan görevler (parent_task döngüsü veya derinlik
+    sınırı) de kök olarak eklenir; böylece projenin tüm görevleri listelenir.
+    Kardeşler görev listesindeki gibi en yeniden eskiye sıralanır.
+    """
+    quote = connection.ops.quote_name
+    opts = Task._meta
+    table = quote(opts.db_table)
+    id_column = quote(opts.pk.column)
+    project = quote(opts.get_field('project').column)
+    parent = quote(opts.get_field('parent_task').column)
+    root_condition = (
+        f"{project} = %s AND ({parent} IS NULL OR {parent} NOT IN "
+        f"(SELECT {id_column} FROM {table} WHERE {project} = %s))"
+    )
+    unreached_rows = (
+        f"\nUNION ALL\nSELECT task.*, 0 AS tree_depth FROM {table} task "
+        f"WHERE task.{project} = %s AND task.{id_column} NOT IN (SELECT id FROM subtree)"
+    )
+    roots = _load_nodes(
+        root_condition, [project_id, project_id],
+        child_condition=f" AND child.{project} = %s", child_params=[project_id],
+        extra_rows=unreached_rows, extra_params=[project_id],
+    )
+
+    def newest_first(node):
+        return node.task.created_at, node.task.id
+
+    roots.sort(key=newest_first, reverse=True)
+    for root in roots:
+        for node in root.walk():
+            node.children.sort(key=newest_first, reverse=True)
+    return roots
@@ -5,7 +5,13 @@ app_name = 'tasks'
 
 urlpatterns = [
     path('', views.task_list, name='task_list'),
+    path('autocomplete/projects/', views.project_autocomplete, name='project_autocomplete'),
+    path('autocomplete/users/', views.user_autocomplete, name='user_autocomplete'),
+    path('project/<int:project_id>/schedule/', views.project_schedule, name='project_schedule'),
+    path('project/<int:project_id>/board/', views.project_board, name='project_board'),
+    path('<int:task_id>/tree/', views.task_tree, name='task_tree'),
     path('<int:task_id>/', views.task_detail, name='task_detail'),
+    path('bulk-update/', views.task_bulk_update, name='task_bulk_update'),
     path('create/', views.task_create, name='task_create'),
     path('create/<int:project_id>/', views.task_create, name='task_create_for_project'),
     path('<int:task_id>/update/', views.task_update, name='task_update'),
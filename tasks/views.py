@@ -1,14 +1,36 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Count, Q, Sum
+from django.db.models import Count, Q
 from django.utils import timezone
-from django.http import HttpResponseRedirect
+from django.http import HttpResponseRedirect, JsonResponse
+from django.views.decorators.http import require_POST
+from django.utils.cache import get_conditional_response, patch_cache_control
 
-from .models import Task, TimeLog, Comment
+from .models import Task, TimeLog, Comment, get_board_version
+from .board import board_etag, get_board, get_board_delta
+from .bulk import BulkUpdateError, bulk_update_tasks, clean_changes
+from .graph import get_project_schedule
+from .pagination import paginate_tasks
+from .tree import get_task_tree
 from projects.models import Project, Attachment
 from accounts.models import CustomUser
-from communications.models import Notification
+from communications.models import Notification, create_notification
+from dashboard.search import filter_by_search
+
+# Arama ile doldurulan filtre listelerinde sayfa başına sonuç
+AUTOCOMPLETE_PAGE_SIZE = 20
+
+def get_visible_tasks(user):
+    """Kullanıcının görebileceği görevler (yönetici değilse atandığı veya projesindeki görevler)"""
+    tasks = Task.objects.all()
+    if user.role != 'admin' and user.role != 'project_manager':
+        # distinct() yerine alt sorgu: sayfalama ve toplamalar birleştirme olmadan çalışır
+        tasks = tasks.filter(
+            Q(assignee=user) |
+            Q(project__in=Project.objects.for_member(user).values('id'))
+        )
+    return tasks
 
 @login_required
 def task_list(request):
@@ -22,17 +44,8 @@ def task_list(request):
     assignee_id = request.GET.get('assignee')
     search = request.GET.get('search')
     
-    # Temel sorgu
-    tasks = Task.objects.all().select_related('project', 'assignee', 'parent_task')
-    
-    # Kullanıcı rolüne göre filtreleme
-    if request.user.role != 'admin' and request.user.role != 'project_manager':
-        # Yönetici değilse, sadece atandığı veya projesi üzerinde çalıştığı görevleri görebilir
-        tasks = tasks.filter(
-            Q(assignee=request.user) | 
-            Q(project__manager=request.user) |
-            Q(project__team_members=request.user)
-        ).distinct()
+    # Temel sorgu - kullanıcı rolüne göre filtreleme
+    tasks = get_visible_tasks(request.user)
     
     # Diğer filtreleri uygulama
     if status:
@@ -41,38 +54,40 @@ def task_list(request):
     if priority:
         tasks = tasks.filter(priority=priority)
     
-    if project_id:
+    if project_id and project_id.isdigit():
         tasks = tasks.filter(project_id=project_id)
     
-    if assignee_id:
+    if assignee_id and assignee_id.isdigit():
         tasks = tasks.filter(assignee_id=assignee_id)
     
     if search:
-        tasks = tasks.filter(
-            Q(title__icontains=search) | 
-            Q(description__icontains=search)
-        )
-    
-    # Görev istatistikleri
-    total_tasks = tasks.count()
-    todo_tasks = tasks.filter(status='todo').count()
-    in_progress_tasks = tasks.filter(status='in_progress').count()
-    review_tasks = tasks.filter(status='review').count()
-    completed_tasks = tasks.filter(status='completed').count()
-    overdue_tasks = tasks.filter(due_date__lt=timezone.now().date()).exclude(status='completed').count()
-    
-    # İlgili verileri getir
-    projects = Project.objects.all()
-    users = CustomUser.objects.all()
+        tasks = filter_by_search(tasks, 'task', search, ('title', 'description'))
+    
+    # Görev istatistikleri tek sorguda
+    stats = tasks.aggregate(
+        total_tasks=Count('id'),
+        todo_tasks=Count('id', filter=Q(status='todo')),
+        in_progress_tasks=Count('id', filter=Q(status='in_progress')),
+        review_tasks=Count('id', filter=Q(status='review')),
+        completed_tasks=Count('id', filter=Q(status='completed')),
+        overdue_tasks=Count('id', filter=Q(due_date__lt=timezone.now().date()) & ~Q(status='completed')),
+    )
+    
+    # Sayfalama: ilk sayfalar sayfa numarasıyla, derin sayfalar imleçle
+    page = paginate_tasks(
+        tasks.select_related('project', 'assignee', 'parent_task'),
+        request.GET,
+        stats['total_tasks']
+    )
+    
+    # Filtre açılır listeleri arama ile doldurulur; yalnızca seçili değerler yüklenir
+    selected_project = Project.objects.filter(id=project_id).first() if project_id and project_id.isdigit() else None
+    selected_assignee = CustomUser.objects.filter(id=assignee_id).first() if assignee_id and assignee_id.isdigit() else None
     
     context = {
-        'tasks': tasks,
-        'total_tasks': total_tasks,
-        'todo_tasks': todo_tasks,
-        'in_progress_tasks': in_progress_tasks,
-        'review_tasks': review_tasks,
-        'completed_tasks': completed_tasks,
-        'overdue_tasks': overdue_tasks,
+        'tasks': page['object_list'],
+        'page': page,
+        **stats,
         'status_filter': status,
         'priority_filter': priority,
         'project_filter': project_id,
@@ -80,13 +95,118 @@ def task_list(request):
         'search_query': search,
         'status_choices': Task.STATUS_CHOICES,
         'priority_choices': Task.PRIORITY_CHOICES,
-        'projects': projects,
-        'users': users,
+        'selected_project': selected_project,
+        'selected_assignee': selected_assignee,
         'title': 'Görevler',
     }
     
     return render(request, 'tasks/task_list.html', context)
 
+def _autocomplete_page(request, queryset, label):
+    """Select2 biçiminde sayfalı sonuç döndürür: {'results': [...], 'pagination': {'more': bool}}"""
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+    offset = (page - 1) * AUTOCOMPLETE_PAGE_SIZE
+    rows = list(queryset[offset:offset + AUTOCOMPLETE_PAGE_SIZE + 1])
+    return JsonResponse({
+        'results': [{'id': row.id, 'text': label(row)} for row in rows[:AUTOCOMPLETE_PAGE_SIZE]],
+        'pagination': {'more': len(rows) > AUTOCOMPLETE_PAGE_SIZE},
+    })
+
+@login_required
+def project_autocomplete(request):
+    """
+    Görev filtreleri için proje arama API endpoint'i.
+    Yalnızca kullanıcının görebildiği projeler döner.
+    """
+    term = request.GET.get('q', '').strip()
+    projects = Project.objects.only('id', 'name')
+    if request.user.role != 'admin' and request.user.role != 'project_manager':
+        projects = projects.for_member(request.user)
+    if term:
+        projects = projects.filter(name__icontains=term)
+    return _autocomplete_page(request, projects.order_by('name', 'id'), lambda project: project.name)
+
+@login_required
+def user_autocomplete(request):
+    """
+    Görev filtreleri için kullanıcı arama API endpoint'i.
+    """
+    term = request.GET.get('q', '').strip()
+    users = CustomUser.objects.filter(is_active=True).only('id', 'username', 'first_name', 'last_name')
+    if term:
+        users = users.filter(
+            Q(username__icontains=term) |
+            Q(first_name__icontains=term) |
+            Q(last_name__icontains=term)
+        )
+    return _autocomplete_page(
+        request,
+        users.order_by('first_name', 'last_name', 'id'),
+        lambda user: user.get_full_name() or user.username
+    )
+
+@login_required
+def project_schedule(request, project_id):
+    """
+    Projenin bağımlılık grafiğine göre hesaplanan zaman planını (topolojik
+    sıra, en erken/en geç başlangıç, bolluk, kritik yol) Gantt görünümü
+    için JSON olarak döndürür.
+    """
+    project = get_object_or_404(Project, id=project_id)
+    
+    # Yetkilendirme kontrolü
+    if request.user.role != 'admin' and request.user.role != 'project_manager':
+        if not Project.objects.for_member(request.user).filter(id=project.id).exists():
+            return JsonResponse({'error': 'Bu projeyi görüntüleme yetkiniz yok.'}, status=403)
+    
+    return JsonResponse(get_project_schedule(project.id))
+
+@login_required
+def project_board(request, project_id):
+    """
+    Proje panosu (Kanban) için duruma göre gruplanmış görevleri JSON olarak
+    döndürür. ETag pano sürümüdür; değişiklik yoksa 304 döner. ?since=<sürüm>
+    ile yalnızca o sürümden sonra değişen ve kaldırılan görevler gönderilir.
+    """
+    project = get_object_or_404(Project, id=project_id)
+    
+    # Yetkilendirme kontrolü
+    if request.user.role != 'admin' and request.user.role != 'project_manager':
+        if not Project.objects.for_member(request.user).filter(id=project.id).exists():
+            return JsonResponse({'error': 'Bu projeyi görüntüleme yetkiniz yok.'}, status=403)
+    
+    version = get_board_version(project.id)
+    etag = board_etag(project.id, version)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        since = request.GET.get('since', '')
+        if since.isdigit() and int(since) <= version:
+            response = JsonResponse(get_board_delta(project.id, version, int(since)))
+        else:
+            # Geçersiz veya ileri bir sürüm (ör. veritabanı sıfırlandıysa) için tüm pano gönderilir
+            response = JsonResponse(get_board(project.id, version))
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+@login_required
+def task_tree(request, task_id):
+    """
+    Görevin tüm alt görev ağacını, her düğüm için alt ağaçtaki tahmini ve
+    gerçekleşen saat toplamları ile tamamlanma oranıyla JSON olarak döndürür.
+    """
+    task = get_object_or_404(Task.objects.select_related('project'), id=task_id)
+    
+    # Yetkilendirme kontrolü
+    if request.user.role != 'admin' and request.user.role != 'project_manager':
+        if task.assignee_id != request.user.id and not Project.objects.for_member(request.user).filter(id=task.project_id).exists():
+            return JsonResponse({'error': 'Bu görevi görüntüleme yetkiniz yok.'}, status=403)
+    
+    return JsonResponse(get_task_tree(task.id).as_dict())
+
 @login_required
 def task_detail(request, task_id):
     """
@@ -100,8 +220,9 @@ def task_detail(request, task_id):
             messages.error(request, 'Bu görevi görüntüleme yetkiniz yok.')
             return redirect('tasks:task_list')
     
-    # Alt görevleri getir
-    subtasks = task.subtasks.all().select_related('assignee')
+    # Tüm alt görev ağacını tek sorguda getir (toplam saat ve tamamlanma oranıyla)
+    task_tree = get_task_tree(task.id)
+    subtask_nodes = list(task_tree.walk())[1:]
     
     # Zaman kayıtlarını getir
     time_logs = task.time_logs.all().select_related('user')
@@ -117,7 +238,8 @@ def task_detail(request, task_id):
     
     context = {
         'task': task,
-        'subtasks': subtasks,
+        'task_tree': task_tree,
+        'subtask_nodes': subtask_nodes,
         'time_logs': time_logs,
         'comments': comments,
         'attachments': attachments,
@@ -281,15 +403,14 @@ def task_update(request, task_id):
     original_status = task.status  # Orijinal durumu kaydet
     
     # Yetkilendirme kontrolü
-    is_admin_or_manager = request.user.is_superuser or request.user.role == 'project_manager' or request.user == task.project.manager
+    is_admin_or_manager = task.is_managed_by(request.user)
     is_assignee = request.user == task.assignee
-    is_creator = request.user == task.creator
+    access = task.get_edit_access(request.user)
     
     # Takım üyeleri sadece kendilerine atanmış görevlerin durumunu güncelleyebilir
-    if not is_admin_or_manager:
-        if not is_assignee and not is_creator:
-            messages.error(request, 'Bu görevi düzenleme yetkiniz yok. Sadece göreve atanan kişi, görevi oluşturan kişi veya yöneticiler düzenleyebilir.')
-            return redirect('tasks:task_detail', task_id=task.id)
+    if access is None:
+        messages.error(request, 'Bu görevi düzenleme yetkiniz yok. Sadece göreve atanan kişi, görevi oluşturan kişi veya yöneticiler düzenleyebilir.')
+        return redirect('tasks:task_detail', task_id=task.id)
     
     if request.method == 'POST':
         # Form verilerini işle
@@ -310,7 +431,7 @@ def task_update(request, task_id):
         else:
             # Takım üyeleri sadece kendilerine atanmış görevin durumunu değiştirebilir
             # Diğer alanları değiştiremezler
-            if not is_admin_or_manager and is_assignee:
+            if access == 'status':
                 # Sadece durum güncellemesi yapılabilir
                 if status != original_status:
                     task.status = status
@@ -439,6 +560,27 @@ def task_update(request, task_id):
     
     return render(request, 'tasks/task_form.html', context)
 
+@login_required
+@require_POST
+def task_bulk_update(request):
+    """
+    Seçilen görevlerin durumunu, atanan kişisini ve/veya önceliğini tek
+    işlemde günceller (AJAX). Yetki olmayan görevler atlanır ve yanıtta
+    listelenir.
+    """
+    try:
+        task_ids = [int(task_id) for task_id in request.POST.getlist('task_ids')]
+        changes = clean_changes(request.POST)
+        result = bulk_update_tasks(request.user, task_ids, changes)
+    except ValueError as e:
+        message = str(e) if isinstance(e, BulkUpdateError) else 'Geçersiz görev listesi.'
+        return JsonResponse({'success': False, 'message': message}, status=400)
+    
+    message = f"{len(result['updated'])} görev güncellendi."
+    if result['skipped']:
+        message += f" {len(result['skipped'])} görev için yetkiniz olmadığından atlandı."
+    return JsonResponse({'success': True, 'message': message, **result})
+
 # Yardımcı fonksiyon - durum değişikliği bildirimleri için
 def send_status_change_notification(task, user, new_status, original_status):
     if new_status == original_status:
@@ -467,14 +609,15 @@ def send_status_change_notification(task, user, new_status, original_status):
     
     # Her alıcıya bildirim gönder
     for recipient in recipients:
-        Notification.objects.create(
+        create_notification(
             recipient=recipient,
             sender=user,
             title=f"Görev durumu değişti: {task.title}",
             content=f"{user.get_full_name() or user.username} görevi '{status_display}' olarak işaretledi: {task.title}",
             notification_type=notification_type,
             related_task=task,
-            related_project=task.project
+            related_project=task.project,
+            kind='task_status'
         )
 
 @login_required
@@ -532,13 +675,9 @@ def add_time_log(request, task_id):
                 hours=hours,
                 description=description
             )
+            # Görevin gerçekleşen süresi ve proje toplamları sinyallerle artımlı güncellenir
             time_log.save()
             
-            # Güncel harcanan zamanı hesapla
-            total_hours = task.time_logs.aggregate(total=Sum('hours'))['total'] or 0
-            task.actual_hours = total_hours
-            task.save()
-            
             messages.success(request, 'Zaman kaydı başarıyla eklendi.')
         
         return redirect('tasks:task_detail', task_id=task.id)
@@ -596,14 +735,15 @@ def add_comment(request, task_id):
             
             # Her alıcı için bildirim oluştur
             for recipient in recipients:
-                Notification.objects.create(
+                create_notification(
                     recipient=recipient,
                     sender=request.user,
                     title=f"Yeni yorum: {task.title}",
                     content=f"{request.user.get_full_name() or request.user.username} görevinize yorum yaptı: {content[:100]}{'...' if len(content) > 100 else ''}",
                     notification_type="info",
                     related_task=task,
-                    related_project=task.project
+                    related_project=task.project,
+                    kind='task_comment'
                 )
             
             messages.success(request, 'Yorum başarıyla eklendi.')
@@ -622,7 +762,7 @@ def update_status(request, task_id):
     original_status = task.status  # Orijinal durumu kaydet
     
     # Yetkilendirme kontrolü
-    is_admin_or_manager = request.user.is_superuser or request.user.role == 'project_manager' or request.user == task.project.manager
+    is_admin_or_manager = task.is_managed_by(request.user)
     is_assignee = request.user == task.assignee
     
     # Takım üyeleri sadece kendilerine atanmış görevlerin durumunu değiştirebilir
@@ -668,14 +808,15 @@ def update_status(request, task_id):
                 
             # Her alıcıya bildirim gönder
             for recipient in recipients:
-                Notification.objects.create(
+                create_notification(
                     recipient=recipient,
                     sender=request.user,
                     title=f"Görev durumu değişti: {task.title}",
                     content=f"{request.user.get_full_name() or request.user.username} görevi '{status_display}' olarak işaretledi: {task.title}",
                     notification_type=notification_type,
                     related_task=task,
-                    related_project=task.project
+                    related_project=task.project,
+                    kind='task_status'
                 )
         
         messages.success(request, f'"{task.title}" görevinin durumu güncellendi.')
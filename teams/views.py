@@ -45,10 +45,14 @@ def team_detail(request, team_id):
     # Ekip üyeleri
     team_members = TeamMember.objects.filter(team=team).select_related('user')
     
+    # Ekip projeleri; ilerleme bilgisi SQL'de hesaplanır
+    team_projects = team.projects.with_progress()
+    
     context = {
         'title': team.name,
         'team': team,
-        'team_members': team_members
+        'team_members': team_members,
+        'team_projects': team_projects
     }
     
     return render(request, 'teams/team_detail.html', context)